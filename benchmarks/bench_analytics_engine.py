@@ -0,0 +1,172 @@
+"""
+Векторизований analytics_engine проти тих самих показників окремими SQL-запитами.
+
+Показники: тренди за 6 місяців, ковзні середні за 7/30 днів, витрати за
+днями тижня, медіана й перцентилі, аномалії за категоріями. Для SQL кожен
+показник — свій запит (або кілька), як це робили б функції analytics_service;
+для NumPy — одне читання стовпців і обчислення над масивами.
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_analytics_engine.py [--rows 10000 100000 500000] [--repeat 5]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import analytics_engine, connection_pool, database_service
+
+CATEGORIES = ["Їжа", "Транспорт", "Кафе та ресторани", "Комунальні послуги", "Розваги", "Одяг", "Здоров'я"]
+
+NOW = datetime(2024, 12, 31, 23, 0)
+
+
+def fill_database(db_path, rows, user_id=1):
+    conn = sqlite3.connect(db_path)
+    step = timedelta(days=730) / rows
+    batch = []
+    for i in range(rows):
+        timestamp = (NOW - step * i).strftime("%Y-%m-%d %H:%M:%S")
+        if random.random() < 0.05:
+            batch.append((user_id, round(random.uniform(1000, 30000), 2), "Зарплата", "дохід", timestamp))
+        else:
+            amount = random.lognormvariate(5, 0.6)
+            batch.append((user_id, -round(amount, 2), random.choice(CATEGORIES), "витрата", timestamp))
+    conn.executemany("INSERT INTO transactions (user_id, amount, category, type, timestamp) "
+                     "VALUES (?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def sql_analytics(db_path, user_id):
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    fmt = "%Y-%m-%d %H:%M:%S"
+
+    cursor.execute("""
+                   SELECT strftime('%Y-%m', timestamp),
+                          SUM(CASE WHEN type = 'дохід' THEN amount ELSE 0 END),
+                          SUM(CASE WHEN type = 'витрата' THEN -amount ELSE 0 END)
+                   FROM transactions
+                   WHERE user_id = ? AND timestamp >= ?
+                   GROUP BY 1
+                   ORDER BY 1
+                   """, (user_id, (NOW.replace(day=1) - timedelta(days=160)).strftime(fmt)))
+    months = cursor.fetchall()
+
+    today = NOW.replace(hour=0, minute=0, second=0)
+    rolling = {}
+    for window in analytics_engine.ROLLING_WINDOWS:
+        values = []
+        for offset in (0, window):
+            end = today + timedelta(days=1 - offset)
+            start = end - timedelta(days=window)
+            cursor.execute("""
+                           SELECT COALESCE(SUM(-amount), 0)
+                           FROM transactions
+                           WHERE user_id = ? AND type = 'витрата' AND timestamp >= ? AND timestamp < ?
+                           """, (user_id, start.strftime(fmt), end.strftime(fmt)))
+            values.append(cursor.fetchone()[0] / window)
+        rolling[window] = tuple(values)
+
+    cursor.execute("""
+                   SELECT strftime('%w', timestamp), SUM(-amount), COUNT(DISTINCT date(timestamp))
+                   FROM transactions
+                   WHERE user_id = ? AND type = 'витрата'
+                   GROUP BY 1
+                   """, (user_id,))
+    weekdays = cursor.fetchall()
+
+    cursor.execute("SELECT COUNT(*) FROM transactions WHERE user_id = ? AND type = 'витрата'", (user_id,))
+    count = cursor.fetchone()[0]
+    percentiles = {}
+    for p in analytics_engine.PERCENTILES:
+        cursor.execute("""
+                       SELECT -amount FROM transactions
+                       WHERE user_id = ? AND type = 'витрата'
+                       ORDER BY -amount
+                       LIMIT 1 OFFSET ?
+                       """, (user_id, int((count - 1) * p / 100)))
+        percentiles[p] = cursor.fetchone()[0]
+
+    anomalies = []
+    cursor.execute("SELECT DISTINCT category FROM transactions WHERE user_id = ? AND type = 'витрата'", (user_id,))
+    for (category,) in cursor.fetchall():
+        cursor.execute("""
+                       SELECT timestamp, -amount FROM transactions
+                       WHERE user_id = ? AND type = 'витрата' AND category = ?
+                       """, (user_id, category))
+        rows = cursor.fetchall()
+        if len(rows) < analytics_engine.ANOMALY_MIN_GROUP:
+            continue
+        median = statistics.median(amount for _, amount in rows)
+        mad = statistics.median(abs(amount - median) for _, amount in rows)
+        if mad:
+            anomalies.extend((timestamp, category, amount) for timestamp, amount in rows
+                             if 0.6745 * (amount - median) / mad > analytics_engine.ANOMALY_THRESHOLD)
+
+    conn.close()
+    return months, rolling, weekdays, percentiles, anomalies
+
+
+def engine_compute(columns):
+    return (analytics_engine.monthly_trends(columns),
+            analytics_engine.rolling_averages(columns, now=NOW),
+            analytics_engine.weekday_spending(columns),
+            analytics_engine.expense_percentiles(columns),
+            analytics_engine.find_anomalies(columns))
+
+
+def best_of(func, repeat):
+    timings = []
+    result = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 500000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'SQL ms':>9} {'NumPy ms':>9} {'load ms':>9} {'compute ms':>11} {'columns KB':>11} "
+          f"{'anomalies':>10}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "bench.db")
+            with patch.object(database_service, "DATABASE_FILE", db_path), \
+                    patch.object(analytics_engine, "DATABASE_FILE", db_path):
+                database_service.init_database()
+                fill_database(db_path, rows)
+
+                sql_time, sql_result = best_of(lambda: sql_analytics(db_path, 1), args.repeat)
+                engine_time, engine_result = best_of(lambda: engine_compute(analytics_engine.load_columns(1)),
+                                                     args.repeat)
+                load_time, columns = best_of(lambda: analytics_engine.load_columns(1), args.repeat)
+                compute_time, _ = best_of(lambda: engine_compute(columns), args.repeat)
+
+                if len(sql_result[4]) != len(engine_result[4]):
+                    print(f"  аномалій: SQL {len(sql_result[4])}, NumPy {len(engine_result[4])}")
+                print(f"{rows:>8} {sql_time * 1000:>9.1f} {engine_time * 1000:>9.1f} {load_time * 1000:>9.1f} "
+                      f"{compute_time * 1000:>11.2f} {columns.nbytes / 1024:>11.0f} {len(engine_result[4]):>10}")
+
+                connection_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Навантажувальний тест: пропускна здатність обробки оновлень з
+concurrent_updates, коли обробники викликають SQLite напряму в циклі подій
+("blocking") і через асинхронний фасад services/async_database_service ("offload").
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_async_db.py [--updates 400] [--concurrency 32] [--latency 0.02] [--db-latency 0.005]
+
+--db-latency додає затримку до кожного виклику бази, моделюючи повільний диск
+або очікування блокування SQLite; саме вона блокує цикл подій у режимі "blocking".
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from telegram.ext import Application
+
+from benchmarks.fake_telegram import FakeTelegramRequest, make_callback_update, make_text_update
+from services import async_database_service, connection_pool, database_service
+from handlers.transactions import add_transaction_handler, history_callback_handler
+import handlers.transactions
+
+
+def with_db_latency(run, db_latency):
+    async def wrapper(func, *args, **kwargs):
+        def slow_call(*call_args, **call_kwargs):
+            time.sleep(db_latency)
+            return func(*call_args, **call_kwargs)
+
+        return await run(slow_call, *args, **kwargs)
+
+    return wrapper
+
+
+async def call_in_loop(func, *args, **kwargs):
+    # Поведінка до появи фасаду: блокуючий виклик прямо в циклі подій
+    return func(*args, **kwargs)
+
+
+async def run_mode(mode, updates_count, concurrency, latency, db_latency, users):
+    request = FakeTelegramRequest(latency=latency)
+    app = Application.builder().token("1:bench").request(request).get_updates_request(
+        FakeTelegramRequest(latency=0)).concurrent_updates(concurrency).build()
+    app.add_handler(add_transaction_handler)
+    app.add_handler(history_callback_handler)
+    await app.initialize()
+
+    updates = []
+    for i in range(updates_count):
+        user_id = i % users + 1
+        if i % 2:
+            updates.append(make_text_update(app.bot, i, user_id, f"/add -{i % 50 + 1} bench"))
+        else:
+            updates.append(make_callback_update(app.bot, i, user_id, "history"))
+
+    run = call_in_loop if mode == "blocking" else async_database_service.run_blocking
+    with patch.object(handlers.transactions, "run_blocking", with_db_latency(run, db_latency)):
+        try:
+            started = time.perf_counter()
+            await asyncio.gather(*(app.update_processor.process_update(update, app.process_update(update))
+                                   for update in updates))
+            elapsed = time.perf_counter() - started
+        finally:
+            await app.shutdown()
+
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--latency", type=float, default=0.02, help="затримка фейкового Bot API, с")
+    parser.add_argument("--db-latency", type=float, default=0.005, help="додаткова затримка виклику бази, с")
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'mode':<10} {'updates':>8} {'seconds':>9} {'updates/s':>10}")
+    for mode in ("blocking", "offload"):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "bench.db")
+            with patch.object(database_service, "DATABASE_FILE", db_path):
+                database_service.init_database()
+                elapsed = asyncio.run(run_mode(mode, args.updates, args.concurrency, args.latency,
+                                             args.db_latency, args.users))
+                connection_pool.close_all()
+        print(f"{mode:<10} {args.updates:>8} {elapsed:>9.2f} {args.updates / elapsed:>10.1f}")
+
+    async_database_service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""
+Відтворює синтетичний потік оновлень через register_handlers і порівнює
+послідовну обробку (concurrent_updates = 1) з паралельною обробкою
+PerUserUpdateProcessor, де оновлення одного користувача йдуть по черзі.
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_concurrent_updates.py [--updates 600] [--users 50] [--concurrency 1 8 32]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from telegram.ext import Application
+
+from benchmarks.fake_telegram import FakeTelegramRequest, make_callback_update, make_text_update
+from handlers import register_handlers
+from services import async_database_service, connection_pool, database_service
+from services.update_processor import PerUserUpdateProcessor
+
+# Типовий сеанс користувача: меню, перегляд даних і додавання транзакції
+SESSION = (
+    ("callback", "main_menu"),
+    ("callback", "history"),
+    ("command", "/add -{n} Їжа"),
+    ("callback", "budget"),
+    ("callback", "stats"),
+    ("callback", "debt"),
+    ("callback", "list_reminders"),
+    ("command", "/start"),
+)
+
+
+def build_stream(bot, updates_count, users):
+    updates = []
+    for i in range(updates_count):
+        user_id = i % users + 1
+        kind, payload = SESSION[(i // users) % len(SESSION)]
+        if kind == "callback":
+            updates.append(make_callback_update(bot, i, user_id, payload))
+        else:
+            updates.append(make_text_update(bot, i, user_id, payload.format(n=i % 90 + 10)))
+    return updates
+
+
+async def replay(concurrency, updates_count, users, latency):
+    app = (
+        Application.builder()
+        .token("1:bench")
+        .request(FakeTelegramRequest(latency=latency))
+        .get_updates_request(FakeTelegramRequest(latency=0))
+        .concurrent_updates(PerUserUpdateProcessor(concurrency))
+        .build()
+    )
+    register_handlers(app)
+    await app.initialize()
+
+    updates = build_stream(app.bot, updates_count, users)
+    try:
+        started = time.perf_counter()
+        # Як і Application під час polling, кожне оновлення стає окремою задачею
+        await asyncio.gather(*(app.update_processor.process_update(update, app.process_update(update))
+                               for update in updates))
+        return time.perf_counter() - started
+    finally:
+        await app.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--updates", type=int, default=600)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--latency", type=float, default=0.02, help="затримка фейкового Bot API, с")
+    args = parser.parse_args()
+
+    results = []
+    for concurrency in args.concurrency:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "bench.db")
+            with patch.object(database_service, "DATABASE_FILE", db_path):
+                database_service.init_database()
+                elapsed = asyncio.run(replay(concurrency, args.updates, args.users, args.latency))
+                connection_pool.close_all()
+        results.append((concurrency, elapsed))
+
+    print(f"{'concurrency':>11} {'updates':>8} {'seconds':>9} {'updates/s':>10}")
+    for concurrency, elapsed in results:
+        print(f"{concurrency:>11} {args.updates:>8} {elapsed:>9.2f} {args.updates / elapsed:>10.1f}")
+
+    async_database_service.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Час і пікова пам'ять експорту транзакцій в Excel: попередня реалізація
+(fetchall + звичайна книга openpyxl + другий прохід для ширин) проти
+потокової write_transactions_excel.
+
+Пам'ять вимірюється tracemalloc (пік виділень Python під час експорту).
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_excel_export.py [--rows 10000 100000 1000000] [--legacy-max 100000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+import openpyxl
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.utils import get_column_letter
+
+from services import analytics_service, connection_pool, database_service
+
+CATEGORIES = ["Їжа", "Транспорт", "Кафе та ресторани", "Комунальні послуги", "Зарплата", "Подарунки"]
+
+
+def fill_database(db_path, rows, user_id=1):
+    conn = sqlite3.connect(db_path)
+    start = datetime(2020, 1, 1)
+    batch = []
+    for i in range(rows):
+        amount = round(random.uniform(-2000, 3000), 2)
+        batch.append((user_id, amount, random.choice(CATEGORIES), "дохід" if amount > 0 else "витрата",
+                      (start + timedelta(minutes=7 * i)).strftime("%Y-%m-%d %H:%M:%S")))
+        if len(batch) == 50000:
+            conn.executemany("INSERT INTO transactions (user_id, amount, category, type, timestamp) "
+                             "VALUES (?, ?, ?, ?, ?)", batch)
+            batch.clear()
+    conn.executemany("INSERT INTO transactions (user_id, amount, category, type, timestamp) "
+                     "VALUES (?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def legacy_export(db_path, user_id, output):
+    # Попередня реалізація export_transactions_to_excel без змін логіки
+    conn = sqlite3.connect(db_path)
+    cursor = conn.cursor()
+    cursor.execute("""
+                   SELECT timestamp, amount, category, type
+                   FROM transactions
+                   WHERE user_id = ?
+                   ORDER BY timestamp DESC
+                   """, (user_id,))
+    transactions = cursor.fetchall()
+    conn.close()
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = "Транзакції"
+
+    header_font = Font(name='Arial', size=12, bold=True, color="FFFFFF")
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    thin_border = Border(left=Side(style='thin'), right=Side(style='thin'),
+                         top=Side(style='thin'), bottom=Side(style='thin'))
+    income_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
+    expense_fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
+
+    for col_num, header in enumerate(["Дата", "Сума", "Категорія", "Тип"], 1):
+        cell = ws.cell(row=1, column=col_num)
+        cell.value = header
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        cell.border = thin_border
+
+    for row_num, transaction in enumerate(transactions, 2):
+        try:
+            formatted_date = datetime.strptime(transaction[0], "%Y-%m-%d %H:%M:%S").strftime("%d.%m.%Y %H:%M")
+        except ValueError:
+            formatted_date = transaction[0]
+        ws.cell(row=row_num, column=1).value = formatted_date
+        ws.cell(row=row_num, column=2).value = abs(float(transaction[1]))
+        ws.cell(row=row_num, column=3).value = transaction[2]
+        ws.cell(row=row_num, column=4).value = transaction[3]
+        for col_num in range(1, 5):
+            cell = ws.cell(row=row_num, column=col_num)
+            cell.border = thin_border
+            cell.alignment = Alignment(horizontal='center', vertical='center')
+        fill = income_fill if transaction[3] == 'дохід' else expense_fill
+        for col_num in range(1, 5):
+            ws.cell(row=row_num, column=col_num).fill = fill
+
+    for col_num in range(1, 5):
+        max_length = 0
+        for row_num in range(1, len(transactions) + 2):
+            value = ws.cell(row=row_num, column=col_num).value
+            if value:
+                max_length = max(max_length, len(str(value)))
+        ws.column_dimensions[get_column_letter(col_num)].width = max_length + 4
+
+    ws.freeze_panes = "A2"
+    wb.save(output)
+
+
+def measure(func):
+    tracemalloc.start()
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--legacy-max", type=int, default=100000,
+                        help="не запускати стару реалізацію на більших обсягах")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'exporter':<10} {'seconds':>9} {'peak MB':>9} {'file MB':>9}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir, "bench.db")
+            with patch.object(database_service, "DATABASE_FILE", db_path), \
+                    patch.object(analytics_service, "DATABASE_FILE", db_path):
+                database_service.init_database()
+                fill_database(db_path, rows)
+
+                runs = [("streaming", lambda output: analytics_service.write_transactions_excel(1, output))]
+                if rows <= args.legacy_max:
+                    runs.insert(0, ("legacy", lambda output: legacy_export(db_path, 1, output)))
+
+                for name, export in runs:
+                    output_path = os.path.join(temp_dir, f"{name}.xlsx")
+                    elapsed, peak = measure(lambda: export(output_path))
+                    size = os.path.getsize(output_path) / 1024 / 1024
+                    print(f"{rows:>9} {name:<10} {elapsed:>9.2f} {peak:>9.1f} {size:>9.1f}")
+
+                connection_pool.close_all()
+
+
+if __name__ == "__main__":
+    main()
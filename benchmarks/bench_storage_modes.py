@@ -0,0 +1,109 @@
+"""
+Порівняння затримок змішаного навантаження читання/запису для режимів
+зберігання "default" (журнал відкату) та "wal" (WAL + один потік запису).
+
+Запуск з кореня проєкту:
+    python benchmarks/bench_storage_modes.py [--readers 8] [--writers 4] [--seconds 5]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import connection_pool, db_writer
+from services import database_service
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_mode(mode, readers, writers, seconds, users):
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = os.path.join(temp_dir, "bench.db")
+        with patch.object(database_service, "DATABASE_FILE", db_path):
+            connection_pool.close_all()
+            if mode == "wal":
+                connection_pool.configure(pragmas=connection_pool.WAL_PRAGMAS)
+                db_writer.start()
+            else:
+                connection_pool.configure(pragmas=connection_pool.DEFAULT_PRAGMAS)
+
+            database_service.init_database()
+            for i in range(2000):
+                database_service.add_transaction(i % users, -(i % 97 + 1), f"cat{i % 7}")
+
+            read_latencies = []
+            write_latencies = []
+            errors = []
+            stop_at = time.perf_counter() + seconds
+
+            def reader(worker_id):
+                local = []
+                n = 0
+                while time.perf_counter() < stop_at:
+                    started = time.perf_counter()
+                    database_service.get_transaction_history((worker_id + n) % users, limit=10)
+                    local.append(time.perf_counter() - started)
+                    n += 1
+                read_latencies.extend(local)
+
+            def writer(worker_id):
+                local = []
+                n = 0
+                while time.perf_counter() < stop_at:
+                    started = time.perf_counter()
+                    if not database_service.add_transaction((worker_id + n) % users, -10, "bench"):
+                        errors.append(1)
+                    database_service.insert_command_log(worker_id, "bench", "Bench", "/add", "2024-01-01 00:00:00")
+                    local.append(time.perf_counter() - started)
+                    n += 1
+                write_latencies.extend(local)
+
+            threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+            threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            db_writer.stop()
+            connection_pool.close_all()
+            connection_pool.configure(pragmas=connection_pool.DEFAULT_PRAGMAS)
+
+    return read_latencies, write_latencies, len(errors)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--users", type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'mode':<8} {'op':<6} {'count':>8} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9} {'errors':>7}")
+    for mode in ("default", "wal"):
+        reads, writes, errors = run_mode(mode, args.readers, args.writers, args.seconds, args.users)
+        for op, values in (("read", reads), ("write", writes)):
+            print(f"{mode:<8} {op:<6} {len(values):>8} "
+                  f"{percentile(values, 50) * 1000:>9.2f} "
+                  f"{percentile(values, 99) * 1000:>9.2f} "
+                  f"{max(values, default=0) * 1000:>9.2f} "
+                  f"{errors if op == 'write' else '':>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Локальна заміна Telegram Bot API для бенчмарків.
+
+FakeTelegramRequest підключається до Application через builder().request(...)
+і відповідає на виклики API готовими JSON з заданою мережевою затримкою,
+тож оновлення проходять повний шлях python-telegram-bot без доступу до мережі.
+"""
+import asyncio
+import json
+import time
+from datetime import datetime, timezone
+
+from telegram import CallbackQuery, Chat, Message, MessageEntity, Update, User
+from telegram.request import BaseRequest
+
+BOT_USER = {"id": 1, "is_bot": True, "first_name": "Bench", "username": "bench_bot"}
+
+
+class FakeTelegramRequest(BaseRequest):
+    def __init__(self, latency=0.02):
+        self.latency = latency
+        self.calls = {}
+        self._message_id = 0
+
+    @property
+    def read_timeout(self):
+        return None
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _message(self, chat_id):
+        self._message_id += 1
+        return {
+            "message_id": self._message_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "text": "ok",
+        }
+
+    async def do_request(self, url, method, request_data=None, read_timeout=None, write_timeout=None,
+                         connect_timeout=None, pool_timeout=None):
+        endpoint = url.rsplit("/", 1)[-1]
+        self.calls[endpoint] = self.calls.get(endpoint, 0) + 1
+
+        params = request_data.parameters if request_data else {}
+        chat_id = int(params.get("chat_id", 1) or 1)
+
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        if endpoint == "getMe":
+            result = BOT_USER
+        elif endpoint in ("answerCallbackQuery", "deleteMessage"):
+            result = True
+        else:
+            result = self._message(chat_id)
+
+        return 200, json.dumps({"ok": True, "result": result}).encode()
+
+
+def make_callback_update(bot, update_id, user_id, data, message_id=1):
+    user = User(id=user_id, first_name=f"user{user_id}", is_bot=False)
+    chat = Chat(id=user_id, type="private")
+    message = Message(message_id=message_id, date=datetime.now(timezone.utc), chat=chat, text="menu")
+    query = CallbackQuery(id=str(update_id), from_user=user, chat_instance=str(user_id),
+                          data=data, message=message)
+    update = Update(update_id=update_id, callback_query=query)
+    update.set_bot(bot)
+    query.set_bot(bot)
+    message.set_bot(bot)
+    return update
+
+
+def make_text_update(bot, update_id, user_id, text):
+    user = User(id=user_id, first_name=f"user{user_id}", is_bot=False)
+    chat = Chat(id=user_id, type="private")
+    entities = []
+    if text.startswith("/"):
+        command = text.split()[0]
+        entities.append(MessageEntity(type=MessageEntity.BOT_COMMAND, offset=0, length=len(command)))
+    message = Message(message_id=update_id, date=datetime.now(timezone.utc), chat=chat, text=text,
+                      from_user=user, entities=entities)
+    update = Update(update_id=update_id, message=message)
+    update.set_bot(bot)
+    message.set_bot(bot)
+    return update
@@ -1,9 +1,18 @@
 import logging
+from datetime import timedelta
 from services.database_service import init_database
+from services import async_database_service, budget_rollover, chart_service, connection_pool, currency_rates, \
+    db_writer, export_queue, logging_service, rate_store, reminder_scheduler, sheets_client, snapshot_cache, \
+    sync_queue
+from services.update_processor import PerUserUpdateProcessor
 from handlers import register_handlers
-from handlers.reminders import check_and_send_reminders
+from handlers.reminders import start_reminder_scheduler
 from telegram.ext import Application
-from config import TOKEN
+from config import TOKEN, DB_POOL_SIZE, DB_STORAGE_MODE, DB_EXECUTOR_WORKERS, CONCURRENT_UPDATES, \
+    CHART_WORKERS, EXPORT_WORKERS, EXPORT_QUEUE_SIZE, SNAPSHOT_CACHE_MB, CURRENCY_RATES_TTL, \
+    CURRENCY_REFRESH_MINUTES, CURRENCY_MAX_STALE_HOURS, GOOGLE_CREDENTIALS_FILE, GOOGLE_SPREADSHEET_ID, \
+    SYNC_WORKERS, SYNC_QUEUE_SIZE, SYNC_MAX_ATTEMPTS, AUTO_SYNC_DELAY, \
+    COMMAND_LOG_BATCH_SIZE, COMMAND_LOG_FLUSH_SECONDS
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -12,20 +21,64 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-app = Application.builder().token(TOKEN).build()
+
+async def on_startup(application: Application):
+    await logging_service.start()
+    await start_reminder_scheduler(application)
+    await export_queue.start()
+    await sync_queue.start()
+    await budget_rollover.start()
+    await rate_store.start()
+
+
+async def on_shutdown(application: Application):
+    await reminder_scheduler.stop()
+    await export_queue.stop()
+    await sync_queue.stop()
+    await budget_rollover.stop()
+    await rate_store.stop()
+    await currency_rates.close()
+    await logging_service.stop()
+    chart_service.shutdown()
+    async_database_service.shutdown()
+    db_writer.stop()
+    connection_pool.close_all()
+    logger.info("З'єднання з базою даних закрито")
+
+
+app = (
+    Application.builder()
+    .token(TOKEN)
+    .concurrent_updates(PerUserUpdateProcessor(CONCURRENT_UPDATES))
+    .post_init(on_startup)
+    .post_shutdown(on_shutdown)
+    .build()
+)
 
 
 def main():
     logger.info("Запуск Telegram-бота...")
 
+    connection_pool.configure(size=DB_POOL_SIZE)
+    async_database_service.configure(max_workers=DB_EXECUTOR_WORKERS)
+    chart_service.configure(max_workers=CHART_WORKERS)
+    export_queue.configure(workers=EXPORT_WORKERS, max_size=EXPORT_QUEUE_SIZE)
+    snapshot_cache.configure(max_bytes=SNAPSHOT_CACHE_MB * 1024 * 1024)
+    currency_rates.configure(ttl=CURRENCY_RATES_TTL)
+    rate_store.configure(refresh_interval=timedelta(minutes=CURRENCY_REFRESH_MINUTES),
+                         max_stale=timedelta(hours=CURRENCY_MAX_STALE_HOURS))
+    sheets_client.configure(credentials_file=GOOGLE_CREDENTIALS_FILE, spreadsheet_id=GOOGLE_SPREADSHEET_ID)
+    sync_queue.configure(workers=SYNC_WORKERS, max_size=SYNC_QUEUE_SIZE, max_attempts=SYNC_MAX_ATTEMPTS,
+                         auto_sync_delay=AUTO_SYNC_DELAY)
+    logging_service.configure(batch_size=COMMAND_LOG_BATCH_SIZE, flush_interval=COMMAND_LOG_FLUSH_SECONDS)
+    if DB_STORAGE_MODE == "wal":
+        connection_pool.configure(pragmas=connection_pool.WAL_PRAGMAS)
+        db_writer.start()
+        logger.info("Режим зберігання WAL увімкнено")
     init_database()
 
     register_handlers(app)
 
-    job_queue = app.job_queue
-    job_queue.run_repeating(check_and_send_reminders, interval=60, first=10)
-    logger.info("Планувальник нагадувань запущено")
-
     app.run_polling()
 
 
@@ -12,6 +12,56 @@ DEBT_NAME, DEBT_AMOUNT = range(2)
 # Типы данных
 AMOUNT, CATEGORY, TYPE = range(3)
 
+# Пул соединений SQLite (сколько соединений держать открытыми между запросами)
+DB_POOL_SIZE = 5
+
+# Режим хранения: "default" — стандартный журнал SQLite,
+# "wal" — WAL, настроенные PRAGMA и все записи через один поток-писатель
+DB_STORAGE_MODE = "default"
+
+# Сколько потоков выполняют запросы к базе для асинхронных обработчиков
+DB_EXECUTOR_WORKERS = 8
+
+# Сколько обновлений обрабатывать одновременно. Обновления одного пользователя
+# всегда идут по очереди; 1 — старый режим, все обновления строго по одному
+CONCURRENT_UPDATES = 32
+
+# Сколько процессов рисуют графики (matplotlib работает вне цикла событий)
+CHART_WORKERS = 2
+
+# Фоновый экспорт: сколько файлов готовить одновременно и сколько запросов держать в очереди
+EXPORT_WORKERS = 2
+EXPORT_QUEUE_SIZE = 100
+
+# Память под кэш снимков транзакций для аналитики (МБ); при превышении вытесняются давно не использованные
+SNAPSHOT_CACHE_MB = 64
+
+# Сколько секунд хранить таблицу курсов валют для одной базовой валюты
+CURRENCY_RATES_TTL = 600
+
+# Как часто обновлять сохранённые курсы валют (минуты) и сколько часов
+# показывать сохранённые курсы, если сервис курсов недоступен
+CURRENCY_REFRESH_MINUTES = 60
+CURRENCY_MAX_STALE_HOURS = 48
+
+# Google Таблицы: файл сервисного аккаунта и таблица для синхронизации
+GOOGLE_CREDENTIALS_FILE = "google_credentials.json"
+GOOGLE_SPREADSHEET_ID = "ВАШ_SPREADSHEET_ID"
+
+# Фоновая синхронизация с Google Таблицами: сколько синхронизаций вести одновременно,
+# сколько запросов держать в очереди и сколько раз пробовать при сбоях сети или лимитах Google
+SYNC_WORKERS = 2
+SYNC_QUEUE_SIZE = 100
+SYNC_MAX_ATTEMPTS = 5
+
+# Через сколько секунд после последней транзакции синхронизировать таблицу автоматически
+# (только для тех, кто уже синхронизировался); None — автосинхронизация выключена
+AUTO_SYNC_DELAY = None
+
+# Журнал команд пишется в базу пачками: когда накопится столько строк или пройдёт столько секунд
+COMMAND_LOG_BATCH_SIZE = 200
+COMMAND_LOG_FLUSH_SECONDS = 5
+
 # Настройка логирования
 logging.basicConfig(
     format="%(asctime)s - %(levelname)s - %(message)s",
@@ -36,6 +86,25 @@ __all__ = [
     "AMOUNT",
     "CATEGORY",
     "TYPE",
+    "DB_POOL_SIZE",
+    "DB_STORAGE_MODE",
+    "DB_EXECUTOR_WORKERS",
+    "CONCURRENT_UPDATES",
+    "CHART_WORKERS",
+    "EXPORT_WORKERS",
+    "EXPORT_QUEUE_SIZE",
+    "SNAPSHOT_CACHE_MB",
+    "CURRENCY_RATES_TTL",
+    "CURRENCY_REFRESH_MINUTES",
+    "CURRENCY_MAX_STALE_HOURS",
+    "GOOGLE_CREDENTIALS_FILE",
+    "GOOGLE_SPREADSHEET_ID",
+    "SYNC_WORKERS",
+    "SYNC_QUEUE_SIZE",
+    "SYNC_MAX_ATTEMPTS",
+    "AUTO_SYNC_DELAY",
+    "COMMAND_LOG_BATCH_SIZE",
+    "COMMAND_LOG_FLUSH_SECONDS",
     "logger",
     "job_queue",
 ]
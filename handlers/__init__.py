@@ -14,6 +14,8 @@ from .analytics import (
     stats_handler,
     chart_handler,
     report_handler,
+    trends_handler,
+    insights_handler,
     export_handler
 )
 from .budget import (
@@ -61,8 +63,7 @@ from .reminders import (
     delete_reminder_confirm_handler,
     create_reminder_conversation,
     edit_reminder_title_conversation,
-    edit_reminder_datetime_conversation,
-    check_and_send_reminders
+    edit_reminder_datetime_conversation
 )
 
 def register_handlers(app):
@@ -85,6 +86,8 @@ def register_handlers(app):
     app.add_handler(stats_handler)
     app.add_handler(chart_handler)
     app.add_handler(report_handler)
+    app.add_handler(trends_handler)
+    app.add_handler(insights_handler)
     app.add_handler(export_handler)
 
     # Бюджет и цели
@@ -1,14 +1,18 @@
-from telegram import Update
+import asyncio
+from telegram import InputFile, Update
 from telegram.ext import CallbackContext, CallbackQueryHandler, CommandHandler
+from telegram.error import BadRequest
 from keyboards.analytics_menu import analytics_menu_keyboard
 from services.logging_service import log_command_usage
 from services.analytics_service import (
     get_expense_stats,
-    generate_expense_chart,
-    export_transactions_to_excel,
-    get_transaction_report
+    get_transaction_report,
+    EXPORT_FORMATS
 )
-import os
+from services import export_queue
+from services.analytics_engine import get_spending_trends, get_spending_insights, from_epoch
+from services.async_database_service import run_blocking
+from services.chart_service import get_expense_chart, remember_file_id, forget_file_id
 
 
 async def handle_analytics_callback(update: Update, context: CallbackContext):
@@ -31,7 +35,7 @@ async def handle_stats_callback(update: Update, context: CallbackContext):
     user_id = update.callback_query.from_user.id
     await update.callback_query.answer()
 
-    stats_data = get_expense_stats(user_id)
+    stats_data = await run_blocking(get_expense_stats, user_id)
 
     if not stats_data:
         text = "📊 У вас ще немає даних про витрати."
@@ -49,29 +53,50 @@ async def handle_stats_callback(update: Update, context: CallbackContext):
     )
 
 
+async def _reply_no_chart_data(update: Update):
+    await update.callback_query.edit_message_text(
+        text="❌ Недостатньо даних для графіка.",
+        reply_markup=analytics_menu_keyboard()
+    )
+
+
 async def handle_chart_callback(update: Update, context: CallbackContext):
     await log_command_usage(update, context)
 
     user_id = update.callback_query.from_user.id
     await update.callback_query.answer()
 
-    file_path = generate_expense_chart(user_id)
+    chart = await get_expense_chart(user_id)
 
-    if not file_path:
-        await update.callback_query.edit_message_text(
-            text="❌ Недостатньо даних для графіка.",
-            reply_markup=analytics_menu_keyboard()
-        )
+    if not chart:
+        await _reply_no_chart_data(update)
         return
 
-    with open(file_path, "rb") as photo:
-        await context.bot.send_photo(
+    key, photo = chart
+    try:
+        message = await context.bot.send_photo(
+            chat_id=user_id,
+            photo=photo,
+            caption="📊 Ваш графік витрат."
+        )
+    except BadRequest:
+        if not isinstance(photo, str):
+            raise
+        # Збережений file_id більше не дійсний — надсилаємо сам файл
+        forget_file_id(key)
+        chart = await get_expense_chart(user_id, use_file_id=False)
+        if not chart:
+            await _reply_no_chart_data(update)
+            return
+        key, photo = chart
+        message = await context.bot.send_photo(
             chat_id=user_id,
             photo=photo,
             caption="📊 Ваш графік витрат."
         )
 
-    os.remove(file_path)
+    if isinstance(photo, bytes) and getattr(message, "photo", None):
+        remember_file_id(key, message.photo[-1].file_id)
 
     await context.bot.send_message(
         chat_id=user_id,
@@ -86,7 +111,7 @@ async def handle_report_callback(update: Update, context: CallbackContext):
     user_id = update.callback_query.from_user.id
     await update.callback_query.answer()
 
-    report = get_transaction_report(user_id, days=30)
+    report = await run_blocking(get_transaction_report, user_id, days=30)
 
     if report['transaction_count'] == 0:
         text = "📊 У вас ще немає даних про транзакції за останні 30 днів."
@@ -110,30 +135,170 @@ async def handle_report_callback(update: Update, context: CallbackContext):
     )
 
 
-async def handle_export_command(update: Update, context: CallbackContext):
+def _format_change(change):
+    if change is None:
+        return ""
+    arrow = "🔺" if change > 0 else "🔻"
+    return f" ({arrow} {change:+.0f}%)"
+
+
+async def handle_trends_callback(update: Update, context: CallbackContext):
     await log_command_usage(update, context)
 
-    user_id = update.effective_user.id
+    user_id = update.callback_query.from_user.id
+    await update.callback_query.answer()
+
+    trends = await run_blocking(get_spending_trends, user_id)
+
+    if trends['transaction_count'] == 0:
+        text = "📉 У вас ще немає даних про транзакції."
+    else:
+        text = "📉 *Тренди витрат*\n\n*По місяцях:*\n"
+        for month in trends['months']:
+            text += (f"🔹 {month['month']}: витрати {round(month['expense'], 2)} грн"
+                     f"{_format_change(month['expense_change'])}, доходи {round(month['income'], 2)} грн\n")
+
+        text += "\n*Середні витрати на день:*\n"
+        for window, (current, previous) in trends['rolling'].items():
+            change = (current - previous) / previous * 100 if previous else None
+            text += f"🔹 за {window} днів: {round(current, 2)} грн{_format_change(change)}\n"
+
+        text += "\n*По днях тижня (всього / в середньому):*\n"
+        for weekday, total, average in trends['weekdays']:
+            text += f"🔹 {weekday}: {round(total, 2)} / {round(average, 2)} грн\n"
+
+    await update.callback_query.edit_message_text(
+        text=text,
+        parse_mode="Markdown",
+        reply_markup=analytics_menu_keyboard()
+    )
+
+
+async def handle_insights_callback(update: Update, context: CallbackContext):
+    await log_command_usage(update, context)
+
+    user_id = update.callback_query.from_user.id
+    await update.callback_query.answer()
+
+    insights = await run_blocking(get_spending_insights, user_id)
+
+    if insights['expense_count'] == 0:
+        text = "🔍 У вас ще немає даних про витрати."
+    else:
+        percentiles = insights['percentiles']
+        text = f"🔍 *Аналіз витрат* ({insights['expense_count']} витрат)\n\n"
+        text += f"🔹 Медіана: {round(percentiles[50], 2)} грн\n"
+        text += f"🔹 25% витрат менші за {round(percentiles[25], 2)} грн\n"
+        text += f"🔹 75% витрат менші за {round(percentiles[75], 2)} грн\n"
+        text += f"🔹 90% витрат менші за {round(percentiles[90], 2)} грн\n"
+
+        if insights['anomalies']:
+            text += "\n⚠️ *Незвично великі витрати:*\n"
+            for timestamp, category, amount, _ in insights['anomalies']:
+                date = from_epoch(timestamp).strftime("%d.%m.%Y")
+                text += f"🔸 {date} — {category}: {round(amount, 2)} грн\n"
+        else:
+            text += "\n✅ Незвично великих витрат не знайдено."
+
+    await update.callback_query.edit_message_text(
+        text=text,
+        parse_mode="Markdown",
+        reply_markup=analytics_menu_keyboard()
+    )
 
-    file_path = export_transactions_to_excel(user_id)
 
-    if not file_path:
-        await update.message.reply_text("❌ У вас немає даних для експорту.")
+EXPORT_CAPTIONS = {
+    "xlsx": "📁 Ваші дані експортовані в Excel з форматуванням.",
+    "csv": "📁 Ваші дані експортовані в CSV.",
+    "csv.gz": "📁 Ваші дані експортовані в CSV (стиснуто gzip).",
+}
+
+
+EXPORT_PREPARING_TEXT = "⏳ Готую файл експорту…"
+
+
+async def _edit_export_message(message, text, reply_markup=None):
+    try:
+        await message.edit_text(text=text, reply_markup=reply_markup)
+    except BadRequest as e:
+        # Незмінений текст або видалене повідомлення не мають зривати експорт
+        print(f"Error editing export message: {e}")
+
+
+async def queue_export(bot, user_id, export_format, message=None, reply_markup=None, done_text=None):
+    """
+    Ставить експорт у фонову чергу і одразу повертається.
+
+    Повідомлення message (або нове з EXPORT_PREPARING_TEXT) показує прогрес,
+    а коли файл готовий, замінюється документом.
+    """
+    if message is None:
+        message = await bot.send_message(chat_id=user_id, text=EXPORT_PREPARING_TEXT)
+
+    async def on_progress(job):
+        done, total = job.progress
+        text = f"{EXPORT_PREPARING_TEXT}\nГотово {done} з {total} транзакцій"
+        if total:
+            text += f" ({done * 100 // total}%)"
+        await _edit_export_message(message, text)
+
+    async def on_done(job, result):
+        if job.error is not None:
+            await _edit_export_message(message, "❌ Не вдалося підготувати експорт. Спробуйте пізніше.",
+                                       reply_markup)
+            return
+        if not result:
+            await _edit_export_message(message, "❌ У вас немає даних для експорту.", reply_markup)
+            return
+
+        buffer, filename = result
+        with buffer:
+            # read_file_handle=False: PTB не читає файл у bytes, а віддає його httpx,
+            # який вивантажує буфер частинами; ім'я задаємо явно, бо в буфера його немає
+            await bot.send_document(
+                chat_id=user_id,
+                document=InputFile(buffer, filename=filename, read_file_handle=False),
+                caption=EXPORT_CAPTIONS[job.export_format]
+            )
+        try:
+            await message.delete()
+        except BadRequest as e:
+            print(f"Error deleting export message: {e}")
+
+        if done_text:
+            await bot.send_message(chat_id=user_id, text=done_text, reply_markup=reply_markup)
+
+    try:
+        _, created = export_queue.submit(user_id, export_format, on_progress, on_done)
+    except asyncio.QueueFull:
+        await _edit_export_message(message, "⏳ Зараз готується забагато експортів. Спробуйте за хвилину.",
+                                   reply_markup)
         return
 
-    with open(file_path, "rb") as doc:
-        await context.bot.send_document(
-            chat_id=user_id,
-            document=doc,
-            filename=f"transactions_{user_id}.xlsx",
-            caption="📁 Ваші дані експортовані в Excel з форматуванням."
+    if not created:
+        await _edit_export_message(message, "⏳ Цей експорт уже готується, файл надійде сюди, щойно буде готовий.")
+
+
+async def handle_export_command(update: Update, context: CallbackContext):
+    await log_command_usage(update, context)
+
+    user_id = update.effective_user.id
+    export_format = context.args[0].lower() if context.args else "xlsx"
+
+    if export_format not in EXPORT_FORMATS:
+        await update.message.reply_text(
+            "❌ Невідомий формат. Використання: /export [xlsx|csv|csv.gz]"
         )
+        return
 
-    os.remove(file_path)
+    message = await update.message.reply_text(EXPORT_PREPARING_TEXT)
+    await queue_export(context.bot, user_id, export_format, message=message)
 
 
 analytics_handler = CallbackQueryHandler(handle_analytics_callback, pattern='^analytics$')
 stats_handler = CallbackQueryHandler(handle_stats_callback, pattern='^stats$')
 chart_handler = CallbackQueryHandler(handle_chart_callback, pattern='^chart$')
 report_handler = CallbackQueryHandler(handle_report_callback, pattern='^report$')
+trends_handler = CallbackQueryHandler(handle_trends_callback, pattern='^trends$')
+insights_handler = CallbackQueryHandler(handle_insights_callback, pattern='^insights$')
 export_handler = CommandHandler('export', handle_export_command)
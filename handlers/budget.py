@@ -3,14 +3,22 @@ from telegram.ext import CallbackContext, CallbackQueryHandler, CommandHandler,
     ConversationHandler
 from keyboards.budget_menu import budget_menu_keyboard
 from services.logging_service import log_command_usage
-from services.database_service import (
-    add_goal, get_goals, set_budget, get_budgets,
+from services.async_database_service import (
+    add_goal, get_goals, set_budget, get_budgets, get_budget_periods, get_remaining_budget,
     add_piggy_bank_goal, get_piggy_bank_goals, add_funds_to_goal,
     delete_piggy_bank_goal, get_piggy_bank_goal
 )
 from utils.menu_utils import send_or_edit_menu
 
 
+def format_budget_period(category, limit_amount, spent, remaining):
+    """Рядок місячного ліміту категорії: витрачено, ліміт і залишок або перевищення."""
+    line = f"🔹 *{category}*: витрачено `{round(spent, 2)} грн` з `{round(limit_amount, 2)} грн`"
+    if remaining < 0:
+        return line + f", ⚠️ перевищено на `{round(-remaining, 2)} грн`"
+    return line + f", залишок `{round(remaining, 2)} грн`"
+
+
 async def handle_budgeting_callback(update: Update, context: CallbackContext):
     await log_command_usage(update, context)
     user = update.effective_user
@@ -38,7 +46,7 @@ async def handle_goal_callback(update: Update, context: CallbackContext):
             amount = float(context.args[0])
             description = " ".join(context.args[1:])
 
-            success = add_goal(user_id, amount, description)
+            success = await add_goal(user_id, amount, description)
 
             if success:
                 text = f"🎯 Ціль '{description}' на суму {amount} грн встановлена!"
@@ -54,7 +62,7 @@ async def handle_goal_callback(update: Update, context: CallbackContext):
         await send_or_edit_menu(update, context, text, back_button)
         return
 
-    goals = get_goals(user_id)
+    goals = await get_goals(user_id)
 
     if not goals:
         text = "🎯 У вас поки немає фінансових цілей."
@@ -104,12 +112,16 @@ async def handle_budget_callback(update: Update, context: CallbackContext):
             context.user_data['budget_message_id'] = msg.message_id
             return
 
-        success = set_budget(user_id, category, amount)
+        success = await set_budget(user_id, category, amount)
 
         if success:
+            text = f"✅ Бюджет для категорії '*{category}*' встановлено: *{amount} грн*"
+            remaining = await get_remaining_budget(user_id, category)
+            if remaining is not None:
+                text += f"\n📅 Залишок місячного ліміту: *{round(remaining, 2)} грн*"
             msg = await context.bot.send_message(
                 chat_id=user_id,
-                text=f"✅ Бюджет для категорії '*{category}*' встановлено: *{amount} грн*",
+                text=text,
                 parse_mode="Markdown",
                 reply_markup=back_button_markup
             )
@@ -122,7 +134,7 @@ async def handle_budget_callback(update: Update, context: CallbackContext):
         context.user_data['budget_message_id'] = msg.message_id
 
     else:
-        budgets = get_budgets(user_id)
+        budgets = await get_budgets(user_id)
 
         if not budgets:
             msg = await context.bot.send_message(
@@ -142,6 +154,12 @@ async def handle_budget_callback(update: Update, context: CallbackContext):
         for category, amount in budgets:
             message_lines.append(f"💰 *{category}*: `{amount} грн`")
 
+        periods = await get_budget_periods(user_id)
+        if periods:
+            message_lines.append("\n📅 *Ліміти на цей місяць:*")
+            for period in periods:
+                message_lines.append(format_budget_period(*period))
+
         msg = await context.bot.send_message(
             chat_id=user_id,
             text="\n".join(message_lines),
@@ -175,7 +193,7 @@ async def track_goals(update: Update, context: CallbackContext):
     if not user_id:
         return
 
-    goals = get_goals(user_id)
+    goals = await get_goals(user_id)
 
     if not goals:
         await context.bot.send_message(chat_id=user_id, text="🎯 У вас поки немає встановлених цілей.")
@@ -215,7 +233,7 @@ async def handle_piggy_bank_callback(update: Update, context: CallbackContext):
     if not user_id:
         return
 
-    goals = get_piggy_bank_goals(user_id)
+    goals = await get_piggy_bank_goals(user_id)
 
     keyboard = []
 
@@ -334,7 +352,7 @@ async def handle_piggy_bank_description_input(update: Update, context: CallbackC
     name = context.user_data.get('piggy_bank_name', '')
     amount = context.user_data.get('piggy_bank_amount', 0)
 
-    success = add_piggy_bank_goal(user_id, name, amount, description)
+    success = await add_piggy_bank_goal(user_id, name, amount, description)
 
     context.user_data.pop('piggy_bank_name', None)
     context.user_data.pop('piggy_bank_amount', None)
@@ -367,7 +385,7 @@ async def handle_piggy_bank_skip_description(update: Update, context: CallbackCo
     name = context.user_data.get('piggy_bank_name', '')
     amount = context.user_data.get('piggy_bank_amount', 0)
 
-    success = add_piggy_bank_goal(user_id, name, amount, "")
+    success = await add_piggy_bank_goal(user_id, name, amount, "")
 
     context.user_data.pop('piggy_bank_name', None)
     context.user_data.pop('piggy_bank_amount', None)
@@ -392,7 +410,7 @@ async def handle_piggy_bank_view(update: Update, context: CallbackContext):
     callback_data = update.callback_query.data
     goal_id = int(callback_data.split('_')[-1])
 
-    goal = get_piggy_bank_goal(user_id, goal_id)
+    goal = await get_piggy_bank_goal(user_id, goal_id)
 
     if not goal:
         await handle_piggy_bank_callback(update, context)
@@ -434,7 +452,7 @@ async def handle_piggy_bank_add_funds(update: Update, context: CallbackContext):
     callback_data = update.callback_query.data
     goal_id = int(callback_data.split('_')[-1])
 
-    goal = get_piggy_bank_goal(user_id, goal_id)
+    goal = await get_piggy_bank_goal(user_id, goal_id)
 
     if not goal or goal[6]:
         await handle_piggy_bank_callback(update, context)
@@ -453,7 +471,7 @@ async def handle_piggy_bank_add_funds(update: Update, context: CallbackContext):
 
     goal_id, name, target_amount, current_amount, _, _, _ = goal
 
-    budgets = get_budgets(user_id)
+    budgets = await get_budgets(user_id)
     total_budget = sum(amount for _, amount in budgets)
 
     text = (f"🐷 *{name}*\n\n"
@@ -491,7 +509,7 @@ async def handle_piggy_bank_funds_input(update: Update, context: CallbackContext
             )
             return ConversationHandler.END
 
-        goal = get_piggy_bank_goal(user_id, goal_id)
+        goal = await get_piggy_bank_goal(user_id, goal_id)
 
         if not goal:
             keyboard = [[InlineKeyboardButton("🔙 Назад до скарбнички", callback_data='piggy_bank')]]
@@ -505,7 +523,7 @@ async def handle_piggy_bank_funds_input(update: Update, context: CallbackContext
 
         goal_id, name, target_amount, current_amount, _, _, completed = goal
 
-        budgets = get_budgets(user_id)
+        budgets = await get_budgets(user_id)
         total_budget = sum(amount for _, amount in budgets)
 
         if total_budget < amount:
@@ -519,7 +537,7 @@ async def handle_piggy_bank_funds_input(update: Update, context: CallbackContext
             )
             return ConversationHandler.END
 
-        success = add_funds_to_goal(user_id, goal_id, amount)
+        success = await add_funds_to_goal(user_id, goal_id, amount)
 
         context.user_data.pop('piggy_bank_goal_id', None)
         context.user_data.pop('piggy_bank_state', None)
@@ -528,7 +546,7 @@ async def handle_piggy_bank_funds_input(update: Update, context: CallbackContext
         reply_markup = InlineKeyboardMarkup(keyboard)
 
         if success:
-            updated_goal = get_piggy_bank_goal(user_id, goal_id)
+            updated_goal = await get_piggy_bank_goal(user_id, goal_id)
             _, _, _, new_current_amount, _, _, new_completed = updated_goal
 
             if new_completed and not completed:
@@ -576,7 +594,7 @@ async def handle_piggy_bank_delete(update: Update, context: CallbackContext):
     callback_data = update.callback_query.data
     goal_id = int(callback_data.split('_')[-1])
 
-    goal = get_piggy_bank_goal(user_id, goal_id)
+    goal = await get_piggy_bank_goal(user_id, goal_id)
 
     if not goal:
         await handle_piggy_bank_callback(update, context)
@@ -608,7 +626,7 @@ async def handle_piggy_bank_delete_confirm(update: Update, context: CallbackCont
     callback_data = update.callback_query.data
     goal_id = int(callback_data.split('_')[-1])
 
-    goal = get_piggy_bank_goal(user_id, goal_id)
+    goal = await get_piggy_bank_goal(user_id, goal_id)
 
     if not goal:
         await handle_piggy_bank_callback(update, context)
@@ -616,7 +634,7 @@ async def handle_piggy_bank_delete_confirm(update: Update, context: CallbackCont
 
     goal_id, name, _, _, _, _, _ = goal
 
-    success = delete_piggy_bank_goal(user_id, goal_id)
+    success = await delete_piggy_bank_goal(user_id, goal_id)
 
     if success:
         await send_or_edit_menu(
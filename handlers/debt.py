@@ -9,7 +9,9 @@ from telegram.ext import (
 )
 from keyboards.debt_menu import debt_menu_keyboard
 from services.logging_service import log_command_usage
-from services.database_service import save_debt, get_active_debts, get_debt_history, close_debt, get_budgets, add_reminder
+from services.async_database_service import (
+    save_debt, get_active_debts, get_debt_history, close_debt, get_budgets, add_reminder, run_blocking
+)
 from services.transaction_service import add_new_transaction
 from datetime import datetime, time, timedelta
 import calendar
@@ -43,7 +45,7 @@ async def debt_menu_button_handler(update: Update, context: CallbackContext):
     user_id = query.from_user.id
 
     if query.data == "view_debts":
-        debts = get_active_debts(user_id)
+        debts = await get_active_debts(user_id)
         if debts:
             text = "📜 Ваші борги:\n\n"
 
@@ -64,7 +66,7 @@ async def debt_menu_button_handler(update: Update, context: CallbackContext):
         await query.message.edit_text(text, reply_markup=generate_back_button())
 
     elif query.data == "debt_history":
-        history = get_debt_history(user_id)
+        history = await get_debt_history(user_id)
         if history:
             text = "<b>📚 Історія боргів:</b>\n\n"
 
@@ -168,7 +170,7 @@ async def show_debts_by_category(update: Update, context: CallbackContext):
     await query.answer()
 
     user_id = query.from_user.id
-    debts = get_active_debts(user_id)
+    debts = await get_active_debts(user_id)
 
     if not debts:
         await query.message.edit_text(
@@ -249,7 +251,7 @@ async def handle_debt_reminder_options(update: Update, context: CallbackContext)
 
     # Handle set_debt_reminder callback
     if callback_data == "set_debt_reminder":
-        debts = get_active_debts(user_id)
+        debts = await get_active_debts(user_id)
         if not debts:
             await query.message.edit_text(
                 "✅ У вас немає активних боргів для нагадування.",
@@ -316,7 +318,7 @@ async def handle_debt_reminder_options(update: Update, context: CallbackContext)
             reminder_datetime = f"{reminder_date} {reminder_time}"
 
             title = f"Борг {name}: {amount}₴ ({debt_type_text}) - завтра термін оплати!"
-            reminder_id = add_reminder(user_id, title, reminder_datetime)
+            reminder_id = await add_reminder(user_id, title, reminder_datetime)
 
             if reminder_id:
                 await query.message.edit_text(
@@ -335,7 +337,7 @@ async def handle_debt_reminder_options(update: Update, context: CallbackContext)
             reminder_datetime = f"{reminder_date} {reminder_time}"
 
             title = f"Борг {name}: {amount}₴ ({debt_type_text}) - через тиждень термін оплати!"
-            reminder_id = add_reminder(user_id, title, reminder_datetime)
+            reminder_id = await add_reminder(user_id, title, reminder_datetime)
 
             if reminder_id:
                 await query.message.edit_text(
@@ -376,7 +378,7 @@ async def handle_debt_reminder_options(update: Update, context: CallbackContext)
         return
 
     # Get the debt information from active debts instead of parsing the callback data
-    debts = get_active_debts(user_id)
+    debts = await get_active_debts(user_id)
 
     # Extract the debt name from the callback data - everything between "debt_reminder_" and the last two underscores
     callback_parts = callback_data.split("_")
@@ -437,7 +439,7 @@ async def handle_debt_reminder_options(update: Update, context: CallbackContext)
     context.user_data['debt_reminder_type'] = debt_type
 
     # Get the due date for this debt
-    debts = get_active_debts(user_id)
+    debts = await get_active_debts(user_id)
     due_date = None
 
     for debt_name, debt_amount, debt_due_date, _ in debts:
@@ -507,7 +509,7 @@ async def handle_debt_action(update: Update, context: CallbackContext):
             await query.message.reply_text("❌ Помилка у форматі суми.")
             return
 
-        budgets = get_budgets(user_id)
+        budgets = await get_budgets(user_id)
         total_budget = sum(budget_amount for _, budget_amount in budgets)
 
         if total_budget < amount:
@@ -519,8 +521,8 @@ async def handle_debt_action(update: Update, context: CallbackContext):
             )
             return
 
-        if close_debt(user_id, name, -amount):
-            add_new_transaction(user_id, -amount, "Погашення боргу", "витрата")
+        if await close_debt(user_id, name, -amount):
+            await run_blocking(add_new_transaction, user_id, -amount, "Погашення боргу", "витрата")
 
             await query.message.edit_text(
                 f"✅ Ваш борг {name} на суму {amount}₴ погашено з бюджету.",
@@ -550,8 +552,8 @@ async def handle_debt_action(update: Update, context: CallbackContext):
             await query.message.reply_text("❌ Помилка у форматі суми.")
             return
 
-        if close_debt(user_id, name, amount):
-            add_new_transaction(user_id, amount, "Повернення боргу", "дохід")
+        if await close_debt(user_id, name, amount):
+            await run_blocking(add_new_transaction, user_id, amount, "Повернення боргу", "дохід")
 
             await query.message.edit_text(
                 f"✅ Борг {name} на суму {amount}₴ позначено як погашений. Суму додано до бюджету.",
@@ -614,7 +616,7 @@ async def handle_debt_action(update: Update, context: CallbackContext):
         if debt_type == "i_owe":
             amount = -amount
 
-        if close_debt(user_id, name, amount):
+        if await close_debt(user_id, name, amount):
             await query.message.edit_text(
                 f"✅ Борг {name} на суму {abs(amount)}₴ видалено з історії.",
                 reply_markup=InlineKeyboardMarkup(
@@ -652,7 +654,7 @@ async def save_debt_handler(update: Update, context: CallbackContext):
         await update.message.reply_text("❌ Введіть коректне число.")
         return DEBT_AMOUNT
 
-    if save_debt(user_id, debt_name, amount):
+    if await save_debt(user_id, debt_name, amount):
         await update.message.reply_text(f"✅ Борг збережено: {debt_name} — {amount}₴")
     else:
         await update.message.reply_text("❌ Сталася помилка при збереженні боргу.")
@@ -833,7 +835,7 @@ async def handle_time_selection(update: Update, context: CallbackContext):
                 return SELECT_TIME
 
             title = f"Борг {name}: {amount}₴ ({debt_type_text}) - нагадування про оплату!"
-            reminder_id = add_reminder(user_id, title, reminder_datetime_str)
+            reminder_id = await add_reminder(user_id, title, reminder_datetime_str)
 
             if reminder_id:
                 formatted_date = reminder_datetime.strftime("%d.%m.%Y %H:%M")
@@ -1055,7 +1057,7 @@ async def handle_date_selection(update: Update, context: CallbackContext):
 
         print(f"Saving debt: user_id={user_id}, debt_name='{debt_name}', debt_amount={debt_amount}, debt_type={debt_type}, due_date={due_date}")
 
-        save_result = save_debt(user_id, debt_name, debt_amount, due_date)
+        save_result = await save_debt(user_id, debt_name, debt_amount, due_date)
 
         print(f"Save result: {save_result}")
 
@@ -1103,7 +1105,7 @@ async def handle_debt_due_date_input(update: Update, context: CallbackContext):
 async def send_debt_reminder(context: CallbackContext):
     job = context.job
     user_id = job.chat_id
-    debts = get_active_debts(user_id)
+    debts = await get_active_debts(user_id)
     if debts:
         text = "🔔 Нагадування про борги:\n\n"
 
@@ -1163,7 +1165,7 @@ async def adddebt_command(update: Update, context: CallbackContext):
                 await update.message.reply_text("❌ Неправильний формат дати. Використовуйте формат РРРР-ММ-ДД (наприклад, 2023-12-31).")
                 return
 
-        if save_debt(update.effective_user.id, name, amount, due_date):
+        if await save_debt(update.effective_user.id, name, amount, due_date):
             due_date_text = f" (до {due_date})" if due_date else ""
             await update.message.reply_text(
                 f"✅ Борг додано: {name} — {amount}₴{due_date_text}",
@@ -1,6 +1,6 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import CallbackContext, CallbackQueryHandler, ConversationHandler, MessageHandler, filters
-import requests
+from services import currency_rates, rate_store
 from services.logging_service import log_command_usage
 
 WAITING_FOR_AMOUNT = 1
@@ -127,29 +127,25 @@ async def handle_to_currency_input(update: Update, context: CallbackContext):
 
 
 async def get_exchange_rate(from_currency, to_currency):
-    url = f"https://api.exchangerate-api.com/v4/latest/{from_currency}"
+    # Збережені курси рахуються локально; мережа потрібна, лише якщо знімка ще немає або він застарів
+    rate = rate_store.get_rate(from_currency, to_currency)
+    if rate is not None:
+        return rate
 
     try:
-        response = requests.get(url, timeout=5)
-        response.raise_for_status()
-        data = response.json()
-
-        rates = data.get("rates", {})
-        rate = rates.get(to_currency)
+        rates = await currency_rates.get_rates(from_currency)
+    except currency_rates.RateFetchError as e:
+        print(f"[Курс валют] ⚠️ Помилка запиту: {e}")
+        return None
 
-        if rate is None:
-            print(f"[Курс валют] ❌ Не знайдено курс: {from_currency} → {to_currency}")
-            return None
+    rate = rates.get(to_currency)
 
-        print(f"[Курс валют] 💱 Курс {from_currency} → {to_currency} = {rate}")
-        return rate
-
-    except requests.exceptions.Timeout:
-        print("[Курс валют] ⏱ Таймаут при отриманні курсу.")
-    except requests.exceptions.RequestException as e:
-        print(f"[Курс валют] ⚠️ Помилка запиту: {e}")
+    if rate is None:
+        print(f"[Курс валют] ❌ Не знайдено курс: {from_currency} → {to_currency}")
+        return None
 
-    return None
+    print(f"[Курс валют] 💱 Курс {from_currency} → {to_currency} = {rate}")
+    return rate
 
 
 async def cancel_conversion(update: Update, context: CallbackContext):
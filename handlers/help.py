@@ -34,7 +34,7 @@ async def handle_guide_callback(update: Update, context: CallbackContext):
    • /stats - Переглянути статистику витрат за категоріями
    • /chart - Згенерувати графіки витрат
    • /report [місяць] - Отримати звіт за місяць
-   • /export - Експортувати дані в Excel
+   • /export [xlsx|csv|csv.gz] - Експортувати дані в Excel або CSV
 
 3️⃣ <b>Бюджет та фінансові цілі</b>
    • /budget - Встановити та керувати місячним бюджетом
@@ -53,7 +53,7 @@ async def handle_guide_callback(update: Update, context: CallbackContext):
 
 6️⃣ <b>Синхронізація та експорт</b>
    • /sync - Синхронізувати дані з Google Таблицями
-   • /export - Експортувати транзакції в Excel
+   • /export [xlsx|csv|csv.gz] - Експортувати транзакції в Excel або CSV
 
 7️⃣ <b>Загальні команди</b>
    • /start - Запустити бота та відкрити головне меню
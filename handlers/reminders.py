@@ -5,10 +5,12 @@ from datetime import datetime, timedelta
 import calendar
 from keyboards.reminder_menu import reminder_menu_keyboard
 from services.logging_service import log_command_usage
-from services.database_service import (
+from services.async_database_service import (
     add_reminder, get_reminders, get_reminder,
-    update_reminder, delete_reminder, mark_reminder_completed
+    update_reminder, delete_reminder, mark_reminder_completed, get_pending_reminders
 )
+from services import reminder_scheduler
+from services.reminder_delivery import ReminderDelivery
 from .budget import handle_budgeting_callback
 
 TITLE, DATETIME, EDIT_TITLE, EDIT_DATETIME, SELECT_DATE, SELECT_TIME = range(6)
@@ -322,7 +324,7 @@ async def handle_time_selection(update: Update, context: CallbackContext):
             reminder_id = context.user_data.get('reminder_id')
 
             if reminder_id:
-                success = update_reminder(user_id, reminder_id, reminder_datetime=reminder_datetime_str)
+                success = await update_reminder(user_id, reminder_id, reminder_datetime=reminder_datetime_str)
                 keyboard = [
                     [InlineKeyboardButton("🔙 Назад до нагадування", callback_data=f'view_reminder_{reminder_id}')]]
                 reply_markup = InlineKeyboardMarkup(keyboard)
@@ -340,7 +342,7 @@ async def handle_time_selection(update: Update, context: CallbackContext):
                     )
             else:
                 title = context.user_data.get('reminder_title', '')
-                reminder_id = add_reminder(user_id, title, reminder_datetime_str)
+                reminder_id = await add_reminder(user_id, title, reminder_datetime_str)
 
                 keyboard = [[InlineKeyboardButton("🔙 Назад до нагадувань", callback_data='reminder')]]
                 reply_markup = InlineKeyboardMarkup(keyboard)
@@ -393,7 +395,7 @@ async def handle_reminder_datetime_input(update: Update, context: CallbackContex
 
         title = context.user_data.get('reminder_title', '')
 
-        reminder_id = add_reminder(user_id, title, reminder_datetime_str)
+        reminder_id = await add_reminder(user_id, title, reminder_datetime_str)
 
         keyboard = [[InlineKeyboardButton("🔙 Назад до нагадувань", callback_data='reminder')]]
         reply_markup = InlineKeyboardMarkup(keyboard)
@@ -433,7 +435,7 @@ async def handle_list_reminders(update: Update, context: CallbackContext):
     user_id = update.callback_query.from_user.id
     await update.callback_query.answer()
 
-    reminders = get_reminders(user_id)
+    reminders = await get_reminders(user_id)
 
     # Check if we're coming from the debt menu
     from_debt_menu = context.user_data.get('return_to_debt_menu', False)
@@ -478,7 +480,7 @@ async def handle_view_reminder(update: Update, context: CallbackContext):
     callback_data = update.callback_query.data
     reminder_id = int(callback_data.split('_')[-1])
 
-    reminder = get_reminder(user_id, reminder_id)
+    reminder = await get_reminder(user_id, reminder_id)
 
     if not reminder:
         await handle_list_reminders(update, context)
@@ -534,7 +536,7 @@ async def handle_edit_reminder(update: Update, context: CallbackContext):
 
     context.user_data['reminder_id'] = reminder_id
 
-    reminder = get_reminder(user_id, reminder_id)
+    reminder = await get_reminder(user_id, reminder_id)
 
     if not reminder:
         await handle_list_reminders(update, context)
@@ -569,7 +571,7 @@ async def handle_edit_reminder_title(update: Update, context: CallbackContext):
         await handle_list_reminders(update, context)
         return
 
-    reminder = get_reminder(user_id, reminder_id)
+    reminder = await get_reminder(user_id, reminder_id)
 
     if not reminder:
         await handle_list_reminders(update, context)
@@ -607,7 +609,7 @@ async def handle_edit_reminder_title_input(update: Update, context: CallbackCont
         )
         return ConversationHandler.END
 
-    success = update_reminder(user_id, reminder_id, title=new_title)
+    success = await update_reminder(user_id, reminder_id, title=new_title)
 
     keyboard = [[InlineKeyboardButton("🔙 Назад до нагадування", callback_data=f'view_reminder_{reminder_id}')]]
     reply_markup = InlineKeyboardMarkup(keyboard)
@@ -639,7 +641,7 @@ async def handle_edit_reminder_datetime(update: Update, context: CallbackContext
         await handle_list_reminders(update, context)
         return
 
-    reminder = get_reminder(user_id, reminder_id)
+    reminder = await get_reminder(user_id, reminder_id)
 
     if not reminder:
         await handle_list_reminders(update, context)
@@ -691,7 +693,7 @@ async def handle_edit_reminder_datetime_input(update: Update, context: CallbackC
         reminder_datetime = datetime.strptime(datetime_text, "%Y-%m-%d %H:%M")
         reminder_datetime_str = reminder_datetime.strftime("%Y-%m-%d %H:%M:%S")
 
-        success = update_reminder(user_id, reminder_id, reminder_datetime=reminder_datetime_str)
+        success = await update_reminder(user_id, reminder_id, reminder_datetime=reminder_datetime_str)
 
         keyboard = [[InlineKeyboardButton("🔙 Назад до нагадування", callback_data=f'view_reminder_{reminder_id}')]]
         reply_markup = InlineKeyboardMarkup(keyboard)
@@ -729,7 +731,7 @@ async def handle_complete_reminder(update: Update, context: CallbackContext):
     callback_data = update.callback_query.data
     reminder_id = int(callback_data.split('_')[-1])
 
-    reminder = get_reminder(user_id, reminder_id)
+    reminder = await get_reminder(user_id, reminder_id)
 
     if not reminder:
         await handle_list_reminders(update, context)
@@ -737,7 +739,7 @@ async def handle_complete_reminder(update: Update, context: CallbackContext):
 
     _, title, _, _, _ = reminder
 
-    success = mark_reminder_completed(user_id, reminder_id)
+    success = await mark_reminder_completed(user_id, reminder_id)
 
     if success:
         # Check if we're coming from the debt menu
@@ -764,7 +766,7 @@ async def handle_delete_reminder(update: Update, context: CallbackContext):
     callback_data = update.callback_query.data
     reminder_id = int(callback_data.split('_')[-1])
 
-    reminder = get_reminder(user_id, reminder_id)
+    reminder = await get_reminder(user_id, reminder_id)
 
     if not reminder:
         await handle_list_reminders(update, context)
@@ -793,7 +795,7 @@ async def handle_delete_reminder_confirm(update: Update, context: CallbackContex
     callback_data = update.callback_query.data
     reminder_id = int(callback_data.split('_')[-1])
 
-    reminder = get_reminder(user_id, reminder_id)
+    reminder = await get_reminder(user_id, reminder_id)
 
     if not reminder:
         await handle_list_reminders(update, context)
@@ -801,7 +803,7 @@ async def handle_delete_reminder_confirm(update: Update, context: CallbackContex
 
     _, title, _, _, _ = reminder
 
-    success = delete_reminder(user_id, reminder_id)
+    success = await delete_reminder(user_id, reminder_id)
 
     if success:
         # Check if we're coming from the debt menu
@@ -884,31 +886,54 @@ delete_reminder_handler = CallbackQueryHandler(handle_delete_reminder, pattern='
 delete_reminder_confirm_handler = CallbackQueryHandler(handle_delete_reminder_confirm,
                                                        pattern='^delete_reminder_confirm_[0-9]+$')
 
-async def check_and_send_reminders(context: CallbackContext):
-    from services.database_service import get_due_reminders, mark_reminder_completed
+async def send_reminder_message(bot, reminder_id, user_id, title, reminder_datetime):
+    dt = datetime.strptime(reminder_datetime, "%Y-%m-%d %H:%M:%S")
+    formatted_datetime = dt.strftime("%d.%m.%Y %H:%M")
 
-    due_reminders = get_due_reminders()
+    keyboard = [
+        [InlineKeyboardButton("✅ Відмітити як виконане", callback_data=f'complete_reminder_{reminder_id}')],
+        [InlineKeyboardButton("📋 Мої нагадування", callback_data='list_reminders')]
+    ]
+    reply_markup = InlineKeyboardMarkup(keyboard)
 
-    for reminder_id, user_id, title, reminder_datetime in due_reminders:
-        try:
-            dt = datetime.strptime(reminder_datetime, "%Y-%m-%d %H:%M:%S")
-            formatted_datetime = dt.strftime("%d.%m.%Y %H:%M")
+    await bot.send_message(
+        chat_id=user_id,
+        text=f"⏰ *НАГАДУВАННЯ*\n\n"
+             f"📝 *{title}*\n"
+             f"⏰ Час: *{formatted_datetime}*",
+        parse_mode="Markdown",
+        reply_markup=reply_markup
+    )
 
-            keyboard = [
-                [InlineKeyboardButton("✅ Відмітити як виконане", callback_data=f'complete_reminder_{reminder_id}')],
-                [InlineKeyboardButton("📋 Мої нагадування", callback_data='list_reminders')]
-            ]
-            reply_markup = InlineKeyboardMarkup(keyboard)
 
-            await context.bot.send_message(
-                chat_id=user_id,
-                text=f"⏰ *НАГАДУВАННЯ*\n\n"
-                     f"📝 *{title}*\n"
-                     f"⏰ Час: *{formatted_datetime}*",
-                parse_mode="Markdown",
-                reply_markup=reply_markup
-            )
+async def send_due_reminders(bot, reminders, delivery=None):
+    """
+    Доставка для планувальника нагадувань. Перед відправкою нагадування
+    перевіряються в базі, тож видалені чи виконані за межами бота не надсилаються.
+    """
+    rows = await get_pending_reminders([reminder[0] for reminder in reminders])
+    if rows is None:
+        # База недоступна: не знаємо, що ще актуальне, тож перевіримо пізніше
+        for reminder in reminders:
+            reminder_scheduler.retry_later(*reminder)
+        return
+    pending = {row[0] for row in rows}
+    reminders = [reminder for reminder in reminders if reminder[0] in pending]
+    if not reminders:
+        return
+
+    delivery = delivery or ReminderDelivery()
+    report = await delivery.deliver(
+        reminders, lambda *reminder: send_reminder_message(bot, *reminder))
+
+    for reminder in report["failed"]:
+        # Після RetryAfter повторюємо тоді, коли дозволив Telegram
+        delay = report["retry_after"].get(reminder[0], reminder_scheduler.RETRY_DELAY)
+        reminder_scheduler.retry_later(*reminder, delay=delay)
+
 
-            mark_reminder_completed(user_id, reminder_id)
-        except Exception as e:
-            print(f"Error sending reminder: {e}")
+async def start_reminder_scheduler(application):
+    # Один ReminderDelivery на весь час роботи: ліміти діють між спрацюваннями
+    delivery = ReminderDelivery()
+    reminders = await get_pending_reminders() or ()
+    await reminder_scheduler.start(lambda due: send_due_reminders(application.bot, due, delivery), reminders)
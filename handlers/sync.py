@@ -1,10 +1,11 @@
+import asyncio
+
 from telegram import Update
 from telegram.ext import CallbackContext, CallbackQueryHandler, CommandHandler
 from keyboards.sync_menu import sync_menu_keyboard
 from services.logging_service import log_command_usage
-from services.sync_service import sync_with_google_sheets
-from services.analytics_service import export_transactions_to_excel
-import os
+from services import sync_queue
+from handlers.analytics import queue_export, EXPORT_PREPARING_TEXT
 
 
 async def handle_sync_menu_callback(update: Update, context: CallbackContext):
@@ -33,13 +34,29 @@ async def handle_sync_callback(update: Update, context: CallbackContext):
         reply_markup=None
     )
 
-    success, message = sync_with_google_sheets(user_id)
+    async def on_done(job, result):
+        success, message = result
+        await context.bot.send_message(
+            chat_id=user_id,
+            text=message,
+            reply_markup=sync_menu_keyboard()
+        )
 
-    await context.bot.send_message(
-        chat_id=user_id,
-        text=message,
-        reply_markup=sync_menu_keyboard()
-    )
+    try:
+        _, created = sync_queue.submit(user_id, on_done)
+    except asyncio.QueueFull:
+        await context.bot.send_message(
+            chat_id=user_id,
+            text="⏳ Зараз забагато запитів на синхронізацію. Спробуйте за хвилину.",
+            reply_markup=sync_menu_keyboard()
+        )
+        return
+
+    if not created:
+        await update.callback_query.edit_message_text(
+            text="⏳ Синхронізація вже в черзі, результат надійде сюди, щойно вона завершиться.",
+            reply_markup=None
+        )
 
 
 async def handle_export_callback(update: Update, context: CallbackContext):
@@ -49,29 +66,18 @@ async def handle_export_callback(update: Update, context: CallbackContext):
     user_id = update.callback_query.from_user.id
     await update.callback_query.answer()
 
-    file_path = export_transactions_to_excel(user_id)
-
-    if not file_path:
-        await update.callback_query.edit_message_text(
-            text="❌ У вас немає даних для експорту.",
-            reply_markup=sync_menu_keyboard()
-        )
-        return
-
-    with open(file_path, "rb") as doc:
-        await context.bot.send_document(
-            chat_id=user_id,
-            document=doc,
-            filename=f"transactions_{user_id}.xlsx",
-            caption="📁 Ваші дані експортовані в Excel з форматуванням."
-        )
-
-    os.remove(file_path)
+    message = await update.callback_query.edit_message_text(
+        text=EXPORT_PREPARING_TEXT,
+        reply_markup=None
+    )
 
-    await context.bot.send_message(
-        chat_id=user_id,
-        text="📁 Експорт даних в Excel завершено.",
-        reply_markup=sync_menu_keyboard()
+    await queue_export(
+        context.bot,
+        user_id,
+        "xlsx",
+        message=message,
+        reply_markup=sync_menu_keyboard(),
+        done_text="📁 Експорт даних в Excel завершено."
     )
 
 
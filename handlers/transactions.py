@@ -4,15 +4,27 @@ from keyboards.transaction_menu import transaction_menu_keyboard
 from services.logging_service import log_command_usage
 from services.transaction_service import (
     add_new_transaction,
+    get_month_budget_remaining,
     get_user_transaction_history,
     filter_user_transactions,
     get_user_last_transaction,
     delete_user_transaction
 )
+from services.async_database_service import run_blocking
+from services import sync_queue
 from models.transaction import Transaction
 from utils.menu_utils import send_or_edit_menu
 
 
+async def transaction_added_text(user_id, transaction):
+    text = f"✅ Транзакция добавлена:\n💰 {transaction.amount} | 📂 {transaction.category} | 🔹 {transaction.transaction_type}"
+    if transaction.transaction_type == "витрата":
+        remaining = await run_blocking(get_month_budget_remaining, user_id, transaction.category)
+        if remaining is not None:
+            text += f"\n📅 Остаток месячного лимита: {round(remaining, 2)} грн"
+    return text
+
+
 async def handle_transactions_callback(update: Update, context: CallbackContext):
     await log_command_usage(update, context)
     user = update.effective_user
@@ -51,14 +63,15 @@ async def add_transaction(update: Update, context: CallbackContext):
     category = " ".join(context.args[1:])
     user_id = update.effective_user.id
 
-    transaction = add_new_transaction(user_id, amount, category)
+    transaction = await run_blocking(add_new_transaction, user_id, amount, category)
 
     reply_markup = InlineKeyboardMarkup([[
         InlineKeyboardButton("🔙 К транзакциям", callback_data="transactions")
     ]])
 
     if transaction:
-        text = f"✅ Транзакция добавлена:\n💰 {transaction.amount} | 📂 {transaction.category} | 🔹 {transaction.transaction_type}"
+        text = await transaction_added_text(user_id, transaction)
+        sync_queue.schedule_auto_sync(user_id)
     else:
         text = "❌ Ошибка при добавлении транзакции. Пожалуйста, попробуйте еще раз."
     await send_or_edit_menu(update, context, text, reply_markup)
@@ -118,10 +131,11 @@ async def handle_category_input(update: Update, context: CallbackContext):
     user_id = update.effective_user.id
     amount = context.user_data.get('amount')
 
-    transaction = add_new_transaction(user_id, amount, category)
+    transaction = await run_blocking(add_new_transaction, user_id, amount, category)
 
     if transaction:
-        text = f"✅ Транзакция добавлена:\n💰 {transaction.amount} | 📂 {transaction.category} | 🔹 {transaction.transaction_type}"
+        text = await transaction_added_text(user_id, transaction)
+        sync_queue.schedule_auto_sync(user_id)
 
         reply_markup = InlineKeyboardMarkup([[
             InlineKeyboardButton("🔙 К транзакциям", callback_data="transactions")
@@ -152,7 +166,7 @@ async def history(update: Update, context: CallbackContext):
     if not user_id:
         return
 
-    transactions = get_user_transaction_history(user_id, limit=10)
+    transactions = await run_blocking(get_user_transaction_history, user_id, limit=10)
 
     if not transactions:
         text = "📜 У вас еще нет транзакций."
@@ -186,7 +200,7 @@ async def filter_transactions(update: Update, context: CallbackContext):
 
     filter_param = " ".join(args)
 
-    transactions = filter_user_transactions(user_id, filter_param)
+    transactions = await run_blocking(filter_user_transactions, user_id, filter_param)
 
     if not transactions:
         await send_or_edit_menu(
@@ -223,7 +237,7 @@ async def undo_transaction(update: Update, context: CallbackContext):
     if not user_id:
         return
 
-    transaction = get_user_last_transaction(user_id)
+    transaction = await run_blocking(get_user_last_transaction, user_id)
 
     if not transaction:
         text = "❌ У вас нет транзакций для отмены."
@@ -233,9 +247,10 @@ async def undo_transaction(update: Update, context: CallbackContext):
         await send_or_edit_menu(update, context, text, reply_markup)
         return
 
-    success = delete_user_transaction(transaction.id)
+    success = await run_blocking(delete_user_transaction, transaction.id)
 
     if success:
+        sync_queue.schedule_auto_sync(user_id)
         text = f"✅ Последняя транзакция отменена:\n📅 {transaction.timestamp} | 💰 {transaction.amount} грн | 📂 {transaction.category} ({transaction.transaction_type})"
     else:
         text = "❌ Ошибка при отмене транзакции. Пожалуйста, попробуйте еще раз."
@@ -5,5 +5,7 @@ def analytics_menu_keyboard():
         [InlineKeyboardButton("📈 Статистика", callback_data='stats')],
         [InlineKeyboardButton("📊 Графіки", callback_data='chart')],
         [InlineKeyboardButton("📅 Звіт", callback_data='report')],
+        [InlineKeyboardButton("📉 Тренди витрат", callback_data='trends')],
+        [InlineKeyboardButton("🔍 Аналіз витрат", callback_data='insights')],
         [InlineKeyboardButton("🔙 Назад", callback_data='main_menu')]
     ])
\ No newline at end of file
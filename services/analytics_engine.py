@@ -0,0 +1,318 @@
+"""
+Векторизована аналітика витрат на NumPy.
+
+Транзакції користувача один раз читаються з бази в компактні стовпці
+(секунди епохи int64, суми float64, код категорії в словнику категорій),
+після чого тренди, ковзні середні, розподіл за днями тижня, перцентилі й
+аномалії рахуються операціями над масивами без повторних запитів і циклів
+Python по транзакціях. get_columns бере стовпці зі спільного кешу знімків
+(services/snapshot_cache), тож базу читає лише перший перегляд після змін.
+
+Час у базі записаний як локальний без часового поясу; datetime64 трактує
+його як UTC, тож межі днів і місяців у стовпцях збігаються з локальними.
+"""
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from services import snapshot_cache
+from services.connection_pool import connect
+
+DATABASE_FILE = "finance_bot.db"
+
+SECONDS_PER_DAY = 86400
+
+# Ціле значення NaT у datetime64: так позначаються рядки з некоректним часом
+NAT = np.iinfo(np.int64).min
+
+ROLLING_WINDOWS = (7, 30)
+
+PERCENTILES = (25, 50, 75, 90)
+
+WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Нд")
+
+# Модифікований z-бал (Iglewicz, Hoaglin): |0.6745 * (x - медіана) / MAD| > 3.5 — викид
+ANOMALY_THRESHOLD = 3.5
+
+# Аномалії шукаються лише в категоріях, де достатньо витрат для медіани
+ANOMALY_MIN_GROUP = 5
+
+
+INCOME = "дохід"
+EXPENSE = "витрата"
+
+
+def _encode(values):
+    """
+    Коди рядків у словнику: хешування дешевше за np.unique, що сортує масив об'єктів.
+    NULL з бази стає порожнім рядком, щоб словник містив лише рядки.
+    """
+    index = {}
+    codes = np.fromiter((index.setdefault("" if value is None else value, len(index)) for value in values),
+                        dtype=np.int32, count=len(values))
+    return codes, list(index)
+
+
+class TransactionColumns:
+    """Транзакції користувача у вигляді стовпців, впорядковані за часом."""
+
+    def __init__(self, timestamps, amounts, category_codes, categories, type_codes, types):
+        self.timestamps = timestamps  # int64, секунди епохи
+        self.amounts = amounts  # float64, зі знаком, як у базі
+        self.category_codes = category_codes  # int32, індекси в categories
+        self.categories = categories  # список назв категорій
+        self.type_codes = type_codes  # int32, індекси в types
+        self.types = types  # список типів ("дохід", "витрата", ...)
+        self.is_expense = self._type_mask(EXPENSE)
+        self.is_income = self._type_mask(INCOME)
+
+    def _type_mask(self, name):
+        if name not in self.types:
+            return np.zeros(len(self.type_codes), dtype=bool)
+        return self.type_codes == self.types.index(name)
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def nbytes(self):
+        arrays = (self.timestamps, self.amounts, self.category_codes, self.type_codes,
+                  self.is_expense, self.is_income)
+        names = self.categories + self.types
+        return sum(array.nbytes for array in arrays) + sum(len(name.encode("utf-8")) for name in names)
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Будує стовпці з рядків (час, amount, category, type); час — рядок з бази або epoch."""
+        if not rows:
+            return cls(np.empty(0, np.int64), np.empty(0, np.float64), np.empty(0, np.int32), [],
+                       np.empty(0, np.int32), [])
+
+        timestamps, amounts, categories, types = zip(*rows)
+        category_codes, category_names = _encode(categories)
+        type_codes, type_names = _encode(types)
+        epochs = _parse_epochs(timestamps)
+        valid = epochs != NAT
+        return cls(epochs[valid], np.array(amounts, dtype=np.float64)[valid], category_codes[valid],
+                   category_names, type_codes[valid], type_names)
+
+    def expenses(self):
+        """(час, сума витрати як додатне число, код категорії) лише для витрат."""
+        mask = self.is_expense
+        return self.timestamps[mask], np.abs(self.amounts[mask]), self.category_codes[mask]
+
+
+def _parse_epochs(values):
+    """Рядки 'YYYY-MM-DD HH:MM:SS' (або секунди) у секунди епохи; некоректні значення стають NAT."""
+    try:
+        return np.array(values, dtype="datetime64[s]").astype(np.int64)
+    except ValueError:
+        return np.array([_parse_epoch(value) for value in values], dtype=np.int64)
+
+
+def _parse_epoch(value):
+    try:
+        return np.datetime64(value, "s").astype(np.int64)
+    except (TypeError, ValueError):
+        return NAT
+
+
+def load_columns(user_id):
+    """Читає всі транзакції користувача одним запитом у TransactionColumns (без кешу)."""
+    conn = connect(DATABASE_FILE)
+    try:
+        cursor = conn.cursor()
+        # Час розбирає NumPy одним викликом: це швидше, ніж strftime('%s') для кожного рядка в SQLite
+        cursor.execute("""
+                       SELECT timestamp, amount, category, type
+                       FROM transactions
+                       WHERE user_id = ?
+                       ORDER BY timestamp, id
+                       """, (user_id,))
+        return TransactionColumns.from_rows(cursor.fetchall())
+    finally:
+        conn.close()
+
+
+def get_columns(user_id):
+    """Знімок транзакцій користувача зі спільного кешу; база читається лише після змін."""
+    return snapshot_cache.get(user_id, load_columns)
+
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def _epoch(now):
+    # Той самий «локальний як UTC» відлік, що й у стовпцях
+    return int((now - EPOCH).total_seconds())
+
+
+def from_epoch(seconds):
+    """Секунди зі стовпця timestamps назад у локальний datetime."""
+    return EPOCH + timedelta(seconds=int(seconds))
+
+
+def monthly_trends(columns, months=6):
+    """
+    Доходи й витрати за останні months календарних місяців і зміна витрат до попереднього.
+
+    Returns:
+        list: словники {month: "YYYY-MM", income, expense, expense_change (% або None)}
+    """
+    if not len(columns):
+        return []
+
+    month_index = columns.timestamps.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64)
+    first = month_index.min()
+    span = month_index.max() - first + 1
+    offsets = month_index - first
+
+    income = np.bincount(offsets, weights=np.where(columns.is_income, columns.amounts, 0.0), minlength=span)
+    expense = np.bincount(offsets, weights=np.where(columns.is_expense, np.abs(columns.amounts), 0.0),
+                          minlength=span)
+
+    previous = np.concatenate(([np.nan], expense[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        change = np.where(previous > 0, (expense - previous) / previous * 100, np.nan)
+
+    labels = np.arange(first, first + span).astype("datetime64[M]").astype(str)
+    start = max(0, span - months)
+    return [
+        {
+            "month": str(labels[i]),
+            "income": float(income[i]),
+            "expense": float(expense[i]),
+            "expense_change": None if np.isnan(change[i]) else float(change[i]),
+        }
+        for i in range(start, span)
+    ]
+
+
+def daily_expenses(columns, days, now=None):
+    """Витрати за кожен з останніх days днів (включно з сьогоднішнім), від старих до нових."""
+    today = _epoch(now or datetime.now()) // SECONDS_PER_DAY
+    timestamps, spend, _ = columns.expenses()
+    offsets = timestamps // SECONDS_PER_DAY - (today - days + 1)
+    mask = (offsets >= 0) & (offsets < days)
+    return np.bincount(offsets[mask], weights=spend[mask], minlength=days)[:days]
+
+
+def rolling_averages(columns, windows=ROLLING_WINDOWS, now=None):
+    """
+    Ковзні середні витрат на день для кожного вікна: поточне значення і значення вікном раніше.
+
+    Returns:
+        dict: {вікно: (середнє за останні N днів, середнє за попередні N днів)}
+    """
+    longest = max(windows)
+    series = daily_expenses(columns, 2 * longest, now)
+    cumulative = np.concatenate(([0.0], np.cumsum(series)))
+    end = len(series)
+    return {
+        window: (float((cumulative[end] - cumulative[end - window]) / window),
+                 float((cumulative[end - window] - cumulative[end - 2 * window]) / window))
+        for window in windows
+    }
+
+
+def weekday_spending(columns):
+    """
+    Витрати за днями тижня (Пн–Нд): сума і середнє на один такий день з витратами.
+
+    Returns:
+        list: кортежі (назва дня, сума, середнє)
+    """
+    timestamps, spend, _ = columns.expenses()
+    days = timestamps // SECONDS_PER_DAY
+    # 1 січня 1970 — четвер, тож (день + 3) % 7 дає 0 для понеділка
+    weekdays = (days + 3) % 7
+    totals = np.bincount(weekdays, weights=spend, minlength=7)
+
+    unique_days = np.unique(days)
+    day_counts = np.bincount((unique_days + 3) % 7, minlength=7)
+    averages = np.divide(totals, day_counts, out=np.zeros(7), where=day_counts > 0)
+    return [(WEEKDAYS[i], float(totals[i]), float(averages[i])) for i in range(7)]
+
+
+def expense_percentiles(columns, percentiles=PERCENTILES):
+    """Медіана і перцентилі окремих витрат: {перцентиль: сума} або {} без витрат."""
+    _, spend, _ = columns.expenses()
+    if not len(spend):
+        return {}
+    values = np.percentile(spend, percentiles)
+    return {p: float(value) for p, value in zip(percentiles, values)}
+
+
+def _group_medians(values, codes, groups):
+    """Медіани values в межах кожного коду одним сортуванням."""
+    order = np.lexsort((values, codes))
+    sorted_values = values[order]
+    counts = np.bincount(codes, minlength=groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    lower = starts + np.maximum(counts - 1, 0) // 2
+    upper = starts + counts // 2
+    medians = np.full(groups, np.nan)
+    present = counts > 0
+    medians[present] = (sorted_values[lower[present]] + sorted_values[upper[present]]) / 2
+    return medians, counts
+
+
+def find_anomalies(columns, threshold=ANOMALY_THRESHOLD, min_group=ANOMALY_MIN_GROUP):
+    """
+    Витрати, незвично великі для своєї категорії (модифікований z-бал за медіаною та MAD).
+
+    Returns:
+        list: кортежі (час epoch, категорія, сума, z-бал), від найбільшого відхилення
+    """
+    timestamps, spend, codes = columns.expenses()
+    if not len(spend):
+        return []
+
+    groups = len(columns.categories)
+    medians, counts = _group_medians(spend, codes, groups)
+    deviations = np.abs(spend - medians[codes])
+    mads, _ = _group_medians(deviations, codes, groups)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        scores = 0.6745 * (spend - medians[codes]) / mads[codes]
+    flagged = (counts[codes] >= min_group) & (mads[codes] > 0) & (scores > threshold)
+
+    indices = np.flatnonzero(flagged)
+    indices = indices[np.argsort(-scores[indices])]
+    return [(int(timestamps[i]), columns.categories[codes[i]], float(spend[i]), float(scores[i]))
+            for i in indices]
+
+
+def _category_totals(columns, mask):
+    """Суми amount за категоріями серед рядків mask, від більшої до меншої."""
+    totals = np.bincount(columns.category_codes[mask], weights=columns.amounts[mask],
+                         minlength=len(columns.categories))
+    present = np.bincount(columns.category_codes[mask], minlength=len(columns.categories)) > 0
+    order = [i for i in np.argsort(-totals, kind="stable") if present[i]]
+    return [(columns.categories[i], float(totals[i])) for i in order]
+
+
+def expense_by_category(columns):
+    """Суми витрат (зі знаком, як у базі) за категоріями, як GROUP BY category ORDER BY SUM DESC."""
+    return _category_totals(columns, columns.is_expense)
+
+
+def get_spending_trends(user_id, months=6, now=None):
+    """Тренди витрат користувача: помісячно, ковзні середні та дні тижня."""
+    columns = get_columns(user_id)
+    return {
+        "transaction_count": len(columns),
+        "months": monthly_trends(columns, months),
+        "rolling": rolling_averages(columns, now=now),
+        "weekdays": weekday_spending(columns),
+    }
+
+
+def get_spending_insights(user_id, limit=5):
+    """Статистика окремих витрат: перцентилі й найбільші аномалії."""
+    columns = get_columns(user_id)
+    return {
+        "expense_count": int(columns.is_expense.sum()),
+        "percentiles": expense_percentiles(columns),
+        "anomalies": find_anomalies(columns)[:limit],
+    }
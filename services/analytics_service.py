@@ -1,253 +1,377 @@
-import sqlite3
 import csv
+import gzip
+import io
+import itertools
 import os
+import tempfile
 from datetime import datetime
-import matplotlib.pyplot as plt
 from models.transaction import Transaction
+from services.analytics_engine import expense_by_category, get_columns
+from services.connection_pool import connect
 import openpyxl
-from openpyxl.styles import Font, Alignment, PatternFill, Border, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, Alignment, PatternFill, Border, Side, NamedStyle
 from openpyxl.utils import get_column_letter
 
 DATABASE_FILE = "finance_bot.db"
 
 
 def get_expense_stats(user_id):
+    """Суми витрат за категоріями зі спільного знімка транзакцій (analytics_engine)."""
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        cursor.execute("""
-                       SELECT category, SUM(amount)
-                       FROM transactions
-                       WHERE user_id = ?
-                         AND type = 'витрата'
-                       GROUP BY category
-                       ORDER BY SUM(amount) DESC
-                       """, (user_id,))
-
-        stats_data = cursor.fetchall()
-        return stats_data
+        return expense_by_category(get_columns(user_id))
     except Exception as e:
         print(f"Error getting expense stats: {e}")
         return []
-    finally:
-        conn.close()
 
 
-def generate_expense_chart(user_id):
+EXPORT_CHUNK_SIZE = 1000
+
+EXPORT_HEADERS = ["Дата", "Сума", "Категорія", "Тип"]
+
+EXPORT_FORMATS = ("xlsx", "csv", "csv.gz")
+
+# Поріг, після якого буфер експорту переноситься з пам'яті на диск
+EXPORT_SPOOL_SIZE = 1024 * 1024
+
+# Формат дати в експорті завжди має 16 символів ("31.12.2024 18:30")
+EXPORT_DATE_WIDTH = 16
+
+
+def iter_user_transactions(cursor, user_id, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Віддає транзакції користувача (timestamp, amount, category, type), від нових до старих.
+
+    Кожна порція — окремий запит з продовженням від останнього рядка (keyset),
+    тож довгий експорт не тримає блокування читання між порціями і не заважає записам.
+    """
+    last = None
+    while True:
+        if last is None:
+            cursor.execute("""
+                           SELECT id, timestamp, amount, category, type
+                           FROM transactions
+                           WHERE user_id = ?
+                           ORDER BY timestamp DESC, id DESC
+                           LIMIT ?
+                           """, (user_id, chunk_size))
+        else:
+            cursor.execute("""
+                           SELECT id, timestamp, amount, category, type
+                           FROM transactions
+                           WHERE user_id = ?
+                             AND (timestamp, id) < (?, ?)
+                           ORDER BY timestamp DESC, id DESC
+                           LIMIT ?
+                           """, (user_id, last[1], last[0], chunk_size))
+        rows = cursor.fetchall()
+        for row in rows:
+            yield row[1:]
+        if len(rows) < chunk_size:
+            return
+        last = rows[-1]
+
+
+def _format_export_date(date_str):
     try:
-        data = get_expense_stats(user_id)
+        return datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S").strftime("%d.%m.%Y %H:%M")
+    except (TypeError, ValueError):
+        return date_str
 
-        if not data:
-            return None
 
-        categories, amounts = zip(*data) if len(data) > 1 else ([data[0][0]], [data[0][1]])
+def _excel_column_widths(cursor, user_id):
+    """
+    Ширини стовпців одним агрегатним запитом.
 
-        amounts = [abs(amount) for amount in amounts]
+    Потоковий (write_only) аркуш openpyxl записує ширини стовпців перед
+    першим рядком, тому вони рахуються до запису, а не другим проходом по клітинках.
 
-        plt.figure(figsize=(10, 6))
-        bars = plt.bar(categories, amounts, color=["#4CAF50", "#FF9800", "#2196F3", "#9C27B0", "#E91E63"])
+    Returns:
+        tuple: (кількість транзакцій, ширини стовпців або None, якщо транзакцій немає)
+    """
+    cursor.execute("""
+                   SELECT COUNT(*),
+                          MAX(LENGTH(timestamp)),
+                          MAX(LENGTH(CAST(ABS(amount) AS TEXT))),
+                          MAX(LENGTH(category)),
+                          MAX(LENGTH(type))
+                   FROM transactions
+                   WHERE user_id = ?
+                   """, (user_id,))
+    count, timestamp_length, amount_length, category_length, type_length = cursor.fetchone()
+    if not count:
+        return 0, None
 
-        total = sum(amounts)
-        for bar in bars:
-            yval = bar.get_height()
-            percent = (yval / total) * 100
-            plt.text(bar.get_x() + bar.get_width() / 2, yval + 10, f"{percent:.1f}%", ha='center', va='bottom')
+    lengths = [min(EXPORT_DATE_WIDTH, timestamp_length or 0), amount_length or 0,
+               category_length or 0, type_length or 0]
+    return count, [max(len(header), length) + 4 for header, length in zip(EXPORT_HEADERS, lengths)]
 
-        plt.title("📊 Розподіл витрат за категоріями")
-        plt.xlabel("Категорія")
-        plt.ylabel("Сума (грн)")
-        plt.xticks(rotation=45, ha='right')
-        plt.grid(True, axis='y', linestyle='--', alpha=0.7)
 
-        file_path = f"chart_{user_id}.png"
-        plt.tight_layout()
-        plt.savefig(file_path)
-        plt.close()
+def _export_styles():
+    thin_border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+    centered = Alignment(horizontal='center', vertical='center')
 
-        return file_path
-    except Exception as e:
-        print(f"Error generating expense chart: {e}")
-        return None
+    header = NamedStyle(name="export_header")
+    header.font = Font(name='Arial', size=12, bold=True, color="FFFFFF")
+    header.fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header.alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
+    header.border = thin_border
 
+    income = NamedStyle(name="export_income", border=thin_border, alignment=centered)
+    income.fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
 
-def export_transactions_to_excel(user_id):
-    try:
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
+    expense = NamedStyle(name="export_expense", border=thin_border, alignment=centered)
+    expense.fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
 
-        cursor.execute("""
-                       SELECT timestamp, amount, category, type
-                       FROM transactions
-                       WHERE user_id = ?
-                       ORDER BY timestamp DESC
-                       """, (user_id,))
+    plain = NamedStyle(name="export_plain", border=thin_border, alignment=centered)
 
-        transactions = cursor.fetchall()
-        conn.close()
+    return header, income, expense, plain
+
+
+def count_user_transactions(cursor, user_id):
+    cursor.execute("SELECT COUNT(*) FROM transactions WHERE user_id = ?", (user_id,))
+    return cursor.fetchone()[0]
 
-        if not transactions:
-            return None
-
-        wb = openpyxl.Workbook()
-        ws = wb.active
-        ws.title = "Транзакції"
-
-        header_font = Font(name='Arial', size=12, bold=True, color="FFFFFF")
-        header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-        header_alignment = Alignment(horizontal='center', vertical='center', wrap_text=True)
-
-        thin_border = Border(
-            left=Side(style='thin'),
-            right=Side(style='thin'),
-            top=Side(style='thin'),
-            bottom=Side(style='thin')
-        )
-
-        income_fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-        expense_fill = PatternFill(start_color="FFCCCC", end_color="FFCCCC", fill_type="solid")
-
-        headers = ["Дата", "Сума", "Категорія", "Тип"]
-        for col_num, header in enumerate(headers, 1):
-            cell = ws.cell(row=1, column=col_num)
-            cell.value = header
-            cell.font = header_font
-            cell.fill = header_fill
-            cell.alignment = header_alignment
-            cell.border = thin_border
-
-        for row_num, transaction in enumerate(transactions, 2):
-            date_str = transaction[0]
-            try:
-                date_obj = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-                formatted_date = date_obj.strftime("%d.%m.%Y %H:%M")
-            except:
-                formatted_date = date_str
-
-            ws.cell(row=row_num, column=1).value = formatted_date
-            ws.cell(row=row_num, column=2).value = abs(float(transaction[1]))
-            ws.cell(row=row_num, column=3).value = transaction[2]
-            ws.cell(row=row_num, column=4).value = transaction[3]
-
-            for col_num in range(1, 5):
-                cell = ws.cell(row=row_num, column=col_num)
-                cell.border = thin_border
-                cell.alignment = Alignment(horizontal='center', vertical='center')
-
-            if transaction[3].lower() == 'дохід':
-                for col_num in range(1, 5):
-                    ws.cell(row=row_num, column=col_num).fill = income_fill
-            elif transaction[3].lower() == 'витрата':
-                for col_num in range(1, 5):
-                    ws.cell(row=row_num, column=col_num).fill = expense_fill
-
-        for col_num in range(1, 5):
-            column_letter = get_column_letter(col_num)
-            max_length = 0
-            for row_num in range(1, len(transactions) + 2):
-                cell = ws.cell(row=row_num, column=col_num)
-                if cell.value:
-                    max_length = max(max_length, len(str(cell.value)))
-            adjusted_width = max_length + 4
-            ws.column_dimensions[column_letter].width = adjusted_width
 
+def write_transactions_excel(user_id, output, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Потоково записує транзакції користувача в .xlsx.
+
+    Рядки читаються з курсора порціями і одразу пишуться в аркуш write_only
+    зі спільними іменованими стилями, тож пам'ять не росте з кількістю рядків.
+
+    Args:
+        output: шлях або файловий об'єкт (BytesIO, тимчасовий файл)
+        progress: функція (записано рядків, усього рядків), викликається після кожної порції
+
+    Returns:
+        int: кількість записаних транзакцій (0 — файл не створено)
+    """
+    conn = connect(DATABASE_FILE)
+    try:
+        cursor = conn.cursor()
+        total, widths = _excel_column_widths(cursor, user_id)
+        if not widths:
+            return 0
+
+        wb = openpyxl.Workbook(write_only=True)
+        styles = _export_styles()
+        for style in styles:
+            wb.add_named_style(style)
+        header_style, income_style, expense_style, plain_style = (style.name for style in styles)
+
+        ws = wb.create_sheet("Транзакції")
+        for col_num, width in enumerate(widths, 1):
+            ws.column_dimensions[get_column_letter(col_num)].width = width
         ws.freeze_panes = "A2"
 
-        file_path = f"transactions_{user_id}.xlsx"
-        wb.save(file_path)
+        def styled(value, style):
+            cell = WriteOnlyCell(ws, value=value)
+            cell.style = style
+            return cell
+
+        ws.append([styled(header, header_style) for header in EXPORT_HEADERS])
+
+        count = 0
+        for timestamp, amount, category, transaction_type in iter_user_transactions(cursor, user_id, chunk_size):
+            kind = (transaction_type or "").lower()
+            if kind == 'дохід':
+                style = income_style
+            elif kind == 'витрата':
+                style = expense_style
+            else:
+                style = plain_style
+
+            ws.append([
+                styled(_format_export_date(timestamp), style),
+                styled(abs(float(amount)), style),
+                styled(category, style),
+                styled(transaction_type, style),
+            ])
+            count += 1
+            if progress and count % chunk_size == 0:
+                progress(count, total)
+
+        wb.save(output)
+        return count
+    finally:
+        conn.close()
+
 
-        return file_path
+def export_transactions_to_excel(user_id):
+    """
+    Експортує транзакції в тимчасовий .xlsx.
+
+    Returns:
+        str: шлях до файлу (видаляє викликач) або None, якщо даних немає
+    """
+    fd, file_path = tempfile.mkstemp(prefix=f"transactions_{user_id}_", suffix=".xlsx")
+    try:
+        with os.fdopen(fd, "wb") as file:
+            count = write_transactions_excel(user_id, file)
     except Exception as e:
         print(f"Error exporting transactions to Excel: {e}")
+        count = 0
+
+    if not count:
+        os.remove(file_path)
         return None
+    return file_path
+
+
+def iter_csv_chunks(rows, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Перетворює рядки транзакцій на CSV і віддає його порціями байтів.
+
+    Перша порція починається з BOM і заголовка, щоб Excel розпізнав UTF-8.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_HEADERS)
+
+    for row_num, row in enumerate(rows, 1):
+        writer.writerow(row)
+        if row_num % chunk_size == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
 
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
 
-def export_transactions_to_csv(user_id):
+
+def write_transactions_csv(user_id, output, compress=False, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """
+    Потоково записує транзакції користувача в CSV (за бажанням стиснутий gzip).
+
+    Args:
+        output: двійковий файловий об'єкт
+        compress: стискати вивід gzip
+        progress: функція (записано рядків, усього рядків), викликається після кожної порції
+
+    Returns:
+        int: кількість записаних транзакцій (0 — нічого не записано)
+    """
+    conn = connect(DATABASE_FILE)
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
         cursor = conn.cursor()
+        total = count_user_transactions(cursor, user_id) if progress else None
+        rows = iter_user_transactions(cursor, user_id, chunk_size)
+        first = next(rows, None)
+        if first is None:
+            return 0
+
+        count = 0
+
+        def counted():
+            nonlocal count
+            for row in itertools.chain([first], rows):
+                count += 1
+                if progress and count % chunk_size == 0:
+                    progress(count, total)
+                yield row
+
+        target = gzip.GzipFile(fileobj=output, mode="wb") if compress else output
+        try:
+            for chunk in iter_csv_chunks(counted(), chunk_size):
+                target.write(chunk)
+        finally:
+            if compress:
+                # Закриває лише потік gzip, сам output лишається відкритим
+                target.close()
+        return count
+    finally:
+        conn.close()
 
-        cursor.execute("""
-                       SELECT timestamp, amount, category, type
-                       FROM transactions
-                       WHERE user_id = ?
-                       ORDER BY timestamp DESC
-                       """, (user_id,))
 
-        transactions = cursor.fetchall()
-        conn.close()
+def export_transactions_to_csv(user_id, compress=False, progress=None):
+    """
+    Експортує транзакції в CSV у буфер: у пам'яті до EXPORT_SPOOL_SIZE, далі на диску.
 
-        if not transactions:
-            return None
+    Returns:
+        SpooledTemporaryFile: буфер, перемотаний на початок (закриває викликач),
+        або None, якщо даних немає
+    """
+    return _export_to_spool(write_transactions_csv, user_id, compress=compress, progress=progress)
 
-        file_path = f"transactions_{user_id}.csv"
 
-        with open(file_path, mode="w", encoding="utf-8-sig", newline="") as file:
-            writer = csv.writer(file, delimiter=',', quotechar='"', quoting=csv.QUOTE_MINIMAL)
-            writer.writerow(["Дата", "Сума", "Категорія", "Тип"])
-            writer.writerows(transactions)
+def export_transactions(user_id, export_format="xlsx", progress=None):
+    """
+    Експортує транзакції у вибраному форматі (EXPORT_FORMATS) без файлів у робочому каталозі.
 
-        return file_path
-    except Exception as e:
-        print(f"Error exporting transactions to CSV: {e}")
+    Returns:
+        tuple: (буфер, ім'я файлу для надсилання) або None, якщо даних немає
+    """
+    if export_format == "xlsx":
+        buffer = _export_to_spool(write_transactions_excel, user_id, progress=progress)
+    elif export_format in ("csv", "csv.gz"):
+        buffer = export_transactions_to_csv(user_id, compress=export_format == "csv.gz", progress=progress)
+    else:
+        raise ValueError(f"Невідомий формат експорту: {export_format}")
+
+    if buffer is None:
         return None
+    return buffer, f"transactions_{user_id}.{export_format}"
 
 
-def get_transaction_report(user_id, days=30):
+def _export_to_spool(write, user_id, **kwargs):
+    buffer = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_SIZE)
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-                       SELECT SUM(amount)
-                       FROM transactions
-                       WHERE user_id = ?
-                         AND type = 'дохід'
-                         AND
-                           date (timestamp) >= date ('now'
-                           , ?)
-                       """, (user_id, f'-{days} days'))
+        count = write(user_id, buffer, **kwargs)
+    except Exception:
+        # Помилку показує користувачу черга експорту, тут лише звільняємо буфер
+        buffer.close()
+        raise
+
+    if not count:
+        buffer.close()
+        return None
+    buffer.seek(0)
+    return buffer
 
-        total_income = cursor.fetchone()[0] or 0
 
-        cursor.execute("""
-                       SELECT SUM(amount)
-                       FROM transactions
-                       WHERE user_id = ?
-                         AND type = 'витрата'
-                         AND
-                           date (timestamp) >= date ('now'
-                           , ?)
-                       """, (user_id, f'-{days} days'))
+def get_period_rollups(user_id, days=30):
+    """
+    Підсумки за останні days днів з денних зведень daily_rollups одним запитом.
 
-        total_expense = cursor.fetchone()[0] or 0
+    Вартість залежить від кількості днів і категорій, а не від кількості транзакцій.
 
+    Returns:
+        list: кортежі (type, category, total, count)
+    """
+    try:
+        conn = connect(DATABASE_FILE)
+        cursor = conn.cursor()
         cursor.execute("""
-                       SELECT category, SUM(amount)
-                       FROM transactions
+                       SELECT type, category, SUM(total), SUM(count)
+                       FROM daily_rollups
                        WHERE user_id = ?
-                         AND type = 'витрата'
-                         AND
-                           date (timestamp) >= date ('now'
-                           , ?)
-                       GROUP BY category
-                       ORDER BY SUM (amount) DESC
-                           LIMIT 3
+                         AND day >= date('now', ?)
+                       GROUP BY type, category
                        """, (user_id, f'-{days} days'))
+        return cursor.fetchall()
+    finally:
+        conn.close()
 
-        top_expense_categories = cursor.fetchall()
 
-        cursor.execute("""
-                       SELECT COUNT(*)
-                       FROM transactions
-                       WHERE user_id = ?
-                         AND
-                           date (timestamp) >= date ('now'
-                           , ?)
-                       """, (user_id, f'-{days} days'))
+def get_transaction_report(user_id, days=30):
+    try:
+        rows = get_period_rollups(user_id, days)
 
-        transaction_count = cursor.fetchone()[0] or 0
+        total_income = sum(total for transaction_type, _, total, _ in rows if transaction_type == 'дохід')
+        total_expense = sum(total for transaction_type, _, total, _ in rows if transaction_type == 'витрата')
 
-        conn.close()
+        expense_categories = [(category, total) for transaction_type, category, total, _ in rows
+                              if transaction_type == 'витрата']
+        top_expense_categories = sorted(expense_categories, key=lambda item: item[1], reverse=True)[:3]
+
+        transaction_count = sum(count for _, _, _, count in rows)
 
         return {
             'total_income': total_income,
@@ -0,0 +1,106 @@
+"""
+Асинхронний фасад до services/database_service.py.
+
+Кожна публічна функція database_service має тут однойменну корутину, яка
+виконує блокуючий виклик SQLite в обмеженому пулі потоків, тож обробники
+можуть робити await, не зупиняючи цикл подій python-telegram-bot.
+"""
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+from services import database_service
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 8
+
+_max_workers = DEFAULT_MAX_WORKERS
+_executor = None
+
+
+def configure(max_workers=None):
+    """Задає розмір пулу потоків; діє для пулу, який ще не створено."""
+    global _max_workers
+    if max_workers is not None:
+        _max_workers = max_workers
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=_max_workers, thread_name_prefix="db")
+    return _executor
+
+
+def shutdown(wait=True):
+    """Зупиняє пул потоків. Викликається при зупинці бота."""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+        logger.info("Пул потоків бази даних зупинено")
+
+
+async def run_blocking(func, *args, **kwargs):
+    """Виконує блокуючу функцію доступу до даних у пулі потоків бази даних."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def _offload(name):
+    # Функція шукається в database_service під час виклику, а не імпорту,
+    # щоб підміни в тестах і пізніші зміни модуля діяли й тут
+    @functools.wraps(getattr(database_service, name))
+    async def wrapper(*args, **kwargs):
+        return await run_blocking(getattr(database_service, name), *args, **kwargs)
+
+    return wrapper
+
+
+init_database = _offload("init_database")
+insert_command_log = _offload("insert_command_log")
+insert_command_logs = _offload("insert_command_logs")
+
+add_transaction = _offload("add_transaction")
+add_transaction_with_budget = _offload("add_transaction_with_budget")
+delete_transaction_with_budget = _offload("delete_transaction_with_budget")
+get_transaction_history = _offload("get_transaction_history")
+filter_transactions_by_category_or_type = _offload("filter_transactions_by_category_or_type")
+get_last_transaction = _offload("get_last_transaction")
+delete_transaction = _offload("delete_transaction")
+
+add_goal = _offload("add_goal")
+get_goals = _offload("get_goals")
+set_budget = _offload("set_budget")
+update_budget_for_transaction = _offload("update_budget_for_transaction")
+recalculate_user_budget = _offload("recalculate_user_budget")
+check_budget_consistency = _offload("check_budget_consistency")
+get_budgets = _offload("get_budgets")
+open_budget_periods = _offload("open_budget_periods")
+get_budget_periods = _offload("get_budget_periods")
+get_remaining_budget = _offload("get_remaining_budget")
+
+save_debt = _offload("save_debt")
+get_active_debts = _offload("get_active_debts")
+get_debt_history = _offload("get_debt_history")
+close_debt = _offload("close_debt")
+
+add_piggy_bank_goal = _offload("add_piggy_bank_goal")
+get_piggy_bank_goals = _offload("get_piggy_bank_goals")
+add_funds_to_goal = _offload("add_funds_to_goal")
+delete_piggy_bank_goal = _offload("delete_piggy_bank_goal")
+get_piggy_bank_goal = _offload("get_piggy_bank_goal")
+
+add_reminder = _offload("add_reminder")
+get_reminders = _offload("get_reminders")
+get_reminder = _offload("get_reminder")
+update_reminder = _offload("update_reminder")
+mark_reminder_completed = _offload("mark_reminder_completed")
+mark_reminders_completed = _offload("mark_reminders_completed")
+delete_reminder = _offload("delete_reminder")
+get_pending_reminders = _offload("get_pending_reminders")
+
+save_rate_snapshot = _offload("save_rate_snapshot")
+get_rate_snapshots = _offload("get_rate_snapshots")
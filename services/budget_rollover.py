@@ -0,0 +1,96 @@
+"""
+Нічне відкриття бюджетних періодів.
+
+Задача в циклі подій одразу після запуску і щоночі після опівночі відкриває
+поточний місяць для всіх місячних лімітів одним запитом
+(database_service.open_budget_periods). Відкриття ідемпотентне, тож повторний
+запуск протягом місяця нічого не змінює, а перший запуск нового місяця
+переносить ліміти всіх користувачів у новий період.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from services.async_database_service import run_blocking
+from services.database_service import open_budget_periods
+
+logger = logging.getLogger(__name__)
+
+# Через скільки після опівночі відкривати періоди
+ROLLOVER_DELAY = timedelta(minutes=1)
+
+# Найдовший сон без перевірки часу: страхує від переведення системного годинника
+MAX_SLEEP = 3600
+
+
+def next_rollover(now=None):
+    now = now or datetime.now()
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return midnight + ROLLOVER_DELAY
+
+
+class BudgetRollover:
+    def __init__(self):
+        self._task = None
+        self._open = open_budget_periods
+        self.last_opened = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    async def start(self, open_periods=None):
+        """
+        Запускає задачу в поточному циклі подій.
+
+        Args:
+            open_periods: функція, що відкриває поточний період (для тестів)
+        """
+        if self.running:
+            return
+        self._open = open_periods or open_budget_periods
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info("Відкриття бюджетних періодів заплановано")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def rollover(self):
+        try:
+            opened = await run_blocking(self._open)
+        except Exception as e:
+            logger.error(f"Помилка відкриття бюджетних періодів: {e}")
+            return None
+        self.last_opened = opened
+        if opened:
+            logger.info(f"Відкрито бюджетних періодів: {opened}")
+        return opened
+
+    async def _run(self):
+        while True:
+            await self.rollover()
+            due = next_rollover()
+            while datetime.now() < due:
+                await asyncio.sleep(min((due - datetime.now()).total_seconds(), MAX_SLEEP))
+
+
+_rollover = BudgetRollover()
+
+
+async def start(open_periods=None):
+    await _rollover.start(open_periods)
+
+
+async def stop():
+    await _rollover.stop()
+
+
+def is_running():
+    return _rollover.running
@@ -0,0 +1,91 @@
+"""
+Кеш готових графіків з адресацією за вмістом.
+
+Ключ графіка — хеш агрегованих даних, з яких він малюється, тож однакові дані
+дають той самий графік без повторного рендерингу. Разом з PNG зберігається
+file_id, який Telegram повернув після першого send_photo: повторні запити
+надсилають графік за file_id без завантаження файлу.
+
+Для кожного користувача окремо запам'ятовується ключ його останнього графіка
+разом з версією даних (services/data_version), щоб до зміни транзакцій не
+виконувати навіть запит статистики.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 256
+
+
+def chart_key(kind, data):
+    """Хеш типу графіка та його вхідних даних."""
+    payload = repr((kind, [tuple(row) for row in data])).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ChartCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # ключ -> {"png": bytes, "file_id": str | None}
+        self._users = OrderedDict()  # (user_id, kind) -> (версія даних, ключ)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def user_key(self, user_id, kind, version):
+        """Ключ останнього графіка користувача, якщо його дані відтоді не змінювались."""
+        with self._lock:
+            remembered = self._users.get((user_id, kind))
+            if remembered and remembered[0] == version:
+                return remembered[1]
+            return None
+
+    def remember_user(self, user_id, kind, version, key):
+        with self._lock:
+            self._users[(user_id, kind)] = (version, key)
+            self._users.move_to_end((user_id, kind))
+            # Посилання користувачів дешеві, але теж обмежені
+            while len(self._users) > self.max_entries * 4:
+                self._users.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(entry)
+
+    def put(self, key, png):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = {"png": png, "file_id": None}
+            else:
+                entry["png"] = png
+                self._entries.move_to_end(key)
+            self._evict()
+
+    def set_file_id(self, key, file_id):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry["file_id"] = file_id
+
+    def forget_file_id(self, key):
+        self.set_file_id(key, None)
+
+    def _evict(self):
+        # Посилання користувачів на витиснений ключ просто дадуть промах у get()
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._users.clear()
@@ -0,0 +1,155 @@
+"""
+Побудова графіків в окремих процесах.
+
+Графік малюється об'єктним API matplotlib (Figure + Agg) без глобального стану
+pyplot, у пулі процесів, і повертається як PNG-байти з буфера в пам'яті,
+тож обробники не блокують цикл подій і не пишуть файли в робочий каталог.
+"""
+import asyncio
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from services import data_version
+from services.analytics_service import get_expense_stats
+from services.async_database_service import run_blocking
+from services.chart_cache import ChartCache, chart_key
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 2
+
+COLORS = ["#4CAF50", "#FF9800", "#2196F3", "#9C27B0", "#E91E63"]
+
+EXPENSE_CHART = "expense"
+
+_max_workers = DEFAULT_MAX_WORKERS
+_executor = None
+
+cache = ChartCache()
+
+
+def configure(max_workers=None):
+    """Задає кількість процесів; діє для пулу, який ще не створено."""
+    global _max_workers
+    if max_workers is not None:
+        _max_workers = max_workers
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # spawn: дочірні процеси не успадковують потоки й з'єднання бота
+        _executor = ProcessPoolExecutor(max_workers=_max_workers,
+                                        mp_context=multiprocessing.get_context("spawn"))
+    return _executor
+
+
+def shutdown(wait=True):
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=wait)
+        _executor = None
+        logger.info("Пул процесів для графіків зупинено")
+
+
+def render_expense_chart_png(categories, amounts):
+    """Малює стовпчикову діаграму витрат і повертає PNG-байти. Виконується в процесі пулу."""
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    amounts = [abs(amount) for amount in amounts]
+
+    fig = Figure(figsize=(10, 6))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    bars = ax.bar(categories, amounts, color=COLORS)
+
+    total = sum(amounts)
+    for bar in bars:
+        yval = bar.get_height()
+        percent = (yval / total) * 100 if total else 0
+        ax.text(bar.get_x() + bar.get_width() / 2, yval + 10, f"{percent:.1f}%", ha='center', va='bottom')
+
+    ax.set_title("📊 Розподіл витрат за категоріями")
+    ax.set_xlabel("Категорія")
+    ax.set_ylabel("Сума (грн)")
+    ax.tick_params(axis='x', labelrotation=45)
+    for label in ax.get_xticklabels():
+        label.set_horizontalalignment('right')
+    ax.grid(True, axis='y', linestyle='--', alpha=0.7)
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png")
+    return buffer.getvalue()
+
+
+async def _render_expense_data(data):
+    categories = [row[0] for row in data]
+    amounts = [row[1] for row in data]
+
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(_get_executor(), render_expense_chart_png, categories, amounts)
+    except Exception as e:
+        print(f"Error generating expense chart: {e}")
+        return None
+
+
+async def render_expense_chart(user_id):
+    """
+    Будує графік витрат користувача без кешу.
+
+    Returns:
+        bytes: PNG або None, якщо даних про витрати немає
+    """
+    data = await run_blocking(get_expense_stats, user_id)
+    if not data:
+        return None
+    return await _render_expense_data(data)
+
+
+async def get_expense_chart(user_id, use_file_id=True):
+    """
+    Графік витрат з кешу: file_id Telegram, готовий PNG або новий рендеринг.
+
+    Returns:
+        tuple: (ключ кешу, file_id або PNG-байти) або None, якщо даних немає
+    """
+    # Версія береться до читання даних: зміна транзакцій під час читання
+    # зробить запам'ятований ключ застарілим, а не навпаки
+    version = data_version.get(user_id)
+    key = cache.user_key(user_id, EXPENSE_CHART, version)
+    entry = cache.get(key) if key else None
+    data = None
+
+    if entry is None:
+        data = await run_blocking(get_expense_stats, user_id)
+        if not data:
+            return None
+        key = chart_key(EXPENSE_CHART, data)
+        cache.remember_user(user_id, EXPENSE_CHART, version, key)
+        entry = cache.get(key)
+
+    if entry is not None:
+        if use_file_id and entry["file_id"]:
+            return key, entry["file_id"]
+        if entry["png"]:
+            return key, entry["png"]
+
+    png = await _render_expense_data(data)
+    if not png:
+        return None
+    cache.put(key, png)
+    return key, png
+
+
+def remember_file_id(key, file_id):
+    """Зберігає file_id, який Telegram повернув після надсилання графіка."""
+    cache.set_file_id(key, file_id)
+
+
+def forget_file_id(key):
+    cache.forget_file_id(key)
@@ -0,0 +1,173 @@
+import sqlite3
+import queue
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 5
+
+DEFAULT_PRAGMAS = (
+    ("busy_timeout", 5000),
+    ("temp_store", "MEMORY"),
+)
+
+# Режим зберігання "wal": журнал WAL, fsync лише на контрольних точках,
+# 256 МБ mmap і ~16 МБ кешу сторінок на з'єднання
+WAL_PRAGMAS = (
+    ("journal_mode", "WAL"),
+    ("synchronous", "NORMAL"),
+    ("busy_timeout", 5000),
+    ("temp_store", "MEMORY"),
+    ("mmap_size", 268435456),
+    ("cache_size", -16000),
+)
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    З'єднання SQLite, яке при close() повертається до свого пулу,
+    а не закривається фізично.
+    """
+
+    pool = None
+    checked_out = False
+    generation = 0
+
+    def close(self):
+        if self.pool is None:
+            super().close()
+        else:
+            self.pool.release(self)
+
+
+class ConnectionPool:
+    """
+    Пул довгоживучих з'єднань SQLite для одного файлу бази даних.
+
+    size обмежує кількість з'єднань, що зберігаються між запитами.
+    Якщо всі з'єднання зайняті, відкривається тимчасове, яке закривається
+    після повернення, тому вкладені виклики ніколи не блокуються на пулі.
+    PRAGMA застосовуються один раз при відкритті кожного з'єднання.
+    """
+
+    def __init__(self, database_file, size=DEFAULT_POOL_SIZE, pragmas=DEFAULT_PRAGMAS):
+        self.database_file = database_file
+        self.size = size
+        self.pragmas = tuple(pragmas)
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._closed = False
+        self._generation = 0
+
+    def _open(self):
+        conn = sqlite3.connect(self.database_file, factory=PooledConnection, check_same_thread=False)
+        for name, value in self.pragmas:
+            conn.execute(f"PRAGMA {name} = {value}")
+        conn.pool = self
+        conn.generation = self._generation
+        return conn
+
+    def acquire(self):
+        if self._closed:
+            raise sqlite3.ProgrammingError(f"Пул з'єднань для {self.database_file} закрито")
+
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+
+        conn.checked_out = True
+        return conn
+
+    def release(self, conn):
+        if not conn.checked_out:
+            return
+        conn.checked_out = False
+
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning(f"Не вдалося відкотити транзакцію перед поверненням у пул: {e}")
+            sqlite3.Connection.close(conn)
+            return
+
+        if not self._closed and conn.generation == self._generation:
+            try:
+                self._idle.put_nowait(conn)
+                return
+            except queue.Full:
+                pass
+
+        sqlite3.Connection.close(conn)
+
+    def resize(self, size):
+        self.size = size
+        self._idle.maxsize = size
+
+    def set_pragmas(self, pragmas):
+        """Змінює PRAGMA; з'єднання, відкриті зі старими налаштуваннями, закриваються."""
+        self.pragmas = tuple(pragmas)
+        self._generation += 1
+        self._close_idle()
+
+    def close(self):
+        self._closed = True
+        self._close_idle()
+
+    def _close_idle(self):
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            sqlite3.Connection.close(conn)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pool_size = DEFAULT_POOL_SIZE
+_pragmas = DEFAULT_PRAGMAS
+
+
+def configure(size=None, pragmas=None):
+    """Задає розмір пулів і PRAGMA, зокрема для вже створених пулів."""
+    global _pool_size, _pragmas
+    with _pools_lock:
+        if size is not None:
+            _pool_size = size
+            for pool in _pools.values():
+                pool.resize(size)
+        if pragmas is not None:
+            _pragmas = tuple(pragmas)
+            for pool in _pools.values():
+                pool.set_pragmas(_pragmas)
+
+
+def get_pool(database_file):
+    pool = _pools.get(database_file)
+    if pool is not None:
+        return pool
+
+    with _pools_lock:
+        pool = _pools.get(database_file)
+        if pool is None:
+            pool = ConnectionPool(database_file, size=_pool_size, pragmas=_pragmas)
+            _pools[database_file] = pool
+        return pool
+
+
+def connect(database_file):
+    """Аналог sqlite3.connect, що бере з'єднання з пулу; close() повертає його назад."""
+    return get_pool(database_file).acquire()
+
+
+def close_all():
+    """Закриває всі пули. Викликається при зупинці бота."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+
+    for pool in pools:
+        pool.close()
+    logger.info(f"Закрито пулів з'єднань: {len(pools)}")
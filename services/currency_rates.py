@@ -0,0 +1,173 @@
+"""
+Асинхронний сервіс курсів валют для конвертера.
+
+Провайдер повертає всю таблицю курсів для базової валюти, тож один запит
+обслуговує будь-яку пару з цією базою. Таблиця кешується на CACHE_TTL секунд,
+а одночасні запити тієї самої бази чекають на одне спільне завантаження.
+HTTP-запити виконує httpx.AsyncClient, що перевикористовує з'єднання й
+не блокує цикл подій.
+
+Провайдер замінюється через configure(provider=...): будь-який об'єкт з
+корутинами fetch(base) і close(); власні провайдери успадковують RateProvider.
+"""
+import abc
+import asyncio
+import logging
+import time
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_URL = "https://api.exchangerate-api.com/v4/latest/{base}"
+
+# Скільки секунд таблиця курсів вважається свіжою
+CACHE_TTL = 600
+
+REQUEST_TIMEOUT = 5.0
+
+
+class RateFetchError(Exception):
+    """Не вдалося отримати таблицю курсів від провайдера."""
+
+
+def normalize_currency(code):
+    """Код валюти у верхньому регістрі або None, якщо це не трилітерний код."""
+    code = str(code or "").strip().upper()
+    if len(code) == 3 and code.isascii() and code.isalpha():
+        return code
+    return None
+
+
+class RateProvider(abc.ABC):
+    """Джерело таблиць курсів: fetch(base) повертає {валюта: курс} відносно base."""
+
+    @abc.abstractmethod
+    async def fetch(self, base):
+        """Таблиця курсів для base; при збої — виняток."""
+
+    async def close(self):
+        pass
+
+
+class ExchangeRateApiProvider(RateProvider):
+    def __init__(self, url=DEFAULT_URL, timeout=REQUEST_TIMEOUT):
+        self.url = url
+        self.timeout = timeout
+        self._client = None
+
+    def _get_client(self):
+        # Клієнт створюється в циклі подій бота й тримає з'єднання відкритими між запитами
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout,
+                                             limits=httpx.Limits(max_keepalive_connections=5))
+        return self._client
+
+    async def fetch(self, base):
+        response = await self._get_client().get(self.url.format(base=base))
+        response.raise_for_status()
+        rates = response.json().get("rates")
+        if not isinstance(rates, dict):
+            raise RateFetchError(f"Відповідь без таблиці курсів для {base}")
+        rates = {code: float(rate) for code, rate in rates.items()}
+        rates[base] = 1.0
+        return rates
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+class CurrencyRateService:
+    def __init__(self, provider=None, ttl=CACHE_TTL):
+        self.provider = provider or ExchangeRateApiProvider()
+        self.ttl = ttl
+        self._tables = {}  # база -> (час завантаження, {валюта: курс})
+        self._inflight = {}  # база -> задача завантаження
+        self.hits = 0
+        self.fetches = 0
+        self.errors = 0
+
+    async def get_rates(self, base):
+        """
+        Таблиця курсів для base з кешу або від провайдера.
+
+        Raises:
+            RateFetchError: провайдер недоступний або повернув некоректну відповідь
+        """
+        code = normalize_currency(base)
+        if code is None:
+            raise RateFetchError(f"Некоректний код валюти: {base}")
+
+        cached = self._tables.get(code)
+        if cached is not None and time.monotonic() - cached[0] < self.ttl:
+            self.hits += 1
+            return cached[1]
+
+        task = self._inflight.get(code)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(code))
+            self._inflight[code] = task
+            task.add_done_callback(lambda _: self._inflight.pop(code, None))
+        # shield: скасування одного запиту не скасовує спільне завантаження для інших
+        return await asyncio.shield(task)
+
+    async def _fetch(self, base):
+        self.fetches += 1
+        try:
+            rates = await self.provider.fetch(base)
+        except RateFetchError:
+            self.errors += 1
+            raise
+        except Exception as e:
+            self.errors += 1
+            raise RateFetchError(f"Помилка запиту курсів {base}: {e}") from e
+        self._tables[base] = (time.monotonic(), rates)
+        return rates
+
+    async def get_rate(self, from_currency, to_currency):
+        """Курс from_currency → to_currency або None, якщо валюти немає в таблиці."""
+        rates = await self.get_rates(from_currency)
+        return rates.get(normalize_currency(to_currency))
+
+    def clear(self):
+        self._tables.clear()
+
+    async def close(self):
+        await self.provider.close()
+
+    def stats(self):
+        return {"bases": len(self._tables), "hits": self.hits, "fetches": self.fetches,
+                "errors": self.errors, "inflight": len(self._inflight)}
+
+
+_service = CurrencyRateService()
+
+
+def configure(provider=None, ttl=None):
+    if provider is not None:
+        _service.provider = provider
+        _service.clear()
+    if ttl is not None:
+        _service.ttl = ttl
+
+
+async def get_rates(base):
+    return await _service.get_rates(base)
+
+
+async def get_rate(from_currency, to_currency):
+    return await _service.get_rate(from_currency, to_currency)
+
+
+async def close():
+    await _service.close()
+
+
+def clear():
+    _service.clear()
+
+
+def stats():
+    return _service.stats()
@@ -0,0 +1,23 @@
+"""
+Лічильник змін транзакцій кожного користувача.
+
+database_service збільшує його після кожного закомміченого додавання або
+видалення транзакції. Кеші, побудовані з даних користувача, запам'ятовують
+версію на момент читання і вважаються застарілими, щойно вона змінилась.
+"""
+import threading
+
+_versions = {}
+_lock = threading.Lock()
+
+
+def get(user_id):
+    with _lock:
+        return _versions.get(user_id, 0)
+
+
+def bump(user_id):
+    with _lock:
+        version = _versions.get(user_id, 0) + 1
+        _versions[user_id] = version
+        return version
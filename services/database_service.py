@@ -1,407 +1,97 @@
 import sqlite3
+from contextlib import contextmanager
 from datetime import datetime
+from services.connection_pool import connect
+from services.db_writer import serialized_write
+from services.migrations import BASELINE_SCHEMAS, run_migrations
+from services import data_version, reminder_scheduler
 
 DATABASE_FILE = "finance_bot.db"
 
 
-def create_command_logs_table():
-    conn = sqlite3.connect(DATABASE_FILE)
+def _create_table(name):
+    conn = connect(DATABASE_FILE)
     cursor = conn.cursor()
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS command_logs
-                   (
-                       id
-                       INTEGER
-                       PRIMARY
-                       KEY
-                       AUTOINCREMENT,
-                       user_id
-                       INTEGER,
-                       username
-                       TEXT,
-                       full_name
-                       TEXT,
-                       command
-                       TEXT,
-                       timestamp
-                       TEXT
-                   )
-                   """)
+    cursor.execute(BASELINE_SCHEMAS[name])
     conn.commit()
     conn.close()
 
 
+@serialized_write
+def create_command_logs_table():
+    _create_table("command_logs")
+
+
+@serialized_write
 def create_transactions_table():
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS transactions
-                   (
-                       id
-                       INTEGER
-                       PRIMARY
-                       KEY
-                       AUTOINCREMENT,
-                       user_id
-                       INTEGER,
-                       amount
-                       REAL,
-                       category
-                       TEXT,
-                       type
-                       TEXT,
-                       timestamp
-                       TEXT
-                   )
-                   """)
-    conn.commit()
-    conn.close()
+    _create_table("transactions")
 
 
+@serialized_write
 def create_budget_table():
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS budget
-                   (
-                       user_id
-                       INTEGER,
-                       category
-                       TEXT,
-                       amount
-                       REAL,
-                       PRIMARY
-                       KEY
-                   (
-                       user_id,
-                       category
-                   )
-                       )
-                   """)
-    conn.commit()
-    conn.close()
+    _create_table("budget")
 
 
+@serialized_write
 def create_budget_adjustments_table():
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS budget_adjustments
-                   (
-                       id
-                       INTEGER
-                       PRIMARY
-                       KEY
-                       AUTOINCREMENT,
-                       user_id
-                       INTEGER,
-                       category
-                       TEXT,
-                       amount
-                       REAL,
-                       timestamp
-                       TEXT,
-                       UNIQUE
-                   (
-                       user_id,
-                       category
-                   )
-                       )
-                   """)
-    conn.commit()
-    conn.close()
+    _create_table("budget_adjustments")
 
 
+@serialized_write
 def create_goals_table():
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS goals
-                   (
-                       id
-                       INTEGER
-                       PRIMARY
-                       KEY
-                       AUTOINCREMENT,
-                       user_id
-                       INTEGER,
-                       amount
-                       REAL,
-                       description
-                       TEXT,
-                       date
-                       TEXT
-                   )
-                   """)
-    conn.commit()
-    conn.close()
+    _create_table("goals")
 
 
+@serialized_write
 def create_piggy_bank_table():
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS piggy_bank
-                   (
-                       id
-                       INTEGER
-                       PRIMARY
-                       KEY
-                       AUTOINCREMENT,
-                       user_id
-                       INTEGER,
-                       name
-                       TEXT,
-                       target_amount
-                       REAL,
-                       current_amount
-                       REAL
-                       DEFAULT
-                       0,
-                       description
-                       TEXT,
-                       created_date
-                       TEXT,
-                       completed
-                       INTEGER
-                       DEFAULT
-                       0
-                   )
-                   """)
-    conn.commit()
-    conn.close()
+    _create_table("piggy_bank")
 
 
+@serialized_write
 def create_debts_table():
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS debts
-                   (
-                       id
-                       INTEGER
-                       PRIMARY
-                       KEY
-                       AUTOINCREMENT,
-                       user_id
-                       INTEGER,
-                       debtor
-                       TEXT,
-                       amount
-                       REAL,
-                       status
-                       TEXT
-                       DEFAULT
-                       'open',
-                       due_date
-                       TEXT,
-                       creation_time
-                       TEXT
-                   )
-                   """)
-    conn.commit()
-    conn.close()
+    _create_table("debts")
 
 
+@serialized_write
 def create_reminders_table():
-    conn = sqlite3.connect(DATABASE_FILE)
-    cursor = conn.cursor()
-    cursor.execute("""
-                   CREATE TABLE IF NOT EXISTS reminders
-                   (
-                       id
-                       INTEGER
-                       PRIMARY
-                       KEY
-                       AUTOINCREMENT,
-                       user_id
-                       INTEGER,
-                       title
-                       TEXT,
-                       reminder_datetime
-                       TEXT,
-                       created_at
-                       TEXT,
-                       is_completed
-                       INTEGER
-                       DEFAULT
-                       0
-                   )
-                   """)
-    conn.commit()
-    conn.close()
+    _create_table("reminders")
 
 
+@serialized_write
 def init_database():
-    create_command_logs_table()
-    create_transactions_table()
-    create_budget_table()
-    create_budget_adjustments_table()
-    create_goals_table()
-    create_piggy_bank_table()
-    create_debts_table()
-    create_reminders_table()
-
-    migrate_budget_data()
-    migrate_debts_table()
-    migrate_reminders_table()
-
-
-def migrate_debts_table():
+    conn = connect(DATABASE_FILE)
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-
-        # Check if the debts table exists
-        cursor.execute("""
-                       SELECT name
-                       FROM sqlite_master
-                       WHERE type = 'table'
-                         AND name = 'debts'
-                       """)
-
-        if not cursor.fetchone():
-            conn.close()
-            return
-
-        # Check if the creation_time column exists in the debts table
-        cursor.execute("PRAGMA table_info(debts)")
-        columns = [column[1] for column in cursor.fetchall()]
-
-        if 'creation_time' not in columns:
-            print("Adding creation_time column to debts table")
-            cursor.execute("ALTER TABLE debts ADD COLUMN creation_time TEXT")
-
-            # Set a default value for existing records
-            cursor.execute("UPDATE debts SET creation_time = ? WHERE creation_time IS NULL", 
-                          (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),))
-
-            conn.commit()
-            print("Migration of debts table completed successfully")
-
+        applied = run_migrations(conn)
+        if applied:
+            print(f"Застосовано міграції схеми: {applied}")
+    finally:
         conn.close()
-    except Exception as e:
-        print(f"Error migrating debts table: {e}")
-        if 'conn' in locals():
-            conn.close()
-
-
-def migrate_reminders_table():
-    try:
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-
-        # Check if the reminders table exists
-        cursor.execute("""
-                       SELECT name
-                       FROM sqlite_master
-                       WHERE type = 'table'
-                         AND name = 'reminders'
-                       """)
-
-        if not cursor.fetchone():
-            print("Creating reminders table")
-            create_reminders_table()
-            conn.close()
-            return
-
-        # Check if all required columns exist in the reminders table
-        cursor.execute("PRAGMA table_info(reminders)")
-        columns = [column[1] for column in cursor.fetchall()]
-
-        required_columns = ['id', 'user_id', 'title', 'reminder_datetime', 'created_at', 'is_completed']
-        missing_columns = [col for col in required_columns if col not in columns]
-
-        if missing_columns:
-            print(f"Adding missing columns to reminders table: {missing_columns}")
-            for column in missing_columns:
-                if column == 'is_completed':
-                    cursor.execute(f"ALTER TABLE reminders ADD COLUMN {column} INTEGER DEFAULT 0")
-                elif column == 'created_at':
-                    cursor.execute(f"ALTER TABLE reminders ADD COLUMN {column} TEXT")
-                    # Set a default value for existing records
-                    cursor.execute("UPDATE reminders SET created_at = ? WHERE created_at IS NULL", 
-                                  (datetime.now().strftime('%Y-%m-%d %H:%M:%S'),))
-                else:
-                    cursor.execute(f"ALTER TABLE reminders ADD COLUMN {column} TEXT")
-
-            conn.commit()
-            print("Migration of reminders table completed successfully")
 
-        conn.close()
-    except Exception as e:
-        print(f"Error migrating reminders table: {e}")
-        if 'conn' in locals():
-            conn.close()
 
+@contextmanager
+def unit_of_work():
+    """
+    Одна транзакція SQLite на одному з'єднанні для кількох пов'язаних змін.
 
-def migrate_budget_data():
+    Транзакція відкривається як BEGIN IMMEDIATE, фіксується одним commit при
+    виході з блоку і повністю відкочується, якщо всередині виникла помилка.
+    """
+    conn = connect(DATABASE_FILE)
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
         cursor = conn.cursor()
-
-        cursor.execute("""
-                       SELECT name
-                       FROM sqlite_master
-                       WHERE type = 'table'
-                         AND name = 'budget_adjustments'
-                       """)
-
-        if not cursor.fetchone():
-            conn.close()
-            return
-
-        cursor.execute("""
-                       SELECT DISTINCT user_id
-                       FROM budget
-                       """)
-
-        users = cursor.fetchall()
-
-        for (user_id,) in users:
-            cursor.execute("""
-                           SELECT category, amount
-                           FROM budget
-                           WHERE user_id = ?
-                           """, (user_id,))
-
-            budgets = cursor.fetchall()
-
-            for category, budget_amount in budgets:
-                cursor.execute("""
-                               SELECT COALESCE(SUM(amount), 0)
-                               FROM transactions
-                               WHERE user_id = ?
-                                 AND category = ?
-                               """, (user_id, category))
-
-                transaction_total = cursor.fetchone()[0]
-
-                adjustment = budget_amount - transaction_total
-
-                cursor.execute("""
-                               SELECT id
-                               FROM budget_adjustments
-                               WHERE user_id = ?
-                                 AND category = ?
-                               """, (user_id, category))
-
-                if not cursor.fetchone() and adjustment != 0:
-                    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                    cursor.execute("""
-                                   INSERT INTO budget_adjustments (user_id, category, amount, timestamp)
-                                   VALUES (?, ?, ?, ?)
-                                   """, (user_id, category, adjustment, timestamp))
-
+        cursor.execute("BEGIN IMMEDIATE")
+        yield cursor
         conn.commit()
-    except Exception as e:
-        print(f"Error migrating budget data: {e}")
+    except Exception:
+        conn.rollback()
+        raise
     finally:
         conn.close()
 
 
+@serialized_write
 def insert_command_log(user_id, username, full_name, command, timestamp):
-    conn = sqlite3.connect(DATABASE_FILE)
+    conn = connect(DATABASE_FILE)
     cursor = conn.cursor()
     cursor.execute("""
                    INSERT INTO command_logs (user_id, username, full_name, command, timestamp)
@@ -411,6 +101,23 @@ def insert_command_log(user_id, username, full_name, command, timestamp):
     conn.close()
 
 
+@serialized_write
+def insert_command_logs(rows):
+    """Записує пачку рядків (user_id, username, full_name, command, timestamp) однією транзакцією."""
+    if not rows:
+        return
+    conn = connect(DATABASE_FILE)
+    try:
+        conn.executemany("""
+                         INSERT INTO command_logs (user_id, username, full_name, command, timestamp)
+                         VALUES (?, ?, ?, ?, ?)
+                         """, rows)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@serialized_write
 def add_transaction(user_id, amount, category, transaction_type=None):
     if transaction_type is None:
         transaction_type = "дохід" if amount > 0 else "витрата"
@@ -418,13 +125,16 @@ def add_transaction(user_id, amount, category, transaction_type=None):
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        INSERT INTO transactions (user_id, amount, category, type, timestamp)
                        VALUES (?, ?, ?, ?, ?)
                        """, (user_id, amount, category, transaction_type, timestamp))
+        apply_daily_rollup(cursor, user_id, timestamp, category, transaction_type, amount)
+        apply_period_spend(cursor, user_id, timestamp, category, transaction_type, amount)
         conn.commit()
+        data_version.bump(user_id)
         return True
     except Exception as e:
         print(f"Помилка додавання транзакції: {e}")
@@ -433,9 +143,62 @@ def add_transaction(user_id, amount, category, transaction_type=None):
         conn.close()
 
 
+@serialized_write
+def add_transaction_with_budget(user_id, amount, category, transaction_type=None):
+    """Додає транзакцію і змінює бюджет категорії в одній транзакції SQLite."""
+    if transaction_type is None:
+        transaction_type = "дохід" if amount > 0 else "витрата"
+
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    try:
+        with unit_of_work() as cursor:
+            cursor.execute("""
+                           INSERT INTO transactions (user_id, amount, category, type, timestamp)
+                           VALUES (?, ?, ?, ?, ?)
+                           """, (user_id, amount, category, transaction_type, timestamp))
+            apply_budget_delta(cursor, user_id, category, amount)
+            apply_daily_rollup(cursor, user_id, timestamp, category, transaction_type, amount)
+            apply_period_spend(cursor, user_id, timestamp, category, transaction_type, amount)
+        data_version.bump(user_id)
+        return True
+    except Exception as e:
+        print(f"Помилка додавання транзакції: {e}")
+        return False
+
+
+@serialized_write
+def delete_transaction_with_budget(transaction_id):
+    """Видаляє транзакцію і повертає її суму з бюджету в одній транзакції SQLite."""
+    try:
+        with unit_of_work() as cursor:
+            cursor.execute("""
+                           SELECT user_id, amount, category, type, timestamp
+                           FROM transactions
+                           WHERE id = ?
+                           """, (transaction_id,))
+            transaction_data = cursor.fetchone()
+
+            if not transaction_data:
+                return False
+
+            user_id, amount, category, transaction_type, timestamp = transaction_data
+
+            cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+            apply_budget_delta(cursor, user_id, category, -amount)
+            apply_daily_rollup(cursor, user_id, timestamp, category, transaction_type, -amount, count=-1)
+            apply_period_spend(cursor, user_id, timestamp, category, transaction_type, -amount)
+            mark_sheet_row_deleted(cursor, user_id, transaction_id)
+        data_version.bump(user_id)
+        return True
+    except Exception as e:
+        print(f"Помилка видалення транзакції: {e}")
+        return False
+
+
 def get_transaction_history(user_id, limit=10):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT timestamp, amount, category, type
@@ -455,7 +218,7 @@ def get_transaction_history(user_id, limit=10):
 
 def filter_transactions_by_category_or_type(user_id, filter_param, limit=20):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT timestamp, amount, category, type
@@ -475,7 +238,7 @@ def filter_transactions_by_category_or_type(user_id, filter_param, limit=20):
 
 def get_last_transaction(user_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT id, amount, category, type, timestamp
@@ -493,12 +256,27 @@ def get_last_transaction(user_id):
         conn.close()
 
 
+@serialized_write
 def delete_transaction(transaction_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
+        cursor.execute("""
+                       SELECT user_id, amount, category, type, timestamp
+                       FROM transactions
+                       WHERE id = ?
+                       """, (transaction_id,))
+        transaction_data = cursor.fetchone()
+
         cursor.execute("DELETE FROM transactions WHERE id = ?", (transaction_id,))
+        if transaction_data:
+            user_id, amount, category, transaction_type, timestamp = transaction_data
+            apply_daily_rollup(cursor, user_id, timestamp, category, transaction_type, -amount, count=-1)
+            apply_period_spend(cursor, user_id, timestamp, category, transaction_type, -amount)
+            mark_sheet_row_deleted(cursor, user_id, transaction_id)
         conn.commit()
+        if transaction_data:
+            data_version.bump(transaction_data[0])
         return True
     except Exception as e:
         print(f"Помилка видалення транзакції: {e}")
@@ -507,9 +285,10 @@ def delete_transaction(transaction_id):
         conn.close()
 
 
+@serialized_write
 def add_goal(user_id, amount, description):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        INSERT INTO goals (user_id, amount, description, date)
@@ -526,7 +305,7 @@ def add_goal(user_id, amount, description):
 
 def get_goals(user_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT amount, description, date
@@ -543,19 +322,35 @@ def get_goals(user_id):
         conn.close()
 
 
+@serialized_write
 def set_budget(user_id, category, amount):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         cursor.execute("""
-                       SELECT COALESCE(SUM(amount), 0)
-                       FROM transactions
-                       WHERE user_id = ?
-                         AND category = ?
+                       SELECT b.amount, COALESCE(a.amount, 0)
+                       FROM budget b
+                                LEFT JOIN budget_adjustments a
+                                          ON a.user_id = b.user_id AND a.category = b.category
+                       WHERE b.user_id = ?
+                         AND b.category = ?
                        """, (user_id, category))
 
-        transaction_total = cursor.fetchone()[0]
+        current = cursor.fetchone()
+        if current:
+            # budget = сума транзакцій + коригування, тож суму транзакцій
+            # можна отримати з поточного бюджету без сканування історії
+            current_budget, current_adjustment = current
+            transaction_total = current_budget - current_adjustment
+        else:
+            cursor.execute("""
+                           SELECT COALESCE(SUM(amount), 0)
+                           FROM transactions
+                           WHERE user_id = ?
+                             AND category = ?
+                           """, (user_id, category))
+            transaction_total = cursor.fetchone()[0]
 
         adjustment = amount - transaction_total
 
@@ -572,6 +367,9 @@ def set_budget(user_id, category, amount):
                        UPDATE SET amount = ?
                        """, (user_id, category, amount, amount))
 
+        # Встановлена сума стає й місячним лімітом категорії
+        _set_monthly_limit(cursor, user_id, category, amount)
+
         conn.commit()
         return True
     except Exception as e:
@@ -581,53 +379,246 @@ def set_budget(user_id, category, amount):
         conn.close()
 
 
-def update_budget_for_transaction(user_id, amount, category):
-    try:
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
+def apply_budget_delta(cursor, user_id, category, delta):
+    """
+    Змінює бюджет категорії на delta одним UPDATE без перерахунку історії.
+
+    Викликається на курсорі тієї ж транзакції, що додала або видалила рядок
+    transactions, і вже після цієї зміни. Якщо рядка бюджету ще немає,
+    він один раз створюється з повної суми транзакцій та коригування.
+    """
+    cursor.execute("""
+                   UPDATE budget
+                   SET amount = amount + ?
+                   WHERE user_id = ?
+                     AND category = ?
+                   """, (delta, user_id, category))
 
+    if cursor.rowcount == 0:
         cursor.execute("""
-                       SELECT COALESCE(SUM(amount), 0)
-                       FROM transactions
-                       WHERE user_id = ?
-                         AND category = ?
-                       """, (user_id, category))
+                       INSERT INTO budget (user_id, category, amount)
+                       SELECT ?,
+                              ?,
+                              (SELECT COALESCE(SUM(amount), 0)
+                               FROM transactions
+                               WHERE user_id = ?
+                                 AND category = ?) +
+                              (SELECT COALESCE(SUM(amount), 0)
+                               FROM budget_adjustments
+                               WHERE user_id = ?
+                                 AND category = ?)
+                       """, (user_id, category, user_id, category, user_id, category))
+
 
-        transaction_total = cursor.fetchone()[0]
+def apply_daily_rollup(cursor, user_id, timestamp, category, transaction_type, amount, count=1):
+    """
+    Додає транзакцію до денного зведення daily_rollups (count=-1 і -amount — видаляє).
 
+    Викликається на курсорі тієї ж транзакції SQLite, що змінила transactions.
+    """
+    cursor.execute("""
+                   INSERT INTO daily_rollups (user_id, day, category, type, total, count)
+                   VALUES (?, date(?), ?, ?, ?, ?)
+                   ON CONFLICT (user_id, day, category, type) DO UPDATE
+                       SET total = total + excluded.total,
+                           count = count + excluded.count
+                   """, (user_id, timestamp, category or '', transaction_type or '', amount, count))
+
+    if count < 0:
         cursor.execute("""
-                       SELECT amount
-                       FROM budget_adjustments
+                       DELETE
+                       FROM daily_rollups
                        WHERE user_id = ?
+                         AND day = date(?)
                          AND category = ?
-                       """, (user_id, category))
+                         AND type = ?
+                         AND count <= 0
+                       """, (user_id, timestamp, category or '', transaction_type or ''))
+
+
+def current_period(now=None):
+    """Місяць бюджету у форматі 'YYYY-MM' (за місцевим часом, як і timestamp транзакцій)."""
+    return (now or datetime.now()).strftime("%Y-%m")
+
+
+def _period_of(timestamp):
+    """Місяць транзакції 'YYYY-MM' або None, якщо час записано в іншому форматі."""
+    period = str(timestamp or "")[:7]
+    if len(period) == 7 and period[4] == "-" and period[:4].isdigit() and period[5:].isdigit():
+        return period
+    return None
+
+
+def _period_bounds(period):
+    year, month = (int(part) for part in period.split("-"))
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+
+def _open_budget_periods(cursor, period, user_id=None, category=None):
+    """
+    Відкриває період для лімітів з budget_limits; вже відкриті періоди не змінюються.
+
+    Витрачене на момент відкриття береться з daily_rollups за місяць, тож
+    транзакції, додані до відкриття періоду, теж враховуються.
+    """
+    start, end = _period_bounds(period)
+    conditions = ""
+    params = [period, start, end]
+    if user_id is not None:
+        conditions += " AND l.user_id = ?"
+        params.append(user_id)
+    if category is not None:
+        conditions += " AND l.category = ?"
+        params.append(category)
+
+    # WHERE обов'язковий: без нього SQLite сприймає ON CONFLICT як частину SELECT
+    cursor.execute(f"""
+                   INSERT INTO budget_periods (user_id, period, category, limit_amount, spent)
+                   SELECT l.user_id,
+                          ?,
+                          l.category,
+                          l.monthly_limit,
+                          COALESCE((SELECT -SUM(r.total)
+                                    FROM daily_rollups r
+                                    WHERE r.user_id = l.user_id
+                                      AND r.day >= ?
+                                      AND r.day < ?
+                                      AND r.category = l.category
+                                      AND r.type = 'витрата'), 0)
+                   FROM budget_limits l
+                   WHERE 1 {conditions}
+                   ON CONFLICT (user_id, period, category) DO NOTHING
+                   """, params)
+    return cursor.rowcount
+
+
+def apply_period_spend(cursor, user_id, timestamp, category, transaction_type, amount):
+    """
+    Змінює витрачене за місяць транзакції в budget_periods одним UPDATE.
+
+    amount — сума транзакції (витрата від'ємна; при видаленні передається -amount).
+    Викликається на курсорі тієї ж транзакції SQLite і після apply_daily_rollup:
+    якщо період ще не відкрито, він відкривається з уже оновлених зведень.
+    """
+    period = _period_of(timestamp)
+    if transaction_type != "витрата" or period is None:
+        return
 
-        adjustment_result = cursor.fetchone()
-        adjustment = adjustment_result[0] if adjustment_result else 0
+    cursor.execute("""
+                   UPDATE budget_periods
+                   SET spent = spent - ?
+                   WHERE user_id = ?
+                     AND period = ?
+                     AND category = ?
+                   """, (amount, user_id, period, category))
 
-        new_budget = transaction_total + adjustment
+    if cursor.rowcount == 0:
+        _open_budget_periods(cursor, period, user_id, category)
 
+
+def _set_monthly_limit(cursor, user_id, category, limit_amount):
+    cursor.execute("""
+                   INSERT INTO budget_limits (user_id, category, monthly_limit, updated_at)
+                   VALUES (?, ?, ?, ?)
+                   ON CONFLICT (user_id, category) DO UPDATE
+                       SET monthly_limit = excluded.monthly_limit,
+                           updated_at    = excluded.updated_at
+                   """, (user_id, category, limit_amount, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+
+    period = current_period()
+    cursor.execute("""
+                   UPDATE budget_periods
+                   SET limit_amount = ?
+                   WHERE user_id = ?
+                     AND period = ?
+                     AND category = ?
+                   """, (limit_amount, user_id, period, category))
+
+    if cursor.rowcount == 0:
+        _open_budget_periods(cursor, period, user_id, category)
+
+
+@serialized_write
+def open_budget_periods(period=None):
+    """
+    Відкриває місяць period (за замовчуванням поточний) для всіх лімітів одним запитом.
+
+    Returns:
+        int: кількість відкритих періодів або None у разі помилки
+    """
+    period = period or current_period()
+    try:
+        with unit_of_work() as cursor:
+            return _open_budget_periods(cursor, period)
+    except Exception as e:
+        print(f"Помилка відкриття бюджетних періодів: {e}")
+        return None
+
+
+def get_budget_periods(user_id, period=None):
+    """
+    Ліміти категорій за місяць з уже підрахованими витратами.
+
+    Returns:
+        list: (category, limit_amount, spent, remaining), впорядковані за категорією
+    """
+    try:
+        conn = connect(DATABASE_FILE)
+        cursor = conn.cursor()
         cursor.execute("""
-                       SELECT amount
-                       FROM budget
+                       SELECT category, limit_amount, spent, limit_amount - spent
+                       FROM budget_periods
+                       WHERE user_id = ?
+                         AND period = ?
+                       ORDER BY category
+                       """, (user_id, period or current_period()))
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"Помилка отримання бюджетних періодів: {e}")
+        return []
+    finally:
+        conn.close()
+
+
+def get_remaining_budget(user_id, category, period=None):
+    """Залишок місячного ліміту категорії (пошук за первинним ключем) або None, якщо ліміту немає."""
+    try:
+        conn = connect(DATABASE_FILE)
+        cursor = conn.cursor()
+        cursor.execute("""
+                       SELECT limit_amount - spent
+                       FROM budget_periods
                        WHERE user_id = ?
+                         AND period = ?
                          AND category = ?
-                       """, (user_id, category))
+                       """, (user_id, period or current_period(), category))
+        row = cursor.fetchone()
+        return row[0] if row else None
+    except Exception as e:
+        print(f"Помилка отримання залишку бюджету: {e}")
+        return None
+    finally:
+        conn.close()
 
-        result = cursor.fetchone()
 
-        if result:
-            cursor.execute("""
-                           UPDATE budget
-                           SET amount = ?
-                           WHERE user_id = ?
-                             AND category = ?
-                           """, (new_budget, user_id, category))
-        else:
-            cursor.execute("""
-                           INSERT INTO budget (user_id, category, amount)
-                           VALUES (?, ?, ?)
-                           """, (user_id, category, new_budget))
+def mark_sheet_row_deleted(cursor, user_id, transaction_id):
+    """Позначає вже синхронізований рядок транзакції для очищення при наступній синхронізації."""
+    cursor.execute("""
+                   UPDATE sheet_sync_rows
+                   SET deleted = 1
+                   WHERE user_id = ?
+                     AND transaction_id = ?
+                   """, (user_id, transaction_id))
+
+
+@serialized_write
+def update_budget_for_transaction(user_id, amount, category):
+    try:
+        conn = connect(DATABASE_FILE)
+        cursor = conn.cursor()
+
+        apply_budget_delta(cursor, user_id, category, amount)
 
         conn.commit()
         return True
@@ -638,9 +629,10 @@ def update_budget_for_transaction(user_id, amount, category):
         conn.close()
 
 
+@serialized_write
 def recalculate_user_budget(user_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         cursor.execute("DELETE FROM budget WHERE user_id = ?", (user_id,))
@@ -689,9 +681,59 @@ def recalculate_user_budget(user_id):
         conn.close()
 
 
+def check_budget_consistency(user_id=None, tolerance=0.005):
+    """
+    Порівнює збережені бюджети з повним перерахунком (сума транзакцій + коригування).
+
+    Args:
+        user_id (int): ID користувача або None для всіх користувачів
+        tolerance (float): допустима похибка округлення
+
+    Returns:
+        list: (user_id, category, stored, expected) для кожної розбіжності
+    """
+    user_filter = "WHERE user_id = ?" if user_id is not None else ""
+    params = (user_id,) * 3 if user_id is not None else ()
+
+    try:
+        conn = connect(DATABASE_FILE)
+        cursor = conn.cursor()
+        cursor.execute(f"""
+                       SELECT keys.user_id,
+                              keys.category,
+                              b.amount,
+                              COALESCE(t.total, 0) + COALESCE(a.amount, 0)
+                       FROM (SELECT user_id, category FROM budget {user_filter}
+                             UNION
+                             SELECT user_id, category FROM transactions {user_filter}
+                             UNION
+                             SELECT user_id, category FROM budget_adjustments {user_filter}) keys
+                                LEFT JOIN budget b
+                                          ON b.user_id = keys.user_id AND b.category = keys.category
+                                LEFT JOIN (SELECT user_id, category, SUM(amount) AS total
+                                           FROM transactions
+                                           GROUP BY user_id, category) t
+                                          ON t.user_id = keys.user_id AND t.category = keys.category
+                                LEFT JOIN budget_adjustments a
+                                          ON a.user_id = keys.user_id AND a.category = keys.category
+                       """, params)
+
+        return [
+            (row_user_id, category, stored, expected)
+            for row_user_id, category, stored, expected in cursor.fetchall()
+            if stored is None and abs(expected) > tolerance
+            or stored is not None and abs(stored - expected) > tolerance
+        ]
+    except Exception as e:
+        print(f"Помилка перевірки узгодженості бюджетів: {e}")
+        return []
+    finally:
+        conn.close()
+
+
 def get_budgets(user_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT category, amount
@@ -714,7 +756,7 @@ def check_database():
             print(f"База даних {DATABASE_FILE} не існує")
             return False
 
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
@@ -744,6 +786,7 @@ def check_database():
         return False
 
 
+@serialized_write
 def save_debt(user_id, name, amount, due_date=None):
     if not check_database():
         print("Перевірка бази даних не вдалася, неможливо зберегти борг")
@@ -754,7 +797,7 @@ def save_debt(user_id, name, amount, due_date=None):
             print("Помилка збереження боргу: Ім'я не може бути порожнім")
             return False
 
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='debts'")
@@ -792,7 +835,7 @@ def save_debt(user_id, name, amount, due_date=None):
 
 def get_active_debts(user_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT debtor, amount, due_date, creation_time
@@ -811,7 +854,7 @@ def get_active_debts(user_id):
 
 def get_debt_history(user_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT debtor, amount, status, due_date, creation_time
@@ -828,9 +871,10 @@ def get_debt_history(user_id):
         conn.close()
 
 
+@serialized_write
 def close_debt(user_id, name, amount=None):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         if amount is not None:
@@ -860,9 +904,10 @@ def close_debt(user_id, name, amount=None):
         conn.close()
 
 
+@serialized_write
 def add_piggy_bank_goal(user_id, name, target_amount, description=""):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         created_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -883,7 +928,7 @@ def add_piggy_bank_goal(user_id, name, target_amount, description=""):
 
 def get_piggy_bank_goals(user_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT id, name, target_amount, current_amount, description, created_date, completed
@@ -900,9 +945,10 @@ def get_piggy_bank_goals(user_id):
         conn.close()
 
 
+@serialized_write
 def add_funds_to_goal(user_id, goal_id, amount):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -938,48 +984,9 @@ def add_funds_to_goal(user_id, goal_id, amount):
                        VALUES (?, ?, ?, ?, ?)
                        """, (user_id, -amount, "Скарбничка", "витрата", timestamp))
 
-        cursor.execute("""
-                       SELECT COALESCE(SUM(amount), 0)
-                       FROM transactions
-                       WHERE user_id = ?
-                         AND category = ?
-                       """, (user_id, "Скарбничка"))
-
-        transaction_total = cursor.fetchone()[0]
-
-        cursor.execute("""
-                       SELECT amount
-                       FROM budget_adjustments
-                       WHERE user_id = ?
-                         AND category = ?
-                       """, (user_id, "Скарбничка"))
-
-        adjustment_result = cursor.fetchone()
-        adjustment = adjustment_result[0] if adjustment_result else 0
-
-        new_budget = transaction_total + adjustment
-
-        cursor.execute("""
-                       SELECT amount
-                       FROM budget
-                       WHERE user_id = ?
-                         AND category = ?
-                       """, (user_id, "Скарбничка"))
-
-        result = cursor.fetchone()
-
-        if result:
-            cursor.execute("""
-                           UPDATE budget
-                           SET amount = ?
-                           WHERE user_id = ?
-                             AND category = ?
-                           """, (new_budget, user_id, "Скарбничка"))
-        else:
-            cursor.execute("""
-                           INSERT INTO budget (user_id, category, amount)
-                           VALUES (?, ?, ?)
-                           """, (user_id, "Скарбничка", new_budget))
+        apply_budget_delta(cursor, user_id, "Скарбничка", -amount)
+        apply_daily_rollup(cursor, user_id, timestamp, "Скарбничка", "витрата", -amount)
+        apply_period_spend(cursor, user_id, timestamp, "Скарбничка", "витрата", -amount)
 
         new_amount = current_amount + float(amount)
 
@@ -994,6 +1001,7 @@ def add_funds_to_goal(user_id, goal_id, amount):
                        """, (new_amount, new_completed, goal_id, user_id))
 
         conn.commit()
+        data_version.bump(user_id)
         return True
     except Exception as e:
         print(f"Помилка додавання коштів до цілі: {e}")
@@ -1002,9 +1010,10 @@ def add_funds_to_goal(user_id, goal_id, amount):
         conn.close()
 
 
+@serialized_write
 def delete_piggy_bank_goal(user_id, goal_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -1025,7 +1034,7 @@ def delete_piggy_bank_goal(user_id, goal_id):
 
 def get_piggy_bank_goal(user_id, goal_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT id, name, target_amount, current_amount, description, created_date, completed
@@ -1042,13 +1051,10 @@ def get_piggy_bank_goal(user_id, goal_id):
         conn.close()
 
 
+@serialized_write
 def add_reminder(user_id, title, reminder_datetime):
-    if not check_database():
-        print("Перевірка бази даних не вдалася, неможливо додати нагадування")
-        return None
-
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
@@ -1063,6 +1069,7 @@ def add_reminder(user_id, title, reminder_datetime):
 
         reminder_id = cursor.lastrowid
         conn.commit()
+        reminder_scheduler.schedule(reminder_id, user_id, title, reminder_datetime)
         print(f"Додано нагадування з ID: {reminder_id}")
         return reminder_id
     except Exception as e:
@@ -1074,7 +1081,7 @@ def add_reminder(user_id, title, reminder_datetime):
 
 def get_reminders(user_id, include_completed=False):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         if include_completed:
@@ -1104,7 +1111,7 @@ def get_reminders(user_id, include_completed=False):
 
 def get_reminder(user_id, reminder_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
         cursor.execute("""
                        SELECT id, title, reminder_datetime, created_at, is_completed
@@ -1121,13 +1128,14 @@ def get_reminder(user_id, reminder_id):
         conn.close()
 
 
+@serialized_write
 def update_reminder(user_id, reminder_id, title=None, reminder_datetime=None):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         cursor.execute("""
-                       SELECT title, reminder_datetime
+                       SELECT title, reminder_datetime, is_completed
                        FROM reminders
                        WHERE id = ?
                          AND user_id = ?
@@ -1137,7 +1145,7 @@ def update_reminder(user_id, reminder_id, title=None, reminder_datetime=None):
         if not current_data:
             return False
 
-        current_title, current_datetime = current_data
+        current_title, current_datetime, is_completed = current_data
 
         new_title = title if title is not None else current_title
         new_datetime = reminder_datetime if reminder_datetime is not None else current_datetime
@@ -1151,7 +1159,10 @@ def update_reminder(user_id, reminder_id, title=None, reminder_datetime=None):
                        """, (new_title, new_datetime, reminder_id, user_id))
 
         conn.commit()
-        return cursor.rowcount > 0
+        updated = cursor.rowcount > 0
+        if updated and not is_completed:
+            reminder_scheduler.schedule(reminder_id, user_id, new_title, new_datetime)
+        return updated
     except Exception as e:
         print(f"Помилка оновлення нагадування: {e}")
         return False
@@ -1159,20 +1170,16 @@ def update_reminder(user_id, reminder_id, title=None, reminder_datetime=None):
         conn.close()
 
 
+@serialized_write
 def mark_reminder_completed(user_id, reminder_id):
-    if not check_database():
-        print("Перевірка бази даних не вдалася, неможливо позначити нагадування як виконане")
-        return False
-
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='reminders'")
         if not cursor.fetchone():
             print("Таблиця 'reminders' не існує, створюю її")
             create_reminders_table()
-            conn.close()
             return False
 
         cursor.execute("""
@@ -1184,6 +1191,8 @@ def mark_reminder_completed(user_id, reminder_id):
 
         conn.commit()
         rows_affected = cursor.rowcount
+        if rows_affected:
+            reminder_scheduler.cancel(reminder_id)
         print(f"Позначено {rows_affected} нагадувань як виконані")
         return rows_affected > 0
     except Exception as e:
@@ -1193,9 +1202,49 @@ def mark_reminder_completed(user_id, reminder_id):
         conn.close()
 
 
+@serialized_write
+def mark_reminders_completed(reminder_ids, batch_size=500):
+    """
+    Позначає надіслані нагадування виконаними пакетними UPDATE в одній транзакції.
+
+    Returns:
+        int: кількість позначених нагадувань
+    """
+    reminder_ids = list(reminder_ids)
+    if not reminder_ids:
+        return 0
+
+    try:
+        conn = connect(DATABASE_FILE)
+        cursor = conn.cursor()
+
+        updated = 0
+        for start in range(0, len(reminder_ids), batch_size):
+            batch = reminder_ids[start:start + batch_size]
+            placeholders = ", ".join("?" for _ in batch)
+            cursor.execute(f"""
+                           UPDATE reminders
+                           SET is_completed = 1
+                           WHERE id IN ({placeholders})
+                             AND is_completed = 0
+                           """, batch)
+            updated += cursor.rowcount
+
+        conn.commit()
+        for reminder_id in reminder_ids:
+            reminder_scheduler.cancel(reminder_id)
+        return updated
+    except Exception as e:
+        print(f"Помилка позначення нагадувань як виконаних: {e}")
+        return 0
+    finally:
+        conn.close()
+
+
+@serialized_write
 def delete_reminder(user_id, reminder_id):
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -1206,7 +1255,10 @@ def delete_reminder(user_id, reminder_id):
                        """, (reminder_id, user_id))
 
         conn.commit()
-        return cursor.rowcount > 0
+        deleted = cursor.rowcount > 0
+        if deleted:
+            reminder_scheduler.cancel(reminder_id)
+        return deleted
     except Exception as e:
         print(f"Error deleting reminder: {e}")
         return False
@@ -1214,39 +1266,81 @@ def delete_reminder(user_id, reminder_id):
         conn.close()
 
 
-def get_due_reminders():
-    if not check_database():
-        print("Перевірка бази даних не вдалася, неможливо отримати нагадування")
-        return []
+def get_pending_reminders(reminder_ids=None):
+    """
+    Невиконані нагадування для планувальника, без перевірок схеми та виводу.
+
+    Args:
+        reminder_ids: обмежити вибірку цими id (перевірка перед доставкою)
 
+    Returns:
+        list: кортежі (id, user_id, title, reminder_datetime);
+              None, якщо запит не вдався (на відміну від порожнього списку)
+    """
     try:
-        conn = sqlite3.connect(DATABASE_FILE)
+        conn = connect(DATABASE_FILE)
         cursor = conn.cursor()
 
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='reminders'")
-        if not cursor.fetchone():
-            print("Таблиця 'reminders' не існує, створюю її")
-            create_reminders_table()
-            conn.close()
-            return []
+        if reminder_ids is None:
+            cursor.execute("""
+                           SELECT id, user_id, title, reminder_datetime
+                           FROM reminders
+                           WHERE is_completed = 0
+                           ORDER BY reminder_datetime
+                           """)
+        else:
+            reminder_ids = list(reminder_ids)
+            if not reminder_ids:
+                return []
+            placeholders = ", ".join("?" for _ in reminder_ids)
+            cursor.execute(f"""
+                           SELECT id, user_id, title, reminder_datetime
+                           FROM reminders
+                           WHERE id IN ({placeholders})
+                             AND is_completed = 0
+                           """, reminder_ids)
+
+        return cursor.fetchall()
+    except Exception as e:
+        print(f"Помилка отримання нагадувань: {e}")
+        return None
+    finally:
+        conn.close()
 
-        current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        print(f"Поточний час: {current_time}")
 
-        cursor.execute("""
-                       SELECT id, user_id, title, reminder_datetime
-                       FROM reminders
-                       WHERE reminder_datetime <= ?
-                         AND is_completed = 0
-                       """, (current_time,))
+@serialized_write
+def save_rate_snapshot(base, rates, fetched_at):
+    """Замінює збережену таблицю курсів для base новою одним записом."""
+    try:
+        with unit_of_work() as cursor:
+            cursor.execute("DELETE FROM rate_snapshots WHERE base = ?", (base,))
+            cursor.executemany("""
+                               INSERT INTO rate_snapshots (base, currency, rate, fetched_at)
+                               VALUES (?, ?, ?, ?)
+                               """, [(base, currency, rate, fetched_at) for currency, rate in rates.items()])
+        return True
+    except Exception as e:
+        print(f"Помилка збереження курсів валют: {e}")
+        return False
 
-        reminders = cursor.fetchall()
-        print(f"Знайдено {len(reminders)} нагадувань для відправки")
-        for reminder in reminders:
-            print(f"Нагадування: {reminder}")
-        return reminders
+
+def get_rate_snapshots():
+    """
+    Усі збережені таблиці курсів.
+
+    Returns:
+        dict: база -> (fetched_at, {валюта: курс})
+    """
+    try:
+        conn = connect(DATABASE_FILE)
+        cursor = conn.cursor()
+        cursor.execute("SELECT base, currency, rate, fetched_at FROM rate_snapshots ORDER BY base")
+        snapshots = {}
+        for base, currency, rate, fetched_at in cursor.fetchall():
+            snapshots.setdefault(base, (fetched_at, {}))[1][currency] = rate
+        return snapshots
     except Exception as e:
-        print(f"Помилка отримання нагадувань: {e}")
-        return []
+        print(f"Помилка отримання курсів валют: {e}")
+        return {}
     finally:
         conn.close()
@@ -0,0 +1,98 @@
+import functools
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()
+
+
+class DatabaseWriter:
+    """
+    Виділений потік, через який проходять усі записи в базу даних.
+
+    Записи виконуються по черзі в одному потоці, тому з'єднання бота ніколи
+    не змагаються між собою за блокування запису, а в режимі WAL читання
+    не чекають на записи.
+    """
+
+    def __init__(self, name="db-writer"):
+        self.name = name
+        self._queue = queue.Queue()
+        self._thread = None
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info("Потік запису в базу даних запущено")
+
+    def stop(self, timeout=10):
+        if not self.running:
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+        self._thread = None
+        logger.info("Потік запису в базу даних зупинено")
+
+    def is_writer_thread(self):
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def submit(self, func, *args, **kwargs):
+        """Ставить func у чергу запису і чекає на її результат."""
+        future = Future()
+        self._queue.put((func, args, kwargs, future))
+        return future.result()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            func, args, kwargs, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+_writer = DatabaseWriter()
+
+
+def start():
+    _writer.start()
+
+
+def stop():
+    _writer.stop()
+
+
+def is_running():
+    return _writer.running
+
+
+def serialized_write(func):
+    """
+    Декоратор для функцій, що пишуть у базу даних.
+
+    Якщо потік запису запущено, виклик виконується в ньому; інакше (та для
+    вкладених викликів з самого потоку запису) функція виконується одразу.
+    """
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _writer.running or _writer.is_writer_thread():
+            return func(*args, **kwargs)
+        return _writer.submit(func, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,234 @@
+"""
+Фонова черга експорту транзакцій.
+
+Обробник оновлення лише ставить задачу в обмежену чергу й одразу повертається;
+кілька воркерів будують файли у власному пулі потоків (по потоку на воркер,
+щоб великі експорти не займали пул бази, яким користуються обробники) і через
+колбеки повідомляють про прогрес і результат. Повторний запит того самого експорту,
+поки попередній ще в черзі чи виконується, приєднується до наявної задачі.
+
+metrics() повертає глибину черги, лічильники задач і затримки (очікування в
+черзі та повний час від запиту до готового файлу).
+"""
+import asyncio
+import functools
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from services.analytics_service import export_transactions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_SIZE = 100
+
+# Як часто (секунди) повідомляти про прогрес: кожне повідомлення — це edit_message у Telegram
+PROGRESS_INTERVAL = 2.0
+
+# Скільки останніх задач враховувати в перцентилях затримки
+LATENCY_WINDOW = 500
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class ExportJob:
+    def __init__(self, user_id, export_format, on_progress=None, on_done=None):
+        self.user_id = user_id
+        self.export_format = export_format
+        self.on_progress = on_progress
+        self.on_done = on_done
+        self.created = time.monotonic()
+        self.started = None
+        self.progress = None  # (записано рядків, усього рядків); пише потік експорту
+        self.error = None
+
+    @property
+    def key(self):
+        return self.user_id, self.export_format
+
+    def report_progress(self, done, total):
+        # Викликається з потоку бази: присвоєння кортежу атомарне, цикл подій лише читає його
+        self.progress = (done, total)
+
+
+class ExportQueue:
+    def __init__(self, workers=DEFAULT_WORKERS, max_size=DEFAULT_MAX_SIZE):
+        self.workers = workers
+        self.max_size = max_size
+        self._queue = None
+        self._tasks = []
+        self._executor = None
+        self._jobs = {}  # (user_id, формат) -> задача в черзі або в роботі
+        self._export = export_transactions
+        self._active = 0
+        self._waits = deque(maxlen=LATENCY_WINDOW)
+        self._latencies = deque(maxlen=LATENCY_WINDOW)
+        self._counters = {"submitted": 0, "merged": 0, "rejected": 0, "completed": 0, "failed": 0}
+
+    @property
+    def running(self):
+        return bool(self._tasks)
+
+    async def start(self, export=None):
+        """
+        Запускає воркери в поточному циклі подій.
+
+        Args:
+            export: блокуюча функція (user_id, формат, progress=...) -> результат;
+                    за замовчуванням analytics_service.export_transactions
+        """
+        if self.running:
+            return
+        if export is not None:
+            self._export = export
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="export")
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Черга експорту запущена: {self.workers} воркерів, до {self.max_size} задач")
+
+    async def stop(self):
+        if not self.running:
+            return
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Експорти, що вже пишуть файл, дописуються до кінця, поки база ще відкрита
+        await asyncio.to_thread(self._executor.shutdown, cancel_futures=True)
+        self._executor = None
+        self._tasks = []
+        self._queue = None
+        self._jobs.clear()
+        self._active = 0
+        logger.info("Черга експорту зупинена")
+
+    def submit(self, user_id, export_format, on_progress=None, on_done=None):
+        """
+        Ставить експорт у чергу або приєднує запит до такого самого, що вже готується.
+
+        Args:
+            on_progress: корутина (job), не частіше ніж раз на PROGRESS_INTERVAL
+            on_done: корутина (job, result); result — те, що повернув експорт
+                     (його ресурси звільняє колбек), або None при помилці (job.error)
+
+        Returns:
+            tuple: (задача, True — нова / False — приєднано до наявної)
+
+        Raises:
+            RuntimeError: черга не запущена
+            asyncio.QueueFull: черга заповнена
+        """
+        if not self.running:
+            raise RuntimeError("Черга експорту не запущена")
+
+        job = self._jobs.get((user_id, export_format))
+        if job is not None:
+            self._counters["merged"] += 1
+            return job, False
+
+        job = ExportJob(user_id, export_format, on_progress, on_done)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._counters["rejected"] += 1
+            raise
+        self._jobs[job.key] = job
+        self._counters["submitted"] += 1
+        return job, True
+
+    def metrics(self):
+        return {
+            "depth": self._queue.qsize() if self._queue else 0,
+            "active": self._active,
+            **self._counters,
+            "wait_p50": _percentile(self._waits, 0.5),
+            "wait_max": max(self._waits, default=0.0),
+            "latency_p50": _percentile(self._latencies, 0.5),
+            "latency_p95": _percentile(self._latencies, 0.95),
+            "latency_max": max(self._latencies, default=0.0),
+        }
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            self._active += 1
+            try:
+                await self._run(job)
+            finally:
+                self._active -= 1
+                self._queue.task_done()
+
+    async def _run(self, job):
+        job.started = time.monotonic()
+        self._waits.append(job.started - job.created)
+
+        export = asyncio.get_running_loop().run_in_executor(
+            self._executor,
+            functools.partial(self._export, job.user_id, job.export_format, progress=job.report_progress))
+        reported = None
+        while True:
+            done, _ = await asyncio.wait({export}, timeout=PROGRESS_INTERVAL)
+            if done:
+                break
+            if job.on_progress and job.progress != reported:
+                reported = job.progress
+                await self._callback(job.on_progress, job)
+
+        # Після готовності файлу новий запит уже означає новий експорт
+        self._jobs.pop(job.key, None)
+        try:
+            result = export.result()
+            self._counters["completed"] += 1
+        except Exception as e:
+            logger.error(f"Помилка експорту для користувача {job.user_id}: {e}")
+            job.error = e
+            result = None
+            self._counters["failed"] += 1
+
+        self._latencies.append(time.monotonic() - job.created)
+        if job.on_done:
+            await self._callback(job.on_done, job, result)
+
+    async def _callback(self, callback, *args):
+        try:
+            await callback(*args)
+        except Exception as e:
+            logger.error(f"Помилка колбека черги експорту: {e}")
+
+
+_export_queue = ExportQueue()
+
+
+def configure(workers=None, max_size=None):
+    """Задає розмір пулу воркерів і черги; діє з наступного запуску."""
+    if workers is not None:
+        _export_queue.workers = workers
+    if max_size is not None:
+        _export_queue.max_size = max_size
+
+
+async def start(export=None):
+    await _export_queue.start(export)
+
+
+async def stop():
+    await _export_queue.stop()
+
+
+def is_running():
+    return _export_queue.running
+
+
+def submit(user_id, export_format, on_progress=None, on_done=None):
+    return _export_queue.submit(user_id, export_format, on_progress, on_done)
+
+
+def metrics():
+    return _export_queue.metrics()
@@ -1,13 +1,136 @@
+import asyncio
 import logging
 from telegram import Update
 from telegram.ext import CallbackContext
 from datetime import datetime
+from services import database_service
+from services.async_database_service import run_blocking
 from services.database_service import create_command_logs_table, insert_command_log
 
 logger = logging.getLogger(__name__)
 
 create_command_logs_table()
 
+DEFAULT_BATCH_SIZE = 200
+DEFAULT_FLUSH_INTERVAL = 5.0
+# Скільки рядків тримати в пам'яті, якщо база недоступна; найстаріші відкидаються
+MAX_BUFFERED_ROWS = 10000
+
+
+class CommandLogBuffer:
+    """
+    Буфер журналу команд.
+
+    Обробник лише додає рядок у пам'ять, а фонова задача записує накопичене
+    однією транзакцією (executemany), коли набралось batch_size рядків або
+    минуло flush_interval секунд. При зупинці буфер дописується до кінця.
+    Поки буфер не запущено, рядки записуються одразу, як раніше.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, flush_interval=DEFAULT_FLUSH_INTERVAL,
+                 max_rows=MAX_BUFFERED_ROWS):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_rows = max_rows
+        self._rows = []
+        self._task = None
+        self._wakeup = None
+        self._flush_lock = None
+        self.flushes = 0
+        self.written = 0
+        self.dropped = 0
+
+    @property
+    def running(self):
+        return self._task is not None
+
+    async def start(self):
+        if self.running:
+            return
+        self._wakeup = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Буфер журналу команд запущено: до {self.batch_size} рядків або {self.flush_interval} с")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        await self.flush()
+        if self._rows:
+            logger.error(f"Не вдалося записати {len(self._rows)} рядків журналу команд")
+            self._rows = []
+        logger.info("Буфер журналу команд зупинено")
+
+    def add(self, row):
+        if not self.running:
+            insert_command_log(*row)
+            return
+        self._rows.append(row)
+        if len(self._rows) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self):
+        """Записує все накопичене; при помилці рядки повертаються в буфер до наступної спроби."""
+        async with self._flush_lock:
+            rows, self._rows = self._rows, []
+            if not rows:
+                return
+            try:
+                await run_blocking(database_service.insert_command_logs, rows)
+            except Exception as e:
+                logger.error(f"Помилка запису журналу команд: {e}")
+                self._rows = rows + self._rows
+                overflow = len(self._rows) - self.max_rows
+                if overflow > 0:
+                    del self._rows[:overflow]
+                    self.dropped += overflow
+                return
+            self.flushes += 1
+            self.written += len(rows)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    def stats(self):
+        return {"buffered": len(self._rows), "flushes": self.flushes, "written": self.written,
+                "dropped": self.dropped}
+
+
+_buffer = CommandLogBuffer()
+
+
+def configure(batch_size=None, flush_interval=None):
+    if batch_size is not None:
+        _buffer.batch_size = batch_size
+    if flush_interval is not None:
+        _buffer.flush_interval = flush_interval
+
+
+async def start():
+    await _buffer.start()
+
+
+async def stop():
+    await _buffer.stop()
+
+
+async def flush():
+    if _buffer.running:
+        await _buffer.flush()
+
+
+def stats():
+    return _buffer.stats()
+
 
 async def log_command_usage(update: Update, context: CallbackContext):
     """Логує використання команди та записує подію в базу даних."""
@@ -30,6 +153,6 @@ async def log_command_usage(update: Update, context: CallbackContext):
     if not command:
         return
 
-    insert_command_log(user_id, username, full_name, command, timestamp)
+    _buffer.add((user_id, username, full_name, command, timestamp))
 
     logger.info(f"Команда {command} була викликана користувачем {user_id} ({username})")
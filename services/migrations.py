@@ -0,0 +1,339 @@
+from datetime import datetime
+
+# Схема таблиць на момент міграції 1. Не змінюється: нові таблиці й стовпці
+# створює міграція, яка їх вводить
+BASELINE_SCHEMAS = {
+    "command_logs": """
+                    CREATE TABLE IF NOT EXISTS command_logs
+                    (
+                        id        INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id   INTEGER,
+                        username  TEXT,
+                        full_name TEXT,
+                        command   TEXT,
+                        timestamp TEXT
+                    )
+                    """,
+    "transactions": """
+                    CREATE TABLE IF NOT EXISTS transactions
+                    (
+                        id        INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id   INTEGER,
+                        amount    REAL,
+                        category  TEXT,
+                        type      TEXT,
+                        timestamp TEXT
+                    )
+                    """,
+    "budget": """
+              CREATE TABLE IF NOT EXISTS budget
+              (
+                  user_id  INTEGER,
+                  category TEXT,
+                  amount   REAL,
+                  PRIMARY KEY (user_id, category)
+              )
+              """,
+    "budget_adjustments": """
+                          CREATE TABLE IF NOT EXISTS budget_adjustments
+                          (
+                              id        INTEGER PRIMARY KEY AUTOINCREMENT,
+                              user_id   INTEGER,
+                              category  TEXT,
+                              amount    REAL,
+                              timestamp TEXT,
+                              UNIQUE (user_id, category)
+                          )
+                          """,
+    "goals": """
+             CREATE TABLE IF NOT EXISTS goals
+             (
+                 id          INTEGER PRIMARY KEY AUTOINCREMENT,
+                 user_id     INTEGER,
+                 amount      REAL,
+                 description TEXT,
+                 date        TEXT
+             )
+             """,
+    "piggy_bank": """
+                  CREATE TABLE IF NOT EXISTS piggy_bank
+                  (
+                      id             INTEGER PRIMARY KEY AUTOINCREMENT,
+                      user_id        INTEGER,
+                      name           TEXT,
+                      target_amount  REAL,
+                      current_amount REAL    DEFAULT 0,
+                      description    TEXT,
+                      created_date   TEXT,
+                      completed      INTEGER DEFAULT 0
+                  )
+                  """,
+    "debts": """
+             CREATE TABLE IF NOT EXISTS debts
+             (
+                 id            INTEGER PRIMARY KEY AUTOINCREMENT,
+                 user_id       INTEGER,
+                 debtor        TEXT,
+                 amount        REAL,
+                 status        TEXT DEFAULT 'open',
+                 due_date      TEXT,
+                 creation_time TEXT
+             )
+             """,
+    "reminders": """
+                 CREATE TABLE IF NOT EXISTS reminders
+                 (
+                     id                INTEGER PRIMARY KEY AUTOINCREMENT,
+                     user_id           INTEGER,
+                     title             TEXT,
+                     reminder_datetime TEXT,
+                     created_at        TEXT,
+                     is_completed      INTEGER DEFAULT 0
+                 )
+                 """,
+}
+
+# Індекси під кожен WHERE/ORDER BY модуля: запити користувача шукають
+# лише по його рядках, а не скануючи всю таблицю
+INDEXES = (
+    ("idx_transactions_user_timestamp",
+     "transactions (user_id, timestamp DESC, amount, category, type)"),
+    ("idx_transactions_user_category",
+     "transactions (user_id, category, type, amount)"),
+    ("idx_goals_user_date", "goals (user_id, date DESC)"),
+    ("idx_piggy_bank_user_created", "piggy_bank (user_id, created_date DESC)"),
+    ("idx_debts_user_status", "debts (user_id, status)"),
+    ("idx_reminders_due", "reminders (is_completed, reminder_datetime)"),
+    ("idx_reminders_user", "reminders (user_id, is_completed, reminder_datetime)"),
+)
+
+# Частковий індекс: синхронізація шукає лише рядки, видалені після попередньої
+SHEET_SYNC_DELETED_INDEX = ("CREATE INDEX IF NOT EXISTS idx_sheet_sync_rows_deleted "
+                            "ON sheet_sync_rows (user_id) WHERE deleted = 1")
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _columns(cursor, table):
+    cursor.execute(f"PRAGMA table_info({table})")
+    return [column[1] for column in cursor.fetchall()]
+
+
+def create_tables(cursor):
+    for schema in BASELINE_SCHEMAS.values():
+        cursor.execute(schema)
+
+
+def add_debts_creation_time(cursor):
+    if "creation_time" not in _columns(cursor, "debts"):
+        cursor.execute("ALTER TABLE debts ADD COLUMN creation_time TEXT")
+        cursor.execute("UPDATE debts SET creation_time = ? WHERE creation_time IS NULL", (_now(),))
+
+
+def add_reminders_columns(cursor):
+    columns = _columns(cursor, "reminders")
+
+    if 'user_id' not in columns:
+        cursor.execute("ALTER TABLE reminders ADD COLUMN user_id INTEGER")
+
+    for column in ['title', 'reminder_datetime']:
+        if column not in columns:
+            cursor.execute(f"ALTER TABLE reminders ADD COLUMN {column} TEXT")
+
+    if 'created_at' not in columns:
+        cursor.execute("ALTER TABLE reminders ADD COLUMN created_at TEXT")
+        cursor.execute("UPDATE reminders SET created_at = ? WHERE created_at IS NULL", (_now(),))
+
+    if 'is_completed' not in columns:
+        cursor.execute("ALTER TABLE reminders ADD COLUMN is_completed INTEGER DEFAULT 0")
+
+
+def backfill_budget_adjustments(cursor):
+    """
+    Зберігає ручні зміни бюджетів, зроблені до появи budget_adjustments,
+    як різницю між бюджетом і сумою транзакцій категорії.
+    """
+    cursor.execute("""
+                   INSERT INTO budget_adjustments (user_id, category, amount, timestamp)
+                   SELECT b.user_id, b.category, b.amount - COALESCE(t.total, 0), ?
+                   FROM budget b
+                            LEFT JOIN (SELECT user_id, category, SUM(amount) AS total
+                                       FROM transactions
+                                       GROUP BY user_id, category) t
+                                      ON t.user_id = b.user_id AND t.category = b.category
+                   WHERE b.amount - COALESCE(t.total, 0) != 0
+                     AND NOT EXISTS (SELECT 1
+                                     FROM budget_adjustments a
+                                     WHERE a.user_id = b.user_id
+                                       AND a.category = b.category)
+                   """, (_now(),))
+
+
+def create_daily_rollups(cursor):
+    """Створює денні зведення транзакцій і заповнює їх з наявної історії."""
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS daily_rollups
+                   (
+                       user_id  INTEGER NOT NULL,
+                       day      TEXT    NOT NULL,
+                       category TEXT    NOT NULL,
+                       type     TEXT    NOT NULL,
+                       total    REAL    NOT NULL DEFAULT 0,
+                       count    INTEGER NOT NULL DEFAULT 0,
+                       PRIMARY KEY (user_id, day, category, type)
+                   ) WITHOUT ROWID
+                   """)
+    cursor.execute("""
+                   INSERT OR REPLACE INTO daily_rollups (user_id, day, category, type, total, count)
+                   SELECT user_id, date(timestamp), COALESCE(category, ''), COALESCE(type, ''),
+                          SUM(amount), COUNT(*)
+                   FROM transactions
+                   WHERE user_id IS NOT NULL
+                     AND date(timestamp) IS NOT NULL
+                   GROUP BY user_id, date(timestamp), COALESCE(category, ''), COALESCE(type, '')
+                   """)
+
+
+def create_budget_periods(cursor):
+    """
+    Створює місячні ліміти категорій і періоди бюджету.
+
+    Ліміт з'являється, коли користувач встановлює бюджет категорії, тож
+    наявні бюджети не переносяться: їхня сума — залишок, а не місячний ліміт.
+    """
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS budget_limits
+                   (
+                       user_id       INTEGER NOT NULL,
+                       category      TEXT    NOT NULL,
+                       monthly_limit REAL    NOT NULL,
+                       updated_at    TEXT,
+                       PRIMARY KEY (user_id, category)
+                   ) WITHOUT ROWID
+                   """)
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS budget_periods
+                   (
+                       user_id      INTEGER NOT NULL,
+                       period       TEXT    NOT NULL,
+                       category     TEXT    NOT NULL,
+                       limit_amount REAL    NOT NULL,
+                       spent        REAL    NOT NULL DEFAULT 0,
+                       PRIMARY KEY (user_id, period, category)
+                   ) WITHOUT ROWID
+                   """)
+
+
+def create_rate_snapshots(cursor):
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS rate_snapshots
+                   (
+                       base       TEXT NOT NULL,
+                       currency   TEXT NOT NULL,
+                       rate       REAL NOT NULL,
+                       fetched_at TEXT NOT NULL,
+                       PRIMARY KEY (base, currency)
+                   ) WITHOUT ROWID
+                   """)
+
+
+def create_sheet_sync_tables(cursor):
+    """Стан інкрементальної синхронізації з Google Таблицями та номери рядків транзакцій."""
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS sheet_sync_state
+                   (
+                       user_id        INTEGER PRIMARY KEY,
+                       last_synced_id INTEGER NOT NULL DEFAULT 0,
+                       next_row       INTEGER NOT NULL DEFAULT 2,
+                       synced_at      TEXT
+                   )
+                   """)
+    cursor.execute("""
+                   CREATE TABLE IF NOT EXISTS sheet_sync_rows
+                   (
+                       user_id        INTEGER NOT NULL,
+                       transaction_id INTEGER NOT NULL,
+                       row_number     INTEGER NOT NULL,
+                       deleted        INTEGER NOT NULL DEFAULT 0,
+                       PRIMARY KEY (user_id, transaction_id)
+                   ) WITHOUT ROWID
+                   """)
+    cursor.execute(SHEET_SYNC_DELETED_INDEX)
+
+
+def create_indexes(cursor):
+    for name, definition in INDEXES:
+        cursor.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {definition}")
+
+
+# Упорядкований список міграцій. Нові кроки додаються лише в кінець
+# з наступним номером версії; вже застосовані кроки не змінюються.
+MIGRATIONS = (
+    (1, "Створення таблиць", create_tables),
+    (2, "Стовпець creation_time у debts", add_debts_creation_time),
+    (3, "Відсутні стовпці reminders", add_reminders_columns),
+    (4, "Перенесення ручних змін бюджету в budget_adjustments", backfill_budget_adjustments),
+    (5, "Індекси для запитів користувача", create_indexes),
+    (6, "Денні зведення транзакцій daily_rollups", create_daily_rollups),
+    (7, "Місячні ліміти budget_limits і періоди budget_periods", create_budget_periods),
+    (8, "Знімки курсів валют rate_snapshots", create_rate_snapshots),
+    (9, "Стан синхронізації з Google Таблицями", create_sheet_sync_tables),
+)
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def get_schema_version(cursor):
+    cursor.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'schema_version'")
+    if not cursor.fetchone():
+        return 0
+
+    cursor.execute("SELECT COALESCE(MAX(version), 0) FROM schema_version")
+    return cursor.fetchone()[0]
+
+
+def run_migrations(conn, migrations=MIGRATIONS):
+    """
+    Застосовує міграції, яких ще немає в schema_version, в одній транзакції.
+
+    Якщо схема актуальна, виконується лише одне читання schema_version.
+
+    Returns:
+        list: номери застосованих версій
+    """
+    cursor = conn.cursor()
+    latest = migrations[-1][0]
+
+    if get_schema_version(cursor) >= latest:
+        return []
+
+    cursor.execute("BEGIN IMMEDIATE")
+    try:
+        cursor.execute("""
+                       CREATE TABLE IF NOT EXISTS schema_version
+                       (
+                           version     INTEGER PRIMARY KEY,
+                           description TEXT,
+                           applied_at  TEXT
+                       )
+                       """)
+        current = get_schema_version(cursor)
+
+        applied = []
+        for version, description, migrate in migrations:
+            if version <= current:
+                continue
+            migrate(cursor)
+            cursor.execute("""
+                           INSERT INTO schema_version (version, description, applied_at)
+                           VALUES (?, ?, ?)
+                           """, (version, description, _now()))
+            applied.append(version)
+
+        conn.commit()
+        return applied
+    except Exception:
+        conn.rollback()
+        raise
@@ -0,0 +1,195 @@
+"""
+Локальне сховище курсів валют для конвертера.
+
+Таблиці курсів зберігаються в SQLite (rate_snapshots) і тримаються в пам'яті,
+тож конвертація — це кілька пошуків у словниках без мережі. Будь-яка пара
+рахується через базову валюту таблиці: курс A → B = курс(база → B) / курс(база → A).
+
+Фонова задача періодично завантажує таблицю REFERENCE_BASE через
+services/currency_rates і зберігає знімок. Якщо провайдер недоступний,
+використовуються збережені курси, але не старші за max_stale.
+"""
+import asyncio
+import logging
+from datetime import datetime, timedelta
+
+from services import currency_rates
+from services.async_database_service import run_blocking
+from services.database_service import get_rate_snapshots, save_rate_snapshot
+
+logger = logging.getLogger(__name__)
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Таблиця, через яку рахуються крос-курси всіх інших пар
+REFERENCE_BASE = "USD"
+
+DEFAULT_REFRESH_INTERVAL = timedelta(hours=1)
+
+# Найстаріший знімок, який ще можна показати, коли провайдер недоступний
+DEFAULT_MAX_STALE = timedelta(hours=48)
+
+# Через скільки повторити оновлення після помилки
+RETRY_DELAY = timedelta(minutes=5)
+
+
+def cross_rate(base, rates, from_currency, to_currency):
+    """Курс from_currency → to_currency з таблиці base або None, якщо валюти немає."""
+    from_rate = 1.0 if from_currency == base else rates.get(from_currency)
+    to_rate = 1.0 if to_currency == base else rates.get(to_currency)
+    if not from_rate or to_rate is None:
+        return None
+    return to_rate / from_rate
+
+
+class RateStore:
+    def __init__(self, refresh_interval=DEFAULT_REFRESH_INTERVAL, max_stale=DEFAULT_MAX_STALE):
+        self.refresh_interval = refresh_interval
+        self.max_stale = max_stale
+        self._tables = {}  # база -> (час знімка, {валюта: курс})
+        self._task = None
+        self._fetch = None
+        self.refreshes = 0
+        self.failures = 0
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def update(self, base, rates, fetched_at=None):
+        self._tables[base] = (fetched_at or datetime.now(), rates)
+
+    def load(self, snapshots):
+        """Заповнює пам'ять збереженими знімками: база -> (fetched_at, {валюта: курс})."""
+        for base, (fetched_at, rates) in snapshots.items():
+            try:
+                self.update(base, rates, datetime.strptime(fetched_at, DATETIME_FORMAT))
+            except (TypeError, ValueError):
+                logger.warning(f"Знімок курсів {base} має некоректний час: {fetched_at}")
+
+    def get_quote(self, from_currency, to_currency, now=None):
+        """
+        Курс пари з найсвіжішої придатної таблиці.
+
+        Returns:
+            tuple: (курс, час знімка) або None, якщо придатних курсів немає
+        """
+        from_currency = currency_rates.normalize_currency(from_currency)
+        to_currency = currency_rates.normalize_currency(to_currency)
+        if from_currency is None or to_currency is None:
+            return None
+        if from_currency == to_currency:
+            return 1.0, now or datetime.now()
+
+        oldest = (now or datetime.now()) - self.max_stale
+        best = None
+        for base, (fetched_at, rates) in list(self._tables.items()):
+            if fetched_at < oldest or best is not None and fetched_at <= best[1]:
+                continue
+            rate = cross_rate(base, rates, from_currency, to_currency)
+            if rate is not None:
+                best = (rate, fetched_at)
+        return best
+
+    def get_rate(self, from_currency, to_currency, now=None):
+        quote = self.get_quote(from_currency, to_currency, now)
+        return quote[0] if quote else None
+
+    def age(self, base=REFERENCE_BASE, now=None):
+        table = self._tables.get(base)
+        if table is None:
+            return None
+        return (now or datetime.now()) - table[0]
+
+    async def start(self, fetch=None):
+        """
+        Завантажує збережені знімки й запускає періодичне оновлення.
+
+        Args:
+            fetch: корутина fetch(base) -> {валюта: курс} (за замовчуванням currency_rates.get_rates)
+        """
+        if self.running:
+            return
+        self._fetch = fetch or currency_rates.get_rates
+        self.load(await run_blocking(get_rate_snapshots))
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        logger.info(f"Сховище курсів запущено, збережених таблиць: {len(self._tables)}")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def refresh(self, base=REFERENCE_BASE):
+        """Завантажує й зберігає свіжу таблицю base; повертає False, якщо провайдер недоступний."""
+        try:
+            rates = await self._fetch(base)
+        except Exception as e:
+            self.failures += 1
+            logger.warning(f"Не вдалося оновити курси {base}: {e}")
+            return False
+
+        fetched_at = datetime.now().replace(microsecond=0)
+        self.update(base, rates, fetched_at)
+        await run_blocking(save_rate_snapshot, base, rates, fetched_at.strftime(DATETIME_FORMAT))
+        self.refreshes += 1
+        return True
+
+    async def _run(self):
+        while True:
+            age = self.age()
+            if age is not None and age < self.refresh_interval:
+                delay = self.refresh_interval - age
+            elif await self.refresh():
+                delay = self.refresh_interval
+            else:
+                delay = RETRY_DELAY
+            await asyncio.sleep(delay.total_seconds())
+
+    def stats(self):
+        age = self.age()
+        return {"tables": len(self._tables), "refreshes": self.refreshes, "failures": self.failures,
+                "reference_age": age.total_seconds() if age is not None else None}
+
+
+_store = RateStore()
+
+
+def configure(refresh_interval=None, max_stale=None):
+    if refresh_interval is not None:
+        _store.refresh_interval = refresh_interval
+    if max_stale is not None:
+        _store.max_stale = max_stale
+
+
+async def start(fetch=None):
+    await _store.start(fetch)
+
+
+async def stop():
+    await _store.stop()
+
+
+def is_running():
+    return _store.running
+
+
+def update(base, rates, fetched_at=None):
+    _store.update(base, rates, fetched_at)
+
+
+def get_quote(from_currency, to_currency, now=None):
+    return _store.get_quote(from_currency, to_currency, now)
+
+
+def get_rate(from_currency, to_currency, now=None):
+    return _store.get_rate(from_currency, to_currency, now)
+
+
+def stats():
+    return _store.stats()
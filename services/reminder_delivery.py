@@ -0,0 +1,185 @@
+"""
+Доставка нагадувань з обмеженням швидкості.
+
+Telegram обмежує бота приблизно 30 повідомленнями на секунду загалом і одним
+на секунду в кожен чат. ReminderDelivery надсилає пакет нагадувань з обмеженою
+кількістю одночасних запитів під двома token bucket (глобальним і на чат),
+при RetryAfter призупиняє всю відправку на вказаний час, а виконані
+нагадування позначає пакетними UPDATE.
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+
+from telegram.error import RetryAfter
+
+from services.async_database_service import mark_reminders_completed
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_RATE = 30
+CHAT_RATE = 1
+MAX_CONCURRENT_SENDS = 10
+MAX_RETRIES = 3
+COMPLETION_BATCH_SIZE = 100
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or max(1, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds):
+        """Не видавати токенів найближчі seconds секунд (відповідь RetryAfter)."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    def is_idle(self):
+        now = time.monotonic()
+        self._refill(now)
+        return self._tokens >= self.capacity and now >= self._paused_until
+
+    async def acquire(self):
+        # Лок дає чергу FIFO: хто раніше прийшов, той раніше отримає токен
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+def _retry_seconds(retry_after):
+    if isinstance(retry_after, timedelta):
+        return retry_after.total_seconds()
+    return float(retry_after)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class ReminderDelivery:
+    def __init__(self, global_rate=GLOBAL_RATE, chat_rate=CHAT_RATE, max_concurrent=MAX_CONCURRENT_SENDS,
+                 max_retries=MAX_RETRIES, batch_size=COMPLETION_BATCH_SIZE):
+        self.global_bucket = TokenBucket(global_rate)
+        self.chat_rate = chat_rate
+        self.max_concurrent = max_concurrent
+        self.max_retries = max_retries
+        self.batch_size = batch_size
+        self._chat_buckets = {}
+        self.last_report = None
+
+    def _chat_bucket(self, chat_id):
+        bucket = self._chat_buckets.get(chat_id)
+        if bucket is None:
+            bucket = self._chat_buckets[chat_id] = TokenBucket(self.chat_rate, capacity=1)
+        return bucket
+
+    def _prune_chat_buckets(self):
+        for chat_id in [chat_id for chat_id, bucket in self._chat_buckets.items() if bucket.is_idle()]:
+            del self._chat_buckets[chat_id]
+
+    async def deliver(self, reminders, send):
+        """
+        Надсилає нагадування і позначає надіслані виконаними.
+
+        Args:
+            reminders: кортежі (id, user_id, title, reminder_datetime)
+            send: корутина send(reminder_id, user_id, title, reminder_datetime)
+
+        Returns:
+            dict: sent, failed (список нагадувань), retry_after (id -> секунди для тих, кого
+                  не відпустив RetryAfter), retries, backlog, latency_p50, latency_max, duration
+        """
+        started = time.monotonic()
+        semaphore = asyncio.Semaphore(self.max_concurrent)
+        completed = []
+        failed = []
+        latencies = []
+        retries = 0
+        retry_after = {}  # reminder_id -> останній RetryAfter (с) для нагадувань, що так і не пішли
+
+        async def flush():
+            batch = completed[:]
+            completed.clear()
+            if batch:
+                await mark_reminders_completed(batch)
+
+        async def deliver_one(reminder):
+            nonlocal retries
+            reminder_id, user_id, _, reminder_datetime = reminder
+            chat_bucket = self._chat_bucket(user_id)
+
+            for _ in range(self.max_retries + 1):
+                # Кожна спроба, зокрема повтор після RetryAfter, проходить обидва ліміти
+                await chat_bucket.acquire()
+                async with semaphore:
+                    await self.global_bucket.acquire()
+                    try:
+                        await send(*reminder)
+                    except RetryAfter as e:
+                        retries += 1
+                        wait = _retry_seconds(e.retry_after)
+                        self.global_bucket.pause(wait)
+                        chat_bucket.pause(wait)
+                        retry_after[reminder_id] = wait
+                        logger.warning(f"Telegram просить зачекати {wait:.0f} с перед відправкою нагадувань")
+                        continue
+                    except Exception as e:
+                        logger.error(f"Помилка надсилання нагадування {reminder_id}: {e}")
+                        failed.append(reminder)
+                        return
+
+                retry_after.pop(reminder_id, None)
+                try:
+                    due = datetime.strptime(reminder_datetime, "%Y-%m-%d %H:%M:%S")
+                    latencies.append(max(0.0, (datetime.now() - due).total_seconds()))
+                except (TypeError, ValueError):
+                    pass
+                completed.append(reminder_id)
+                if len(completed) >= self.batch_size:
+                    await flush()
+                return
+
+            failed.append(reminder)
+
+        try:
+            await asyncio.gather(*(deliver_one(reminder) for reminder in reminders))
+        finally:
+            await flush()
+            self._prune_chat_buckets()
+
+        report = {
+            "sent": len(reminders) - len(failed),
+            "failed": failed,
+            "retry_after": retry_after,
+            "retries": retries,
+            "backlog": len(reminders),
+            "latency_p50": _percentile(latencies, 0.5),
+            "latency_max": max(latencies, default=0.0),
+            "duration": time.monotonic() - started,
+        }
+        self.last_report = report
+        logger.info(
+            f"Нагадування: у черзі {report['backlog']}, надіслано {report['sent']}, "
+            f"помилок {len(failed)}, повторів {retries}, затримка p50 {report['latency_p50']:.1f} с, "
+            f"max {report['latency_max']:.1f} с, тривалість {report['duration']:.1f} с"
+        )
+        return report
@@ -0,0 +1,189 @@
+"""
+Планувальник нагадувань на купі (heapq) замість опитування бази щохвилини.
+
+Невиконані нагадування тримаються в пам'яті, впорядковані за часом;
+задача в циклі подій спить до найближчого з них і передає всі, що настали,
+функції доставки. Функції database_service, що змінюють нагадування,
+оновлюють планувальник одразу після запису, тож база не опитується, поки
+нічого не відбувається.
+"""
+import asyncio
+import heapq
+import logging
+import threading
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Найдовший сон без перевірки купи: страхує від переведення системного годинника
+MAX_SLEEP = 300
+
+# Через скільки повторити доставку, якщо надіслати нагадування не вдалося
+RETRY_DELAY = 60
+
+
+class ReminderScheduler:
+    def __init__(self):
+        self._heap = []  # (час спрацювання, id нагадування)
+        self._entries = {}  # id нагадування -> (час спрацювання, user_id, title, reminder_datetime)
+        self._lock = threading.Lock()
+        self._loop = None
+        self._wakeup = None
+        self._task = None
+        self._deliver = None
+
+    @property
+    def running(self):
+        return self._task is not None and not self._task.done()
+
+    def __len__(self):
+        return len(self._entries)
+
+    async def start(self, deliver, reminders=()):
+        """
+        Запускає планувальник у поточному циклі подій.
+
+        Args:
+            deliver: корутина, що отримує список нагадувань (id, user_id, title, reminder_datetime)
+            reminders: невиконані нагадування з бази на момент запуску
+        """
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._deliver = deliver
+        self._task = self._loop.create_task(self._run())
+
+        for reminder in reminders:
+            self.schedule(*reminder)
+        logger.info(f"Планувальник нагадувань запущено, заплановано {len(self)}")
+
+    async def stop(self):
+        if not self.running:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._loop = None
+        with self._lock:
+            self._heap.clear()
+            self._entries.clear()
+        logger.info("Планувальник нагадувань зупинено")
+
+    def schedule(self, reminder_id, user_id, title, reminder_datetime, due=None):
+        """Додає або переносить нагадування. Безпечно викликати з будь-якого потоку."""
+        if not self.running:
+            return
+        if due is None:
+            try:
+                due = datetime.strptime(reminder_datetime, DATETIME_FORMAT)
+            except (TypeError, ValueError):
+                logger.warning(f"Нагадування {reminder_id} має некоректний час: {reminder_datetime}")
+                return
+
+        with self._lock:
+            self._entries[reminder_id] = (due, user_id, title, reminder_datetime)
+            heapq.heappush(self._heap, (due, reminder_id))
+            self._compact()
+        self._notify()
+
+    def retry_later(self, reminder_id, user_id, title, reminder_datetime, delay=RETRY_DELAY):
+        self.schedule(reminder_id, user_id, title, reminder_datetime,
+                      due=datetime.now() + timedelta(seconds=delay))
+
+    def cancel(self, reminder_id):
+        """Прибирає нагадування; запис у купі стає застарілим і відкидається при вилученні."""
+        if not self.running:
+            return
+        with self._lock:
+            self._entries.pop(reminder_id, None)
+
+    def _notify(self):
+        loop = self._loop
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._wakeup.set)
+
+    def _compact(self):
+        # Перенесені й скасовані нагадування лишають у купі застарілі записи
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [(entry[0], reminder_id) for reminder_id, entry in self._entries.items()]
+            heapq.heapify(self._heap)
+
+    def _is_current(self, due, reminder_id):
+        entry = self._entries.get(reminder_id)
+        return entry is not None and entry[0] == due
+
+    def pop_due(self, now=None):
+        """
+        Вилучає нагадування, час яких настав.
+
+        Returns:
+            tuple: (список нагадувань, секунди до наступного або None, якщо купа порожня)
+        """
+        now = now or datetime.now()
+        due = []
+        with self._lock:
+            while self._heap:
+                when, reminder_id = self._heap[0]
+                if not self._is_current(when, reminder_id):
+                    heapq.heappop(self._heap)
+                    continue
+                if when > now:
+                    return due, (when - now).total_seconds()
+                heapq.heappop(self._heap)
+                _, user_id, title, reminder_datetime = self._entries.pop(reminder_id)
+                due.append((reminder_id, user_id, title, reminder_datetime))
+        return due, None
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            due, delay = self.pop_due()
+
+            if due:
+                try:
+                    await self._deliver(due)
+                except Exception as e:
+                    # Вилучені з купи нагадування інакше загубились би до перезапуску
+                    logger.error(f"Помилка доставки нагадувань: {e}, повтор через {RETRY_DELAY} с")
+                    for reminder in due:
+                        self.retry_later(*reminder)
+                continue
+
+            timeout = MAX_SLEEP if delay is None else min(delay, MAX_SLEEP)
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+_scheduler = ReminderScheduler()
+
+
+async def start(deliver, reminders=()):
+    await _scheduler.start(deliver, reminders)
+
+
+async def stop():
+    await _scheduler.stop()
+
+
+def is_running():
+    return _scheduler.running
+
+
+def schedule(reminder_id, user_id, title, reminder_datetime):
+    _scheduler.schedule(reminder_id, user_id, title, reminder_datetime)
+
+
+def retry_later(reminder_id, user_id, title, reminder_datetime, delay=RETRY_DELAY):
+    _scheduler.retry_later(reminder_id, user_id, title, reminder_datetime, delay)
+
+
+def cancel(reminder_id):
+    _scheduler.cancel(reminder_id)
@@ -0,0 +1,126 @@
+"""
+Спільний клієнт Google Таблиць для синхронізації.
+
+Облікові дані сервісного акаунта читаються з файлу один раз, авторизований
+клієнт gspread і відкриті таблиці кешуються та використовуються всіма
+користувачами. Токен доступу оновлюється заздалегідь, за REFRESH_MARGIN до
+завершення строку дії, тож синхронізація не платить за обмін токена щоразу.
+
+Джерело таблиць замінюється через configure(backend=...): будь-який об'єкт
+з методами open(spreadsheet_id) та invalidate(); власні джерела успадковують SheetsBackend.
+"""
+import abc
+import logging
+import threading
+from datetime import datetime, timedelta, timezone
+
+import gspread
+
+logger = logging.getLogger(__name__)
+
+SCOPES = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
+
+DEFAULT_CREDENTIALS_FILE = "google_credentials.json"
+DEFAULT_SPREADSHEET_ID = "ВАШ_SPREADSHEET_ID"
+
+# За скільки до завершення строку дії оновлювати токен
+REFRESH_MARGIN = timedelta(minutes=5)
+
+
+def _load_credentials(credentials_file):
+    from google.oauth2.service_account import Credentials
+    return Credentials.from_service_account_file(credentials_file, scopes=SCOPES)
+
+
+def _refresh_credentials(credentials):
+    from google.auth.transport.requests import Request
+    credentials.refresh(Request())
+
+
+def _utcnow():
+    # google-auth зберігає expiry як наївний час UTC
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class SheetsBackend(abc.ABC):
+    """Джерело таблиць: open(spreadsheet_id) повертає таблицю з API gspread.Spreadsheet."""
+
+    @abc.abstractmethod
+    def open(self, spreadsheet_id):
+        """Таблиця за ідентифікатором."""
+
+    @abc.abstractmethod
+    def invalidate(self):
+        """Скидає кешований клієнт, щоб наступний open авторизувався заново."""
+
+
+class GoogleSheetsBackend(SheetsBackend):
+    def __init__(self, credentials_file=DEFAULT_CREDENTIALS_FILE, load_credentials=_load_credentials,
+                 refresh=_refresh_credentials, authorize=gspread.authorize):
+        self.credentials_file = credentials_file
+        self._load_credentials = load_credentials
+        self._refresh = refresh
+        self._authorize = authorize
+        self._lock = threading.Lock()
+        self._credentials = None
+        self._client = None
+        self._spreadsheets = {}
+        self.authorizations = 0
+        self.refreshes = 0
+
+    def _ensure_client(self):
+        if self._credentials is None:
+            self._credentials = self._load_credentials(self.credentials_file)
+
+        expiry = self._credentials.expiry
+        if not self._credentials.token or expiry is None or expiry - _utcnow() < REFRESH_MARGIN:
+            self._refresh(self._credentials)
+            self.refreshes += 1
+
+        if self._client is None:
+            self._client = self._authorize(self._credentials)
+            self.authorizations += 1
+        return self._client
+
+    def open(self, spreadsheet_id):
+        with self._lock:
+            client = self._ensure_client()
+            spreadsheet = self._spreadsheets.get(spreadsheet_id)
+            if spreadsheet is None:
+                spreadsheet = client.open_by_key(spreadsheet_id)
+                self._spreadsheets[spreadsheet_id] = spreadsheet
+            return spreadsheet
+
+    def invalidate(self):
+        """Забуває клієнт і таблиці; облікові дані перечитуються при наступному відкритті."""
+        with self._lock:
+            self._credentials = None
+            self._client = None
+            self._spreadsheets.clear()
+        logger.info("Клієнт Google Таблиць скинуто")
+
+    def stats(self):
+        return {"authorizations": self.authorizations, "refreshes": self.refreshes,
+                "spreadsheets": len(self._spreadsheets)}
+
+
+_backend = GoogleSheetsBackend()
+_spreadsheet_id = DEFAULT_SPREADSHEET_ID
+
+
+def configure(backend=None, credentials_file=None, spreadsheet_id=None):
+    global _backend, _spreadsheet_id
+    if backend is not None:
+        _backend = backend
+    if credentials_file is not None:
+        _backend = GoogleSheetsBackend(credentials_file)
+    if spreadsheet_id is not None:
+        _spreadsheet_id = spreadsheet_id
+
+
+def get_spreadsheet(spreadsheet_id=None):
+    return _backend.open(spreadsheet_id or _spreadsheet_id)
+
+
+def invalidate():
+    _backend.invalidate()
@@ -0,0 +1,117 @@
+"""
+Кеш стовпцевих знімків транзакцій користувачів у пам'яті.
+
+Статистика, графік, звіт, тренди й аналіз витрат рахуються з того самого
+знімка (analytics_engine.TransactionColumns), тож повторні перегляди
+аналітики не звертаються до бази. Знімок дійсний, поки не змінилась версія
+даних користувача (services/data_version), яку database_service збільшує після
+кожного додавання чи видалення транзакції та поповнення скарбнички.
+
+Кеш витискає найдавніше використані знімки, щойно їхній сумарний розмір
+перевищує бюджет пам'яті.
+"""
+import threading
+from collections import OrderedDict
+
+from services import data_version
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class SnapshotCache:
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._snapshots = OrderedDict()  # user_id -> (версія даних, знімок)
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._snapshots)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def get(self, user_id, load):
+        """
+        Знімок користувача з кешу або новий з load(user_id), якщо дані змінились.
+
+        load виконується поза блокуванням; паралельні промахи для одного
+        користувача можуть прочитати базу двічі, але результат однаковий.
+        """
+        # Версія береться до читання: запис під час читання зробить знімок застарілим, а не навпаки
+        version = data_version.get(user_id)
+        with self._lock:
+            cached = self._snapshots.get(user_id)
+            if cached is not None and cached[0] == version:
+                self._snapshots.move_to_end(user_id)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        snapshot = load(user_id)
+        self.put(user_id, version, snapshot)
+        return snapshot
+
+    def put(self, user_id, version, snapshot):
+        with self._lock:
+            previous = self._snapshots.pop(user_id, None)
+            if previous is not None:
+                self._bytes -= previous[1].nbytes
+            # Знімок, більший за весь бюджет, не кешується, щоб не витіснити всіх інших
+            if snapshot.nbytes > self.max_bytes:
+                return
+            self._snapshots[user_id] = (version, snapshot)
+            self._bytes += snapshot.nbytes
+            self._evict()
+
+    def _evict(self):
+        while self._bytes > self.max_bytes and self._snapshots:
+            _, (_, snapshot) = self._snapshots.popitem(last=False)
+            self._bytes -= snapshot.nbytes
+            self.evictions += 1
+
+    def invalidate(self, user_id):
+        with self._lock:
+            previous = self._snapshots.pop(user_id, None)
+            if previous is not None:
+                self._bytes -= previous[1].nbytes
+
+    def clear(self):
+        with self._lock:
+            self._snapshots.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"snapshots": len(self._snapshots), "bytes": self._bytes, "hits": self.hits,
+                    "misses": self.misses, "evictions": self.evictions}
+
+
+_cache = SnapshotCache()
+
+
+def configure(max_bytes=None):
+    if max_bytes is not None:
+        with _cache._lock:
+            _cache.max_bytes = max_bytes
+            _cache._evict()
+
+
+def get(user_id, load):
+    return _cache.get(user_id, load)
+
+
+def invalidate(user_id):
+    _cache.invalidate(user_id)
+
+
+def clear():
+    _cache.clear()
+
+
+def stats():
+    return _cache.stats()
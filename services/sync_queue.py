@@ -0,0 +1,270 @@
+"""
+Фонова черга синхронізації з Google Таблицями.
+
+Обробник лише ставить запит у чергу; воркери виконують синхронізацію у
+власному пулі потоків (мережеві виклики Google не займають пул бази, яким
+користуються обробники) і повідомляють результат через колбек. Для
+одного користувача синхронізація ніколи не йде паралельно: повторний запит,
+поки попередній чекає в черзі, приєднується до нього, а запит, що надійшов
+під час синхронізації, виконується після неї — або не виконується зовсім,
+якщо поточна спроба почалась уже після нього і так його охопила.
+
+Тимчасові помилки (мережа, ліміти, збої Google) повторюються з
+експоненційною затримкою. За бажанням schedule_auto_sync синхронізує
+аркуш через кілька секунд після останньої транзакції користувача.
+"""
+import asyncio
+import functools
+import logging
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from services.sync_service import is_transient_error, sync_transactions
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+
+# Затримка перед n-ю повторною спробою: BASE_DELAY * 2^(n-1), але не більше MAX_DELAY
+BASE_DELAY = 2.0
+MAX_DELAY = 60.0
+
+
+def backoff_delay(attempt, base=BASE_DELAY, maximum=MAX_DELAY):
+    """Затримка після attempt невдалих спроб з випадковим розкидом, щоб повтори не збігались."""
+    delay = min(base * 2 ** (attempt - 1), maximum)
+    return delay * random.uniform(0.5, 1.0)
+
+
+class SyncJob:
+    def __init__(self, user_id, on_done=None, auto=False):
+        self.user_id = user_id
+        self.on_done = on_done
+        self.auto = auto
+        self.created = time.monotonic()
+        self.attempts = 0
+        self.attempt_started = None
+        self.error = None
+
+
+class SyncQueue:
+    def __init__(self, workers=DEFAULT_WORKERS, max_size=DEFAULT_MAX_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS,
+                 base_delay=BASE_DELAY, auto_sync_delay=None):
+        self.workers = workers
+        self.max_size = max_size
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.auto_sync_delay = auto_sync_delay
+        self._queue = None
+        self._tasks = []
+        self._executor = None
+        self._sync = sync_transactions
+        self._pending = {}  # user_id -> задача, що чекає на запуск
+        self._active = {}  # user_id -> задача, що виконується або чекає на повтор
+        self._retries = {}  # user_id -> відкладений повтор
+        self._auto_timers = {}  # user_id -> відкладена автосинхронізація
+        self._counters = {"submitted": 0, "merged": 0, "coalesced": 0, "rejected": 0,
+                          "completed": 0, "failed": 0, "retries": 0}
+
+    @property
+    def running(self):
+        return bool(self._tasks)
+
+    async def start(self, sync=None):
+        """
+        Запускає воркери в поточному циклі подій.
+
+        Args:
+            sync: блокуюча функція (user_id, only_if_synced=...) -> (успіх, повідомлення);
+                  за замовчуванням sync_service.sync_transactions
+        """
+        if self.running:
+            return
+        if sync is not None:
+            self._sync = sync
+        self._queue = asyncio.Queue(maxsize=self.max_size)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="sheets-sync")
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.workers)]
+        logger.info(f"Черга синхронізації запущена: {self.workers} воркерів, до {self.max_size} задач")
+
+    async def stop(self):
+        if not self.running:
+            return
+        for handle in [*self._retries.values(), *self._auto_timers.values()]:
+            handle.cancel()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        # Синхронізації, що вже пишуть у таблицю, завершуються, поки база ще відкрита
+        await asyncio.to_thread(self._executor.shutdown, cancel_futures=True)
+        self._executor = None
+        self._tasks = []
+        self._queue = None
+        self._pending.clear()
+        self._active.clear()
+        self._retries.clear()
+        self._auto_timers.clear()
+        logger.info("Черга синхронізації зупинена")
+
+    def submit(self, user_id, on_done=None, auto=False):
+        """
+        Ставить синхронізацію користувача в чергу або приєднує запит до тієї, що ще чекає.
+
+        Args:
+            on_done: корутина (job, result); result — (успіх, повідомлення)
+            auto: автосинхронізація: лише для тих, хто вже синхронізувався
+
+        Returns:
+            tuple: (задача, True — нова / False — приєднано до наявної)
+
+        Raises:
+            RuntimeError: черга не запущена
+            asyncio.QueueFull: черга заповнена
+        """
+        if not self.running:
+            raise RuntimeError("Черга синхронізації не запущена")
+
+        job = self._pending.get(user_id)
+        if job is not None:
+            if job.on_done is None:
+                job.on_done = on_done
+            job.auto = job.auto and auto
+            self._counters["merged"] += 1
+            return job, False
+
+        if self._queue.full():
+            self._counters["rejected"] += 1
+            raise asyncio.QueueFull
+
+        job = SyncJob(user_id, on_done, auto)
+        self._pending[user_id] = job
+        # Поки йде синхронізація цього користувача, нова чекає на її завершення
+        if user_id not in self._active:
+            self._queue.put_nowait(job)
+        self._counters["submitted"] += 1
+        return job, True
+
+    def schedule_auto_sync(self, user_id):
+        """Відкладає автосинхронізацію на auto_sync_delay секунд після останнього виклику."""
+        if not self.running or self.auto_sync_delay is None:
+            return
+        previous = self._auto_timers.pop(user_id, None)
+        if previous is not None:
+            previous.cancel()
+        self._auto_timers[user_id] = asyncio.get_running_loop().call_later(
+            self.auto_sync_delay, self._auto_sync, user_id)
+
+    def _auto_sync(self, user_id):
+        self._auto_timers.pop(user_id, None)
+        try:
+            self.submit(user_id, auto=True)
+        except (RuntimeError, asyncio.QueueFull):
+            logger.warning(f"Автосинхронізацію користувача {user_id} пропущено: черга заповнена")
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job):
+        if self._pending.get(job.user_id) is job:
+            del self._pending[job.user_id]
+        self._active[job.user_id] = job
+        job.attempts += 1
+        job.attempt_started = time.monotonic()
+
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, functools.partial(self._sync, job.user_id, only_if_synced=job.auto))
+            self._counters["completed"] += 1
+        except Exception as e:
+            if is_transient_error(e) and job.attempts < self.max_attempts:
+                delay = backoff_delay(job.attempts, self.base_delay)
+                logger.warning(f"Синхронізація користувача {job.user_id} не вдалась ({e}), "
+                               f"повтор через {delay:.1f} с")
+                self._counters["retries"] += 1
+                self._retries[job.user_id] = asyncio.get_running_loop().call_later(delay, self._requeue, job)
+                return
+            logger.error(f"Помилка синхронізації для користувача {job.user_id}: {e}")
+            job.error = e
+            result = (False, f"❌ Помилка при синхронізації: {e}")
+            self._counters["failed"] += 1
+
+        await self._finish(job, result)
+
+    def _requeue(self, job):
+        self._retries.pop(job.user_id, None)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            self._retries[job.user_id] = asyncio.get_running_loop().call_later(self.base_delay, self._requeue, job)
+
+    async def _finish(self, job, result):
+        del self._active[job.user_id]
+        waiting = self._pending.get(job.user_id)
+        jobs = [job]
+        if waiting is not None:
+            if job.error is None and waiting.created <= job.attempt_started:
+                # Остання спроба почалась після цього запиту й уже синхронізувала все, що він просив
+                del self._pending[job.user_id]
+                jobs.append(waiting)
+                self._counters["coalesced"] += 1
+            else:
+                self._requeue(waiting)
+
+        for done in jobs:
+            if done.on_done:
+                try:
+                    await done.on_done(done, result)
+                except Exception as e:
+                    logger.error(f"Помилка колбека черги синхронізації: {e}")
+
+    def metrics(self):
+        return {"depth": self._queue.qsize() if self._queue else 0, "active": len(self._active),
+                "pending": len(self._pending), **self._counters}
+
+
+_sync_queue = SyncQueue()
+
+
+def configure(workers=None, max_size=None, max_attempts=None, auto_sync_delay=None):
+    """Задає розміри черги й повтори; діє з наступного запуску."""
+    if workers is not None:
+        _sync_queue.workers = workers
+    if max_size is not None:
+        _sync_queue.max_size = max_size
+    if max_attempts is not None:
+        _sync_queue.max_attempts = max_attempts
+    if auto_sync_delay is not None:
+        _sync_queue.auto_sync_delay = auto_sync_delay
+
+
+async def start(sync=None):
+    await _sync_queue.start(sync)
+
+
+async def stop():
+    await _sync_queue.stop()
+
+
+def is_running():
+    return _sync_queue.running
+
+
+def submit(user_id, on_done=None, auto=False):
+    return _sync_queue.submit(user_id, on_done, auto)
+
+
+def schedule_auto_sync(user_id):
+    _sync_queue.schedule_auto_sync(user_id)
+
+
+def metrics():
+    return _sync_queue.metrics()
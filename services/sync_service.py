@@ -1,44 +1,230 @@
-import sqlite3
 import gspread
-from oauth2client.service_account import ServiceAccountCredentials
+import requests
+from datetime import datetime
+from services import sheets_client
+from services.connection_pool import connect
+from services.db_writer import serialized_write
 
 DATABASE_FILE = "finance_bot.db"
 
+SHEET_HEADER = ["Дата", "Сума", "Категорія", "Тип"]
 
-def sync_with_google_sheets(user_id):
+# Скільки рядків надсилати одним запитом update
+SYNC_BATCH_ROWS = 500
+
+# На скільки рядків розширювати аркуш, коли нові рядки в нього не вміщаються
+WORKSHEET_GROW_ROWS = 1000
+
+
+def worksheet_title(user_id):
+    return f"user_{user_id}"
+
+
+def get_sync_changes(user_id):
     """
-    Синхронізує транзакції користувача з Google Таблицями.
-    
+    Зміни з попередньої синхронізації.
+
+    Returns:
+        tuple: (стан (last_synced_id, next_row) або None, нові транзакції
+        (id, timestamp, amount, category, type), номери рядків видалених транзакцій)
+    """
+    conn = connect(DATABASE_FILE)
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT last_synced_id, next_row FROM sheet_sync_state WHERE user_id = ?", (user_id,))
+        state = cursor.fetchone()
+
+        cursor.execute("""
+                       SELECT id, timestamp, amount, category, type
+                       FROM transactions
+                       WHERE user_id = ?
+                         AND id > ?
+                       ORDER BY id
+                       """, (user_id, state[0] if state else 0))
+        new_rows = cursor.fetchall()
+
+        cursor.execute("""
+                       SELECT row_number
+                       FROM sheet_sync_rows
+                       WHERE user_id = ?
+                         AND deleted = 1
+                       ORDER BY row_number
+                       """, (user_id,))
+        deleted_rows = [row[0] for row in cursor.fetchall()]
+        return state, new_rows, deleted_rows
+    finally:
+        conn.close()
+
+
+@serialized_write
+def save_sync_progress(user_id, last_synced_id, next_row, rows=(), cleared_rows=()):
+    """
+    Фіксує синхронізоване: високу позначку, наступний вільний рядок,
+    номери нових рядків і прибирає очищені рядки видалених транзакцій.
+    """
+    conn = connect(DATABASE_FILE)
+    try:
+        cursor = conn.cursor()
+        if cleared_rows:
+            cursor.executemany("""
+                               DELETE
+                               FROM sheet_sync_rows
+                               WHERE user_id = ?
+                                 AND row_number = ?
+                                 AND deleted = 1
+                               """, [(user_id, row_number) for row_number in cleared_rows])
+        cursor.executemany("""
+                           INSERT OR REPLACE INTO sheet_sync_rows (user_id, transaction_id, row_number, deleted)
+                           VALUES (?, ?, ?, 0)
+                           """, [(user_id, transaction_id, row_number) for transaction_id, row_number in rows])
+        cursor.execute("""
+                       INSERT INTO sheet_sync_state (user_id, last_synced_id, next_row, synced_at)
+                       VALUES (?, ?, ?, ?)
+                       ON CONFLICT (user_id) DO UPDATE
+                           SET last_synced_id = excluded.last_synced_id,
+                               next_row       = excluded.next_row,
+                               synced_at      = excluded.synced_at
+                       """, (user_id, last_synced_id, next_row, datetime.now().strftime("%Y-%m-%d %H:%M:%S")))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+@serialized_write
+def reset_sync_state(user_id):
+    conn = connect(DATABASE_FILE)
+    try:
+        conn.execute("DELETE FROM sheet_sync_rows WHERE user_id = ?", (user_id,))
+        conn.execute("DELETE FROM sheet_sync_state WHERE user_id = ?", (user_id,))
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _open_worksheet(spreadsheet, user_id, fresh):
+    """
+    Аркуш користувача; для першої синхронізації — очищений, із заголовком.
+
+    Returns:
+        tuple: (аркуш, True якщо аркуш довелося створити)
+    """
+    title = worksheet_title(user_id)
+    created = False
+    try:
+        worksheet = spreadsheet.worksheet(title)
+    except gspread.WorksheetNotFound:
+        worksheet = spreadsheet.add_worksheet(title=title, rows=WORKSHEET_GROW_ROWS, cols=len(SHEET_HEADER))
+        created = fresh = True
+
+    if fresh:
+        worksheet.clear()
+        worksheet.update(values=[SHEET_HEADER], range_name="A1")
+    return worksheet, created
+
+
+def _clear_deleted_rows(worksheet, deleted_rows, next_row):
+    """Очищає рядки видалених транзакцій на місці, щоб номери інших рядків не зсувались."""
+    worksheet.batch_clear([f"A{row}:D{row}" for row in deleted_rows])
+    # Скасована остання транзакція звільняє кінець таблиці для наступних рядків
+    cleared = set(deleted_rows)
+    while next_row - 1 in cleared:
+        next_row -= 1
+    return next_row
+
+
+def _append_rows(worksheet, user_id, new_rows, next_row, last_synced_id, cleared_rows):
+    for start in range(0, len(new_rows), SYNC_BATCH_ROWS):
+        batch = new_rows[start:start + SYNC_BATCH_ROWS]
+        last_row = next_row + len(batch) - 1
+        if last_row > worksheet.row_count:
+            worksheet.add_rows(last_row - worksheet.row_count + WORKSHEET_GROW_ROWS)
+
+        worksheet.update(values=[list(row[1:]) for row in batch], range_name=f"A{next_row}")
+
+        rows = [(row[0], next_row + offset) for offset, row in enumerate(batch)]
+        next_row = last_row + 1
+        last_synced_id = batch[-1][0]
+        # Прогрес фіксується після кожного пакета: збій посередині не призведе до дублювання рядків
+        save_sync_progress(user_id, last_synced_id, next_row, rows, cleared_rows)
+        cleared_rows = ()
+    return next_row
+
+
+def sync_transactions(user_id, spreadsheet=None, only_if_synced=False):
+    """
+    Синхронізує транзакції користувача з Google Таблицями; помилки не перехоплюються.
+
+    Кожен користувач має власний аркуш. Дописуються лише транзакції з id,
+    більшим за останній синхронізований, а рядки видалених транзакцій
+    очищуються точково.
+
     Args:
         user_id (int): ID користувача
-        
+        spreadsheet: відкрита таблиця gspread (за замовчуванням спільна таблиця з sheets_client)
+        only_if_synced (bool): нічого не робити, якщо користувач ще жодного разу не синхронізувався
+
     Returns:
-        bool: True якщо синхронізація пройшла успішно, False у випадку помилки
+        bool: True якщо синхронізація пройшла успішно
         str: Повідомлення про результат синхронізації
     """
+    state, new_rows, deleted_rows = get_sync_changes(user_id)
+
+    if state is None and (only_if_synced or not new_rows):
+        return False, "⚠️ У вас немає транзакцій для синхронізації."
+    if state is not None and not new_rows and not deleted_rows:
+        return True, "✅ Google Таблиця вже актуальна, нових змін немає."
+
     try:
-        scope = ["https://spreadsheets.google.com/feeds", "https://www.googleapis.com/auth/drive"]
-        creds = ServiceAccountCredentials.from_json_keyfile_name("google_credentials.json", scope)
-        client = gspread.authorize(creds)
+        if spreadsheet is None:
+            spreadsheet = sheets_client.get_spreadsheet()
+        worksheet, created = _open_worksheet(spreadsheet, user_id, fresh=state is None)
+    except gspread.exceptions.APIError as e:
+        if e.code == 401:
+            # Відкликаний чи прострочений токен: наступна спроба авторизується заново
+            sheets_client.invalidate()
+        raise
 
-        spreadsheet_id = "ВАШ_SPREADSHEET_ID"
-        sheet = client.open_by_key(spreadsheet_id).sheet1
+    if created and state is not None:
+        # Аркуш видалили вручну: збережені номери рядків уже нічого не означають
+        reset_sync_state(user_id)
+        return sync_transactions(user_id, spreadsheet)
 
-        conn = sqlite3.connect(DATABASE_FILE)
-        cursor = conn.cursor()
-        cursor.execute("SELECT timestamp, amount, category, type FROM transactions WHERE user_id = ?", (user_id,))
-        transactions = cursor.fetchall()
-        conn.close()
+    last_synced_id, next_row = state if state else (0, 2)
+    if deleted_rows:
+        next_row = _clear_deleted_rows(worksheet, deleted_rows, next_row)
+
+    if new_rows:
+        _append_rows(worksheet, user_id, new_rows, next_row, last_synced_id, deleted_rows)
+    else:
+        save_sync_progress(user_id, last_synced_id, next_row, cleared_rows=deleted_rows)
+
+    return True, (f"✅ Дані успішно синхронізовано з Google Таблицями! "
+                  f"Додано: {len(new_rows)}, видалено: {len(deleted_rows)}.")
 
-        if not transactions:
-            return False, "⚠️ У вас немає транзакцій для синхронізації."
 
-        sheet.clear()
-        sheet.append_row(["Дата", "Сума", "Категорія", "Тип"])
-        sheet.append_rows(transactions)
+def is_transient_error(error):
+    """Чи варто повторити синхронізацію після помилки: мережа, ліміти й збої на боці Google."""
+    if isinstance(error, gspread.exceptions.APIError):
+        # 401 — токен уже скинуто, повтор авторизується заново
+        return error.code in (401, 408, 429) or error.code >= 500
+    return isinstance(error, (ConnectionError, TimeoutError, requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout))
 
-        return True, "✅ Дані успішно синхронізовано з Google Таблицями!"
 
+def sync_with_google_sheets(user_id, spreadsheet=None):
+    """
+    Синхронізує транзакції користувача з Google Таблицями.
+
+    Args:
+        user_id (int): ID користувача
+        spreadsheet: відкрита таблиця gspread (за замовчуванням спільна таблиця з sheets_client)
+
+    Returns:
+        bool: True якщо синхронізація пройшла успішно, False у випадку помилки
+        str: Повідомлення про результат синхронізації
+    """
+    try:
+        return sync_transactions(user_id, spreadsheet)
     except Exception as e:
         error_message = f"❌ Помилка при синхронізації: {str(e)}"
         print(error_message)
@@ -1,13 +1,12 @@
-import sqlite3
 from models.transaction import Transaction
 from services.database_service import (
-    add_transaction as db_add_transaction,
+    add_transaction_with_budget as db_add_transaction,
     get_transaction_history as db_get_transaction_history,
     filter_transactions_by_category_or_type as db_filter_transactions,
     get_last_transaction as db_get_last_transaction,
-    delete_transaction as db_delete_transaction,
-    update_budget_for_transaction as db_update_budget,
-    recalculate_user_budget as db_recalculate_budget
+    delete_transaction_with_budget as db_delete_transaction,
+    recalculate_user_budget as db_recalculate_budget,
+    get_remaining_budget as db_get_remaining_budget
 )
 
 
@@ -27,15 +26,14 @@ def add_new_transaction(user_id, amount, category, transaction_type=None):
     )
 
     if success:
-        db_update_budget(
-            user_id=transaction.user_id,
-            amount=transaction.amount,
-            category=transaction.category
-        )
         return transaction
     return None
 
 
+def get_month_budget_remaining(user_id, category):
+    return db_get_remaining_budget(user_id, category)
+
+
 def get_user_transaction_history(user_id, limit=10):
     transactions_data = db_get_transaction_history(user_id, limit)
 
@@ -69,32 +67,7 @@ def get_user_last_transaction(user_id):
 
 
 def delete_user_transaction(transaction_id):
-    conn = sqlite3.connect("finance_bot.db")
-    cursor = conn.cursor()
-    try:
-        cursor.execute("""
-                       SELECT user_id, amount, category
-                       FROM transactions
-                       WHERE id = ?
-                       """, (transaction_id,))
-        transaction_data = cursor.fetchone()
-
-        if not transaction_data:
-            return False
-
-        user_id, amount, category = transaction_data
-
-        success = db_delete_transaction(transaction_id)
-
-        if success:
-            db_update_budget(user_id, -amount, category)
-
-        return success
-    except Exception as e:
-        print(f"Помилка у delete_user_transaction: {e}")
-        return False
-    finally:
-        conn.close()
+    return db_delete_transaction(transaction_id)
 
 
 def recalculate_user_budget(user_id):
@@ -0,0 +1,72 @@
+"""
+Паралельна обробка оновлень з послідовністю в межах одного користувача.
+
+PerUserUpdateProcessor передається в Application.builder().concurrent_updates(...):
+оновлення різних користувачів обробляються одночасно (до max_concurrent_updates),
+а оновлення одного користувача — строго по черзі, тому стан ConversationHandler
+користувача не змінюється двома оновленнями водночас.
+"""
+import asyncio
+import logging
+
+from telegram.ext import BaseUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+
+class PerUserUpdateProcessor(BaseUpdateProcessor):
+    def __init__(self, max_concurrent_updates):
+        super().__init__(max_concurrent_updates)
+        # ключ користувача -> [asyncio.Lock, кількість оновлень, що чекають або виконуються]
+        self._locks = {}
+
+    @staticmethod
+    def get_key(update):
+        """Ключ серіалізації: користувач, а для оновлень без користувача — чат."""
+        user = getattr(update, "effective_user", None)
+        if user is not None:
+            return "user", user.id
+        chat = getattr(update, "effective_chat", None)
+        if chat is not None:
+            return "chat", chat.id
+        return None
+
+    @property
+    def active_keys(self):
+        return len(self._locks)
+
+    async def process_update(self, update, coroutine):
+        """
+        Чекає на свою чергу серед оновлень користувача і лише тоді займає загальний слот.
+
+        Базова реалізація PTB спершу бере слот max_concurrent_updates, а вже потім
+        викликає do_process_update. Тоді кілька швидких оновлень одного користувача
+        тримали б слоти, просто чекаючи одне на одне, і блокували б усіх інших.
+        """
+        key = self.get_key(update)
+        if key is None:
+            async with self._semaphore:
+                await self.do_process_update(update, coroutine)
+            return
+
+        entry = self._locks.get(key)
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                async with self._semaphore:
+                    await self.do_process_update(update, coroutine)
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    async def do_process_update(self, update, coroutine):
+        await coroutine
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        self._locks.clear()
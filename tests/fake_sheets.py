@@ -0,0 +1,81 @@
+"""
+Локальна заміна Google Таблиць для тестів синхронізації.
+
+Реалізує ту частину API gspread (Spreadsheet і Worksheet), якою користується
+services/sync_service, і рахує виклики, щоб тести могли перевірити, скільки
+запитів пішло б до Google.
+"""
+import re
+
+import gspread
+
+_CELL = re.compile(r"^([A-Z]+)(\d+)$")
+
+
+def _parse_cell(cell):
+    letters, row = _CELL.match(cell).groups()
+    column = 0
+    for letter in letters:
+        column = column * 26 + ord(letter) - ord("A") + 1
+    return int(row), column
+
+
+class FakeWorksheet:
+    def __init__(self, title, rows=1000, cols=26):
+        self.title = title
+        self.row_count = rows
+        self.col_count = cols
+        self.cells = {}  # (рядок, стовпець) -> значення
+        self.calls = []
+
+    def clear(self):
+        self.calls.append("clear")
+        self.cells.clear()
+
+    def update(self, values=None, range_name=None):
+        self.calls.append("update")
+        row, column = _parse_cell(range_name.split(":")[0])
+        if row + len(values) - 1 > self.row_count:
+            raise gspread.exceptions.GSpreadException(f"Range {range_name} exceeds grid limits")
+        for row_offset, row_values in enumerate(values):
+            for column_offset, value in enumerate(row_values):
+                self.cells[(row + row_offset, column + column_offset)] = value
+
+    def batch_clear(self, ranges):
+        self.calls.append("batch_clear")
+        for range_name in ranges:
+            start, end = range_name.split(":")
+            first_row, first_column = _parse_cell(start)
+            last_row, last_column = _parse_cell(end)
+            for row in range(first_row, last_row + 1):
+                for column in range(first_column, last_column + 1):
+                    self.cells.pop((row, column), None)
+
+    def add_rows(self, rows):
+        self.calls.append("add_rows")
+        self.row_count += rows
+
+    def get_all_values(self):
+        if not self.cells:
+            return []
+        last_row = max(row for row, _ in self.cells)
+        last_column = max(column for _, column in self.cells)
+        return [[self.cells.get((row, column), "") for column in range(1, last_column + 1)]
+                for row in range(1, last_row + 1)]
+
+
+class FakeSpreadsheet:
+    def __init__(self):
+        self.worksheets = {}
+
+    def worksheet(self, title):
+        if title not in self.worksheets:
+            raise gspread.WorksheetNotFound(title)
+        return self.worksheets[title]
+
+    def add_worksheet(self, title, rows, cols):
+        self.worksheets[title] = FakeWorksheet(title, rows, cols)
+        return self.worksheets[title]
+
+    def del_worksheet(self, worksheet):
+        del self.worksheets[worksheet.title]
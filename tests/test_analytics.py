@@ -1,8 +1,11 @@
 import unittest
 import asyncio
+import io
 import sys
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
+
+from telegram.error import BadRequest
 
 # Add the parent directory to the Python path if not already there
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -14,6 +17,8 @@ from handlers.analytics import (
     stats_handler,
     chart_handler,
     report_handler,
+    trends_handler,
+    insights_handler,
     export_handler,
     handle_analytics_callback,
     handle_stats_callback,
@@ -51,6 +56,12 @@ class TestAnalyticsHandlerPatterns(unittest.TestCase):
     def test_report_handler_pattern(self):
         self.assertEqual(report_handler.pattern.pattern, '^report$')
 
+    def test_trends_handler_pattern(self):
+        self.assertEqual(trends_handler.pattern.pattern, '^trends$')
+
+    def test_insights_handler_pattern(self):
+        self.assertEqual(insights_handler.pattern.pattern, '^insights$')
+
     def test_export_handler_command(self):
         self.assertEqual(export_handler.command, 'export')
 
@@ -132,11 +143,9 @@ class TestAnalyticsHandlers(unittest.TestCase):
         update.callback_query.edit_message_text.assert_called_once()
 
     @patch('handlers.analytics.log_command_usage')
-    @patch('handlers.analytics.generate_expense_chart')
+    @patch('handlers.analytics.get_expense_chart')
     @patch('handlers.analytics.analytics_menu_keyboard')
-    @patch('handlers.analytics.open')
-    @patch('handlers.analytics.os.remove')
-    async def test_chart_callback(self, mock_remove, mock_open, mock_keyboard, mock_generate_chart, mock_log):
+    async def test_chart_callback(self, mock_keyboard, mock_get_chart, mock_log):
         # Create mock update and context
         update = MagicMock()
         context = MagicMock()
@@ -158,34 +167,53 @@ class TestAnalyticsHandlers(unittest.TestCase):
         mock_log.return_value = asyncio.Future()
         mock_log.return_value.set_result(None)
         
-        # Configure the generate_expense_chart mock
-        mock_generate_chart.return_value = "chart.png"
+        # Configure the get_expense_chart mock
+        mock_get_chart.return_value = ("chart-key", b"png-bytes")
         
         # Configure the keyboard mock
         mock_keyboard.return_value = "keyboard"
         
-        # Configure the open mock
-        mock_file = MagicMock()
-        mock_open.return_value.__enter__.return_value = mock_file
-        
         # Call the handler
         await handle_chart_callback(update, context)
         
         # Check that log_command_usage was called
         mock_log.assert_called_once_with(update, context)
         
-        # Check that generate_expense_chart was called with the correct user_id
-        mock_generate_chart.assert_called_once_with(123)
+        # Check that get_expense_chart was called with the correct user_id
+        mock_get_chart.assert_called_once_with(123)
         
         # Check that callback_query.answer was called
         update.callback_query.answer.assert_called_once()
         
-        # Check that context.bot.send_photo and context.bot.send_message were called
+        # Check that the chart bytes were sent without touching the file system
         context.bot.send_photo.assert_called_once()
+        self.assertEqual(context.bot.send_photo.call_args.kwargs["photo"], b"png-bytes")
         context.bot.send_message.assert_called_once()
-        
-        # Check that os.remove was called with the correct file path
-        mock_remove.assert_called_once_with("chart.png")
+
+    @patch('handlers.analytics.log_command_usage', new_callable=AsyncMock)
+    @patch('handlers.analytics.forget_file_id')
+    @patch('handlers.analytics.get_expense_chart', new_callable=AsyncMock)
+    @patch('handlers.analytics.analytics_menu_keyboard')
+    async def test_chart_callback_stale_file_id_without_data(self, mock_keyboard, mock_get_chart, mock_forget,
+                                                             mock_log):
+        update = MagicMock()
+        update.callback_query.from_user.id = 123
+        update.callback_query.answer = AsyncMock()
+        update.callback_query.edit_message_text = AsyncMock()
+        context = MagicMock()
+        context.bot.send_photo = AsyncMock(side_effect=BadRequest("Wrong file identifier"))
+        context.bot.send_message = AsyncMock()
+        mock_keyboard.return_value = "keyboard"
+        # Збережений file_id застарів, а перемалювати графік уже нема з чого
+        mock_get_chart.side_effect = [("chart-key", "file-id"), None]
+
+        await handle_chart_callback(update, context)
+
+        mock_forget.assert_called_once_with("chart-key")
+        mock_get_chart.assert_called_with(123, use_file_id=False)
+        update.callback_query.edit_message_text.assert_called_once_with(
+            text="❌ Недостатньо даних для графіка.", reply_markup="keyboard")
+        context.bot.send_message.assert_not_called()
 
     @patch('handlers.analytics.log_command_usage')
     @patch('handlers.analytics.get_transaction_report')
@@ -234,47 +262,78 @@ class TestAnalyticsHandlers(unittest.TestCase):
         update.callback_query.edit_message_text.assert_called_once()
 
     @patch('handlers.analytics.log_command_usage')
-    @patch('handlers.analytics.export_transactions_to_excel')
-    @patch('handlers.analytics.open')
-    @patch('handlers.analytics.os.remove')
-    async def test_export_command(self, mock_remove, mock_open, mock_export, mock_log):
+    @patch('handlers.analytics.export_queue')
+    async def test_export_command(self, mock_queue, mock_log):
         # Create mock update and context
         update = MagicMock()
         context = MagicMock()
         
         # Configure the mocks
         update.effective_user.id = 123
-        update.message.reply_text = MagicMock(return_value=asyncio.Future())
-        update.message.reply_text.return_value.set_result(None)
-        
-        context.bot.send_document = MagicMock(return_value=asyncio.Future())
-        context.bot.send_document.return_value.set_result(None)
+        message = MagicMock()
+        message.edit_text = AsyncMock()
+        message.delete = AsyncMock()
+        update.message.reply_text = AsyncMock(return_value=message)
+        context.args = []
+        context.bot.send_document = AsyncMock()
         
         # Configure the log_command_usage mock to return an awaitable
         mock_log.return_value = asyncio.Future()
         mock_log.return_value.set_result(None)
         
-        # Configure the export_transactions_to_excel mock
-        mock_export.return_value = "export.xlsx"
+        # Configure the export queue mock
+        job = MagicMock(export_format="xlsx", error=None, progress=(1000, 4000))
+        mock_queue.submit.return_value = (job, True)
         
-        # Configure the open mock
-        mock_file = MagicMock()
-        mock_open.return_value.__enter__.return_value = mock_file
-        
-        # Call the handler
+        # Call the handler: it only queues the export
         await handle_export_command(update, context)
         
         # Check that log_command_usage was called
         mock_log.assert_called_once_with(update, context)
         
-        # Check that export_transactions_to_excel was called with the correct user_id
-        mock_export.assert_called_once_with(123)
+        # Check that the export was queued with the default format
+        user_id, export_format, on_progress, on_done = mock_queue.submit.call_args.args
+        self.assertEqual((user_id, export_format), (123, "xlsx"))
+        context.bot.send_document.assert_not_called()
         
-        # Check that context.bot.send_document was called
-        context.bot.send_document.assert_called_once()
+        # Progress edits the "preparing" message
+        await on_progress(job)
+        self.assertIn("1000 з 4000", message.edit_text.call_args.kwargs["text"])
         
-        # Check that os.remove was called with the correct file path
-        mock_remove.assert_called_once_with("export.xlsx")
+        # The finished file replaces the "preparing" message
+        buffer = io.BytesIO(b"xlsx")
+        await on_done(job, (buffer, "transactions_123.xlsx"))
+        context.bot.send_document.assert_called_once()
+        document = context.bot.send_document.call_args.kwargs["document"]
+        # The spooled buffer itself is uploaded, not a bytes copy of it
+        self.assertIs(document.input_file_content, buffer)
+        self.assertEqual(document.filename, "transactions_123.xlsx")
+        self.assertTrue(buffer.closed)
+        message.delete.assert_called_once()
+
+    @patch('handlers.analytics.log_command_usage')
+    @patch('handlers.analytics.export_queue')
+    async def test_export_command_format_option(self, mock_queue, mock_log):
+        update = MagicMock()
+        context = MagicMock()
+        update.effective_user.id = 123
+        message = MagicMock()
+        message.edit_text = AsyncMock()
+        update.message.reply_text = AsyncMock(return_value=message)
+        mock_log.return_value = asyncio.Future()
+        mock_log.return_value.set_result(None)
+        mock_queue.submit.return_value = (MagicMock(), False)
+
+        context.args = ["CSV.GZ"]
+        await handle_export_command(update, context)
+        self.assertEqual(mock_queue.submit.call_args.args[:2], (123, "csv.gz"))
+        # A duplicate request only says that the export is already being prepared
+        self.assertIn("уже готується", message.edit_text.call_args.kwargs["text"])
+
+        # Unknown formats are rejected without queueing anything
+        context.args = ["pdf"]
+        await handle_export_command(update, context)
+        self.assertEqual(mock_queue.submit.call_count, 1)
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
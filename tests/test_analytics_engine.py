@@ -0,0 +1,159 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import analytics_engine
+from services import connection_pool
+from services import database_service
+from services import snapshot_cache
+from services.analytics_engine import TransactionColumns
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+def epoch(text):
+    return analytics_engine._epoch(datetime.strptime(text, "%Y-%m-%d %H:%M:%S"))
+
+
+def make_columns(rows):
+    """rows: (timestamp, amount, category); витрати — від'ємні суми."""
+    return TransactionColumns.from_rows([(epoch(timestamp), amount, category, "витрата" if amount < 0 else "дохід")
+                                         for timestamp, amount, category in rows])
+
+
+@test_category(TestCategory.UNIT)
+class TestAnalyticsEngine(unittest.TestCase):
+    def test_monthly_trends_fill_gaps_and_compute_change(self):
+        columns = make_columns([
+            ("2024-01-10 10:00:00", -100, "Їжа"),
+            ("2024-01-20 10:00:00", 1000, "Зарплата"),
+            ("2024-03-05 10:00:00", -150, "Їжа"),
+            ("2024-04-01 00:00:00", -300, "Їжа"),
+        ])
+
+        trends = analytics_engine.monthly_trends(columns)
+
+        self.assertEqual([month["month"] for month in trends], ["2024-01", "2024-02", "2024-03", "2024-04"])
+        self.assertEqual([month["expense"] for month in trends], [100, 0, 150, 300])
+        self.assertEqual(trends[0]["income"], 1000)
+        self.assertEqual([month["expense_change"] for month in trends], [None, -100, None, 100])
+
+    def test_rolling_averages_and_weekdays(self):
+        # 2024-03-11 — понеділок
+        columns = make_columns([
+            ("2024-03-11 09:00:00", -70, "Їжа"),
+            ("2024-03-11 19:00:00", -70, "Кафе"),
+            ("2024-03-17 12:00:00", -70, "Їжа"),
+            ("2024-03-01 12:00:00", -300, "Їжа"),
+        ])
+
+        rolling = analytics_engine.rolling_averages(columns, now=datetime(2024, 3, 17, 23, 0))
+        weekdays = dict((day, (total, average)) for day, total, average in
+                        analytics_engine.weekday_spending(columns))
+
+        self.assertAlmostEqual(rolling[7][0], 30)
+        self.assertAlmostEqual(rolling[7][1], 0)
+        self.assertAlmostEqual(rolling[30][0], 510 / 30)
+        self.assertEqual(weekdays["Пн"], (140, 140))
+        self.assertEqual(weekdays["Нд"], (70, 70))
+        self.assertEqual(weekdays["Пт"], (300, 300))
+
+    def test_percentiles_and_anomalies(self):
+        rows = [(f"2024-02-{day:02d} 12:00:00", -(100 + day), "Їжа") for day in range(1, 11)]
+        rows.append(("2024-02-20 12:00:00", -2000, "Їжа"))
+        # У категорії замало витрат, тож велика сума не вважається аномалією
+        rows.append(("2024-02-21 12:00:00", -5000, "Техніка"))
+        columns = make_columns(rows)
+
+        percentiles = analytics_engine.expense_percentiles(columns)
+        anomalies = analytics_engine.find_anomalies(columns)
+
+        self.assertEqual(percentiles[50], 106.5)
+        self.assertEqual([(category, amount) for _, category, amount, _ in anomalies], [("Їжа", 2000)])
+        self.assertEqual(analytics_engine.from_epoch(anomalies[0][0]), datetime(2024, 2, 20, 12, 0))
+
+    def test_rows_with_invalid_time_are_skipped(self):
+        columns = TransactionColumns.from_rows([("2024-01-01 10:00:00", -10, "Їжа", "витрата"),
+                                                ("не дата", -20, "Їжа", "витрата"),
+                                                (None, -30, "Кафе", "витрата")])
+
+        self.assertEqual(columns.amounts.tolist(), [-10])
+        self.assertEqual(columns.timestamps.tolist(), [epoch("2024-01-01 10:00:00")])
+
+    def test_null_category_and_type(self):
+        columns = TransactionColumns.from_rows([("2024-01-01 10:00:00", -5, None, "витрата"),
+                                                ("2024-01-02 10:00:00", -7, "Їжа", None)])
+
+        self.assertEqual(columns.categories, ["", "Їжа"])
+        self.assertEqual(columns.types, ["витрата", ""])
+        self.assertEqual(columns.is_expense.tolist(), [True, False])
+        self.assertGreater(columns.nbytes, 0)
+
+    def test_empty_columns(self):
+        columns = TransactionColumns.from_rows([])
+
+        self.assertEqual(analytics_engine.monthly_trends(columns), [])
+        self.assertEqual(analytics_engine.expense_percentiles(columns), {})
+        self.assertEqual(analytics_engine.find_anomalies(columns), [])
+        self.assertEqual(analytics_engine.rolling_averages(columns)[7], (0, 0))
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestLoadColumns(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "engine.db")
+        self.patchers = [patch.object(database_service, "DATABASE_FILE", self.db_path),
+                         patch.object(analytics_engine, "DATABASE_FILE", self.db_path)]
+        for patcher in self.patchers:
+            patcher.start()
+        snapshot_cache.clear()
+        database_service.init_database()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        snapshot_cache.clear()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def test_columns_match_database_rows(self):
+        database_service.add_transaction(1, -120, "Їжа")
+        database_service.add_transaction(1, 3000, "Зарплата")
+        database_service.add_transaction(1, -40, "Їжа")
+        database_service.add_transaction(2, -999, "Інше")
+
+        columns = analytics_engine.load_columns(1)
+
+        self.assertEqual(len(columns), 3)
+        self.assertEqual(columns.timestamps.dtype.name, "int64")
+        self.assertEqual(sorted(columns.amounts.tolist()), [-120, -40, 3000])
+        self.assertCountEqual(columns.categories, ["Зарплата", "Їжа"])
+        self.assertEqual(columns.is_expense.sum(), 2)
+        self.assertEqual({columns.categories[code] for code in columns.category_codes[columns.is_expense]},
+                         {"Їжа"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,157 @@
+import unittest
+import sys
+import os
+import csv
+import gzip
+import io
+import tempfile
+from unittest.mock import patch
+
+import openpyxl
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import connection_pool
+from services import database_service
+from services import analytics_service
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        INTEGRATION = "Integration Tests"
+
+
+class TempDatabaseMixin:
+    """Створює тимчасову базу даних і підміняє DATABASE_FILE на час тесту."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "analytics.db")
+        self.patchers = [patch.object(database_service, "DATABASE_FILE", self.db_path),
+                         patch.object(analytics_service, "DATABASE_FILE", self.db_path)]
+        for patcher in self.patchers:
+            patcher.start()
+        database_service.init_database()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestStreamingExcelExport(TempDatabaseMixin, unittest.TestCase):
+    def test_rows_styles_and_widths(self):
+        database_service.add_transaction(1, -100.5, "Кафе та ресторани")
+        database_service.add_transaction(1, 2000, "Зарплата")
+        output = io.BytesIO()
+
+        count = analytics_service.write_transactions_excel(1, output, chunk_size=1)
+
+        self.assertEqual(count, 2)
+        ws = openpyxl.load_workbook(io.BytesIO(output.getvalue())).active
+        rows = [[cell.value for cell in row] for row in ws.iter_rows()]
+        self.assertEqual(rows[0], ["Дата", "Сума", "Категорія", "Тип"])
+        self.assertEqual(sorted(row[1] for row in rows[1:]), [100.5, 2000])
+        self.assertEqual(ws.freeze_panes, "A2")
+        self.assertEqual(ws.column_dimensions["C"].width, len("Кафе та ресторани") + 4)
+        fills = {row[3].value: row[3].fill.start_color.rgb for row in ws.iter_rows(min_row=2)}
+        self.assertEqual(fills, {"витрата": "00FFCCCC", "дохід": "00C6EFCE"})
+
+    def test_chunks_cover_all_rows_in_order(self):
+        conn = connection_pool.connect(self.db_path)
+        try:
+            conn.executemany("INSERT INTO transactions (user_id, amount, category, type, timestamp) "
+                             "VALUES (1, ?, 'Їжа', 'витрата', ?)",
+                             [(-i, f"2024-01-{i % 5 + 1:02d} 10:00:00") for i in range(25)])
+            conn.commit()
+            rows = list(analytics_service.iter_user_transactions(conn.cursor(), 1, chunk_size=4))
+        finally:
+            conn.close()
+
+        self.assertEqual(len(rows), 25)
+        self.assertEqual([row[0] for row in rows], sorted((row[0] for row in rows), reverse=True))
+        self.assertEqual(sorted(row[1] for row in rows), sorted(-i for i in range(25)))
+
+    def test_no_transactions_creates_no_file(self):
+        self.assertIsNone(analytics_service.export_transactions_to_excel(404))
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestStreamingCsvExport(TempDatabaseMixin, unittest.TestCase):
+    def read_csv(self, data):
+        return list(csv.reader(io.StringIO(data.decode("utf-8-sig"))))
+
+    def test_chunked_csv_matches_rows(self):
+        for i in range(7):
+            database_service.add_transaction(1, -10 - i, "Їжа, кава")
+        output = io.BytesIO()
+
+        count = analytics_service.write_transactions_csv(1, output, chunk_size=3)
+
+        rows = self.read_csv(output.getvalue())
+        self.assertEqual(count, 7)
+        self.assertEqual(rows[0], ["Дата", "Сума", "Категорія", "Тип"])
+        self.assertEqual(sorted(float(row[1]) for row in rows[1:]), [-16, -15, -14, -13, -12, -11, -10])
+        self.assertEqual({row[2] for row in rows[1:]}, {"Їжа, кава"})
+
+    def test_gzip_export_in_spooled_buffer(self):
+        database_service.add_transaction(1, 500, "Зарплата")
+
+        buffer, filename = analytics_service.export_transactions(1, "csv.gz")
+        with buffer:
+            self.assertIsInstance(buffer, tempfile.SpooledTemporaryFile)
+            rows = self.read_csv(gzip.decompress(buffer.read()))
+
+        self.assertEqual(filename, "transactions_1.csv.gz")
+        self.assertEqual(rows[1][2:], ["Зарплата", "дохід"])
+
+    def test_no_transactions_returns_none(self):
+        self.assertIsNone(analytics_service.export_transactions(404, "csv"))
+        self.assertIsNone(analytics_service.export_transactions(404, "xlsx"))
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestExportQueryPlans(TempDatabaseMixin, unittest.TestCase):
+    def test_export_pages_use_index(self):
+        for i in range(5):
+            database_service.add_transaction(1, -i - 1, "Їжа")
+        connection_pool.close_all()
+        statements = []
+        original_open = connection_pool.ConnectionPool._open
+
+        def traced_open(pool):
+            conn = original_open(pool)
+            conn.set_trace_callback(statements.append)
+            return conn
+
+        with patch.object(connection_pool.ConnectionPool, "_open", traced_open):
+            self.assertEqual(analytics_service.write_transactions_csv(1, io.BytesIO(), chunk_size=2), 5)
+
+        pages = [sql for sql in statements if sql.strip().upper().startswith("SELECT")]
+        self.assertGreaterEqual(len(pages), 3)
+        conn = connection_pool.connect(self.db_path)
+        try:
+            for sql in pages:
+                plan = [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()]
+                # Кожна порція читається з індексу, а не скануванням таблиці
+                self.assertFalse([step for step in plan if step.startswith("SCAN")], f"{sql}: {plan}")
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -23,7 +23,8 @@ from handlers.budget import (
     handle_budgeting_callback,
     handle_goal_callback,
     handle_budget_callback,
-    handle_piggy_bank_callback
+    handle_piggy_bank_callback,
+    format_budget_period
 )
 
 # Import the test_category decorator
@@ -73,6 +74,11 @@ class TestBudgetHandlerPatterns(unittest.TestCase):
     def test_piggy_bank_delete_confirm_handler_pattern(self):
         self.assertEqual(piggy_bank_delete_confirm_handler.pattern.pattern, '^piggy_bank_delete_confirm_')
 
+    def test_format_budget_period(self):
+        self.assertEqual(format_budget_period("Їжа", 1000, 350.5, 649.5),
+                         "🔹 *Їжа*: витрачено `350.5 грн` з `1000 грн`, залишок `649.5 грн`")
+        self.assertIn("⚠️ перевищено на `100 грн`", format_budget_period("Їжа", 1000, 1100, -100))
+
 @test_category(TestCategory.HANDLERS)
 class TestBudgetHandlers(unittest.TestCase):
     @patch('handlers.budget.log_command_usage')
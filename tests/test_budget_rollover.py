@@ -0,0 +1,79 @@
+import unittest
+import asyncio
+import sys
+import os
+from datetime import datetime
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import async_database_service
+from services import budget_rollover
+from services.budget_rollover import BudgetRollover
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+
+
+@test_category(TestCategory.UNIT)
+class TestBudgetRollover(unittest.TestCase):
+    def tearDown(self):
+        async_database_service.shutdown()
+
+    def test_next_rollover_is_after_midnight(self):
+        self.assertEqual(budget_rollover.next_rollover(datetime(2024, 1, 31, 23, 59)),
+                         datetime(2024, 2, 1) + budget_rollover.ROLLOVER_DELAY)
+        self.assertEqual(budget_rollover.next_rollover(datetime(2024, 12, 31, 0, 0)),
+                         datetime(2025, 1, 1) + budget_rollover.ROLLOVER_DELAY)
+
+    def test_periods_are_opened_on_start(self):
+        calls = []
+
+        def open_periods():
+            calls.append(datetime.now())
+            return 3
+
+        async def scenario():
+            rollover = BudgetRollover()
+            await rollover.start(open_periods)
+            for _ in range(100):
+                if rollover.last_opened is not None:
+                    break
+                await asyncio.sleep(0.01)
+            self.assertTrue(rollover.running)
+            await rollover.stop()
+            self.assertFalse(rollover.running)
+            return rollover.last_opened
+
+        self.assertEqual(asyncio.run(scenario()), 3)
+        self.assertEqual(len(calls), 1)
+
+    def test_failed_rollover_does_not_stop_task(self):
+        def broken():
+            raise RuntimeError("database is locked")
+
+        async def scenario():
+            rollover = BudgetRollover()
+            await rollover.start(broken)
+            self.assertIsNone(await rollover.rollover())
+            self.assertTrue(rollover.running)
+            await rollover.stop()
+
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+from unittest.mock import AsyncMock, patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import analytics_service
+from services import analytics_engine
+from services import async_database_service
+from services import chart_service
+from services.chart_cache import ChartCache, chart_key
+from services import connection_pool
+from services import database_service
+from services import snapshot_cache
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+@test_category(TestCategory.UNIT)
+class TestChartRendering(unittest.TestCase):
+    def test_render_returns_png_bytes(self):
+        png = chart_service.render_expense_chart_png(["Їжа", "Транспорт"], [-300, -120.5])
+        self.assertTrue(png.startswith(PNG_SIGNATURE))
+
+    def test_render_single_category(self):
+        png = chart_service.render_expense_chart_png(["Їжа"], [-300])
+        self.assertTrue(png.startswith(PNG_SIGNATURE))
+
+
+@test_category(TestCategory.UNIT)
+class TestChartCache(unittest.TestCase):
+    def test_key_depends_only_on_content(self):
+        self.assertEqual(chart_key("expense", [("Їжа", -10)]), chart_key("expense", [["Їжа", -10]]))
+        self.assertNotEqual(chart_key("expense", [("Їжа", -10)]), chart_key("expense", [("Їжа", -11)]))
+
+    def test_lru_eviction(self):
+        cache = ChartCache(max_entries=2)
+        cache.put("a", b"1")
+        cache.put("b", b"2")
+        cache.get("a")
+        cache.put("c", b"3")
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a")["png"], b"1")
+        self.assertEqual(len(cache), 2)
+
+    def test_user_key_invalidated_by_version(self):
+        cache = ChartCache()
+        cache.remember_user(1, "expense", 3, "key")
+
+        self.assertEqual(cache.user_key(1, "expense", 3), "key")
+        self.assertIsNone(cache.user_key(1, "expense", 4))
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestChartServiceProcessPool(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "charts.db")
+        self.patchers = [patch.object(database_service, "DATABASE_FILE", self.db_path),
+                         patch.object(analytics_service, "DATABASE_FILE", self.db_path),
+                         patch.object(analytics_engine, "DATABASE_FILE", self.db_path)]
+        for patcher in self.patchers:
+            patcher.start()
+        snapshot_cache.clear()
+        database_service.init_database()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        snapshot_cache.clear()
+        chart_service.shutdown()
+        async_database_service.shutdown()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def test_chart_rendered_in_pool_without_files(self):
+        database_service.add_transaction(5, -250, "Їжа")
+        database_service.add_transaction(5, -80, "Кава")
+        files_before = set(os.listdir("."))
+
+        png = asyncio.run(chart_service.render_expense_chart(5))
+
+        self.assertTrue(png.startswith(PNG_SIGNATURE))
+        self.assertEqual(set(os.listdir(".")), files_before)
+
+    def test_cached_chart_reuses_png_and_file_id(self):
+        database_service.add_transaction(6, -250, "Їжа")
+        stats = patch.object(chart_service, "get_expense_stats", wraps=chart_service.get_expense_stats)
+        render = patch.object(chart_service, "_render_expense_data", new_callable=AsyncMock, return_value=b"png")
+
+        with stats as mock_stats, render as mock_render, patch.object(chart_service, "cache", ChartCache()):
+            key, photo = asyncio.run(chart_service.get_expense_chart(6))
+            self.assertEqual(photo, b"png")
+
+            chart_service.remember_file_id(key, "telegram-file-id")
+            self.assertEqual(asyncio.run(chart_service.get_expense_chart(6)), (key, "telegram-file-id"))
+            self.assertEqual(asyncio.run(chart_service.get_expense_chart(6, use_file_id=False)), (key, b"png"))
+            self.assertEqual(mock_render.await_count, 1)
+            self.assertEqual(mock_stats.call_count, 1)
+
+            database_service.add_transaction(6, -40, "Кава")
+            new_key, photo = asyncio.run(chart_service.get_expense_chart(6))
+
+        self.assertNotEqual(new_key, key)
+        self.assertEqual(photo, b"png")
+        self.assertEqual(mock_render.await_count, 2)
+        self.assertEqual(mock_stats.call_count, 2)
+
+    def test_no_expenses_returns_none(self):
+        database_service.add_transaction(5, 1000, "Зарплата")
+        self.assertIsNone(asyncio.run(chart_service.render_expense_chart(5)))
+
+
+if __name__ == '__main__':
+    unittest.main()
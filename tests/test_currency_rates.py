@@ -0,0 +1,153 @@
+import unittest
+import asyncio
+import sys
+import os
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services.currency_rates import CurrencyRateService, ExchangeRateApiProvider, RateFetchError, RateProvider
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+RATES = {
+    "USD": {"EUR": 0.9, "UAH": 41.0},
+    "EUR": {"USD": 1.1, "UAH": 45.0},
+}
+
+
+class FakeRatesServer:
+    """Локальний HTTP-сервер у форматі exchangerate-api: /v4/latest/<BASE>."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.requests = []
+        self.fail = False
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                base = self.path.rsplit("/", 1)[-1]
+                server.requests.append(base)
+                time.sleep(server.delay)
+                if server.fail or base not in RATES:
+                    status, body = 500, b"{}"
+                else:
+                    status, body = 200, json.dumps({"base": base, "rates": RATES[base]}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_port}/v4/latest/{{base}}"
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestCurrencyRateService(unittest.TestCase):
+    def setUp(self):
+        self.server = FakeRatesServer()
+
+    def tearDown(self):
+        self.server.stop()
+
+    def run_with_service(self, scenario, ttl=600):
+        async def wrapper():
+            service = CurrencyRateService(ExchangeRateApiProvider(url=self.server.url), ttl=ttl)
+            try:
+                return await scenario(service)
+            finally:
+                await service.close()
+
+        return asyncio.run(wrapper())
+
+    def test_one_fetch_serves_every_pair_of_base(self):
+        async def scenario(service):
+            rates = [await service.get_rate("USD", "EUR"), await service.get_rate("usd", "UAH"),
+                     await service.get_rate("USD", "USD"), await service.get_rate("USD", "XYZ")]
+            return rates, service.stats()
+
+        rates, stats = self.run_with_service(scenario)
+
+        self.assertEqual(rates, [0.9, 41.0, 1.0, None])
+        self.assertEqual(self.server.requests, ["USD"])
+        self.assertEqual((stats["fetches"], stats["hits"]), (1, 3))
+
+    def test_concurrent_requests_share_one_fetch(self):
+        self.server.delay = 0.2
+
+        async def scenario(service):
+            return await asyncio.gather(*(service.get_rate("EUR", "UAH") for _ in range(20)),
+                                        service.get_rate("USD", "UAH"))
+
+        rates = self.run_with_service(scenario)
+
+        self.assertEqual(rates, [45.0] * 20 + [41.0])
+        self.assertCountEqual(self.server.requests, ["EUR", "USD"])
+
+    def test_expired_table_is_fetched_again(self):
+        async def scenario(service):
+            await service.get_rates("USD")
+            await service.get_rates("USD")
+
+        self.run_with_service(scenario, ttl=0)
+
+        self.assertEqual(self.server.requests, ["USD", "USD"])
+
+    def test_failures_are_not_cached(self):
+        self.server.fail = True
+
+        async def scenario(service):
+            with self.assertRaises(RateFetchError):
+                await service.get_rates("USD")
+            with self.assertRaises(RateFetchError):
+                await service.get_rates("U$D")
+            self.server.fail = False
+            return await service.get_rate("USD", "EUR"), service.stats()["errors"]
+
+        self.assertEqual(self.run_with_service(scenario), (0.9, 1))
+        self.assertEqual(self.server.requests, ["USD", "USD"])
+
+
+    def test_provider_without_fetch_cannot_be_created(self):
+        class IncompleteProvider(RateProvider):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteProvider()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,579 @@
+import unittest
+import sys
+import os
+import sqlite3
+import asyncio
+import tempfile
+import threading
+from datetime import datetime
+from unittest.mock import patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import connection_pool
+from services import db_writer
+from services import async_database_service
+from services import database_service
+from services import analytics_service
+from services import analytics_engine
+from services import snapshot_cache
+from services import transaction_service
+from services import migrations
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+class TempDatabaseMixin:
+    """Створює тимчасову базу даних і підміняє DATABASE_FILE на час тесту."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "test_finance_bot.db")
+        self.db_patcher = patch.object(database_service, "DATABASE_FILE", self.db_path)
+        self.db_patcher.start()
+        self.engine_patcher = patch.object(analytics_engine, "DATABASE_FILE", self.db_path)
+        self.engine_patcher.start()
+        snapshot_cache.clear()
+        database_service.init_database()
+
+    def tearDown(self):
+        self.db_patcher.stop()
+        self.engine_patcher.stop()
+        snapshot_cache.clear()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+
+@test_category(TestCategory.UNIT)
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "pool.db")
+
+    def tearDown(self):
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def test_connection_is_reused(self):
+        pool = connection_pool.ConnectionPool(self.db_path, size=2)
+        first = pool.acquire()
+        first.close()
+        second = pool.acquire()
+        self.assertIs(first, second)
+        second.close()
+        pool.close()
+
+    def test_pragmas_applied_once_per_connection(self):
+        pool = connection_pool.ConnectionPool(self.db_path, size=1, pragmas=[("busy_timeout", 1234)])
+        conn = pool.acquire()
+        self.assertEqual(conn.execute("PRAGMA busy_timeout").fetchone()[0], 1234)
+        conn.close()
+        pool.close()
+
+    def test_overflow_connection_closed_on_release(self):
+        pool = connection_pool.ConnectionPool(self.db_path, size=1)
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertIsNot(first, second)
+        first.close()
+        second.close()
+        self.assertIs(pool.acquire(), first)
+        pool.close()
+
+    def test_uncommitted_changes_rolled_back_on_release(self):
+        pool = connection_pool.ConnectionPool(self.db_path, size=1)
+        conn = pool.acquire()
+        conn.execute("CREATE TABLE t (x INTEGER)")
+        conn.execute("INSERT INTO t VALUES (1)")
+        conn.close()
+        conn = pool.acquire()
+        self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 0)
+        conn.close()
+        pool.close()
+
+    def test_double_close_is_ignored(self):
+        pool = connection_pool.ConnectionPool(self.db_path, size=2)
+        conn = pool.acquire()
+        conn.close()
+        conn.close()
+        first = pool.acquire()
+        second = pool.acquire()
+        self.assertIsNot(first, second)
+        first.close()
+        second.close()
+        pool.close()
+
+    def test_closed_pool_rejects_acquire(self):
+        pool = connection_pool.ConnectionPool(self.db_path, size=1)
+        pool.close()
+        with self.assertRaises(Exception):
+            pool.acquire()
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestDatabaseServiceWithPool(TempDatabaseMixin, unittest.TestCase):
+    def test_add_and_read_transaction(self):
+        self.assertTrue(database_service.add_transaction(1, -50, "Їжа"))
+        history = database_service.get_transaction_history(1)
+        self.assertEqual(len(history), 1)
+        self.assertEqual(history[0][1], -50)
+        self.assertEqual(history[0][2], "Їжа")
+
+    def test_connections_are_pooled(self):
+        database_service.add_transaction(1, 100, "Зарплата")
+        database_service.get_transaction_history(1)
+        pool = connection_pool.get_pool(self.db_path)
+        self.assertGreaterEqual(pool._idle.qsize(), 1)
+        self.assertLessEqual(pool._idle.qsize(), pool.size)
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestIncrementalBudget(TempDatabaseMixin, unittest.TestCase):
+    def budget(self, user_id, category):
+        return dict(database_service.get_budgets(user_id)).get(category)
+
+    def test_delta_updates_match_full_recalculation(self):
+        database_service.set_budget(1, "Їжа", 1000)
+        for amount in (-100, -250.5, 40):
+            database_service.add_transaction(1, amount, "Їжа")
+            database_service.update_budget_for_transaction(1, amount, "Їжа")
+
+        self.assertAlmostEqual(self.budget(1, "Їжа"), 689.5)
+        self.assertEqual(database_service.check_budget_consistency(1), [])
+
+        database_service.recalculate_user_budget(1)
+        self.assertAlmostEqual(self.budget(1, "Їжа"), 689.5)
+
+    def test_missing_budget_row_is_created_from_history(self):
+        database_service.add_transaction(1, -30, "Транспорт")
+        database_service.add_transaction(1, -20, "Транспорт")
+        database_service.update_budget_for_transaction(1, -20, "Транспорт")
+
+        self.assertAlmostEqual(self.budget(1, "Транспорт"), -50)
+
+    def test_set_budget_after_transactions(self):
+        database_service.add_transaction(1, -200, "Їжа")
+        database_service.update_budget_for_transaction(1, -200, "Їжа")
+        database_service.set_budget(1, "Їжа", 500)
+        database_service.add_transaction(1, -50, "Їжа")
+        database_service.update_budget_for_transaction(1, -50, "Їжа")
+
+        self.assertAlmostEqual(self.budget(1, "Їжа"), 450)
+        self.assertEqual(database_service.check_budget_consistency(), [])
+
+    def test_consistency_checker_reports_drift(self):
+        database_service.add_transaction(1, -100, "Їжа")
+        database_service.update_budget_for_transaction(1, -100, "Їжа")
+        database_service.update_budget_for_transaction(1, -5, "Їжа")
+
+        mismatches = database_service.check_budget_consistency(1)
+        self.assertEqual(len(mismatches), 1)
+        self.assertEqual(mismatches[0][:2], (1, "Їжа"))
+
+        database_service.recalculate_user_budget(1)
+        self.assertEqual(database_service.check_budget_consistency(1), [])
+
+    def test_add_funds_to_goal_updates_budget_incrementally(self):
+        database_service.set_budget(1, "Зарплата", 1000)
+        database_service.add_piggy_bank_goal(1, "Відпустка", 500)
+        goal_id = database_service.get_piggy_bank_goals(1)[0][0]
+
+        self.assertTrue(database_service.add_funds_to_goal(1, goal_id, 200))
+        self.assertAlmostEqual(self.budget(1, "Скарбничка"), -200)
+        self.assertEqual(database_service.check_budget_consistency(1), [])
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestAtomicTransactionWrites(TempDatabaseMixin, unittest.TestCase):
+    def count_transactions(self, user_id):
+        return len(database_service.get_transaction_history(user_id, limit=1000))
+
+    def test_add_and_undo_keep_budget_consistent(self):
+        database_service.set_budget(1, "Їжа", 1000)
+        transaction = transaction_service.add_new_transaction(1, -150, "Їжа")
+        self.assertIsNotNone(transaction)
+        self.assertEqual(dict(database_service.get_budgets(1))["Їжа"], 850)
+
+        last = transaction_service.get_user_last_transaction(1)
+        self.assertTrue(transaction_service.delete_user_transaction(last.id))
+        self.assertEqual(dict(database_service.get_budgets(1))["Їжа"], 1000)
+        self.assertEqual(self.count_transactions(1), 0)
+        self.assertEqual(database_service.check_budget_consistency(1), [])
+
+    def test_undo_unknown_transaction(self):
+        self.assertFalse(transaction_service.delete_user_transaction(12345))
+
+    def test_failed_budget_update_rolls_back_insert(self):
+        with patch.object(database_service, "apply_budget_delta", side_effect=sqlite3.OperationalError("boom")):
+            self.assertIsNone(transaction_service.add_new_transaction(1, -150, "Їжа"))
+
+        self.assertEqual(self.count_transactions(1), 0)
+        self.assertEqual(database_service.get_budgets(1), [])
+
+    def test_failed_budget_update_rolls_back_delete(self):
+        transaction_service.add_new_transaction(1, -150, "Їжа")
+        last = transaction_service.get_user_last_transaction(1)
+
+        with patch.object(database_service, "apply_budget_delta", side_effect=sqlite3.OperationalError("boom")):
+            self.assertFalse(transaction_service.delete_user_transaction(last.id))
+
+        self.assertEqual(self.count_transactions(1), 1)
+        self.assertEqual(dict(database_service.get_budgets(1))["Їжа"], -150)
+
+    def test_single_commit_per_action(self):
+        commits = []
+        original_connect = database_service.connect
+
+        def counting_connect(database_file):
+            conn = original_connect(database_file)
+            conn.set_trace_callback(lambda sql: commits.append(sql) if sql.strip().upper() == "COMMIT" else None)
+            return conn
+
+        with patch.object(database_service, "connect", counting_connect):
+            transaction_service.add_new_transaction(1, -150, "Їжа")
+        self.assertEqual(len(commits), 1)
+
+
+@test_category(TestCategory.UNIT)
+class TestDatabaseWriter(unittest.TestCase):
+    def setUp(self):
+        self.writer = db_writer.DatabaseWriter(name="test-writer")
+        self.writer.start()
+
+    def tearDown(self):
+        self.writer.stop()
+
+    def test_submit_runs_in_writer_thread(self):
+        thread_name = self.writer.submit(lambda: threading.current_thread().name)
+        self.assertEqual(thread_name, "test-writer")
+
+    def test_submit_propagates_exceptions(self):
+        def failing():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            self.writer.submit(failing)
+
+    def test_serialized_write_routes_through_module_writer(self):
+        @db_writer.serialized_write
+        def inner():
+            return threading.current_thread().name
+
+        @db_writer.serialized_write
+        def outer():
+            return threading.current_thread().name, inner()
+
+        db_writer.start()
+        try:
+            self.assertEqual(outer(), ("db-writer", "db-writer"))
+        finally:
+            db_writer.stop()
+        self.assertEqual(outer()[0], threading.current_thread().name)
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestDailyRollups(TempDatabaseMixin, unittest.TestCase):
+    def setUp(self):
+        super().setUp()
+        self.analytics_patcher = patch.object(analytics_service, "DATABASE_FILE", self.db_path)
+        self.analytics_patcher.start()
+
+    def tearDown(self):
+        self.analytics_patcher.stop()
+        super().tearDown()
+
+    def rollups(self, user_id):
+        conn = connection_pool.connect(self.db_path)
+        try:
+            return conn.execute("""
+                                SELECT category, type, total, count
+                                FROM daily_rollups
+                                WHERE user_id = ?
+                                ORDER BY category, type
+                                """, (user_id,)).fetchall()
+        finally:
+            conn.close()
+
+    def insert_raw(self, user_id, amount, category, transaction_type, timestamp):
+        conn = connection_pool.connect(self.db_path)
+        try:
+            conn.execute("""
+                         INSERT INTO transactions (user_id, amount, category, type, timestamp)
+                         VALUES (?, ?, ?, ?, ?)
+                         """, (user_id, amount, category, transaction_type, timestamp))
+            conn.commit()
+        finally:
+            conn.close()
+
+    def test_rollups_follow_inserts_and_deletes(self):
+        database_service.add_transaction(1, -100, "Їжа")
+        database_service.add_transaction_with_budget(1, -50, "Їжа")
+        database_service.add_transaction_with_budget(1, 1000, "Зарплата")
+
+        self.assertEqual(self.rollups(1), [("Їжа", "витрата", -150, 2), ("Зарплата", "дохід", 1000, 1)])
+
+        conn = connection_pool.connect(self.db_path)
+        try:
+            ids = [row[0] for row in conn.execute("SELECT id FROM transactions ORDER BY id")]
+        finally:
+            conn.close()
+        database_service.delete_transaction_with_budget(ids[2])
+        database_service.delete_transaction(ids[1])
+
+        self.assertEqual(self.rollups(1), [("Їжа", "витрата", -100, 1)])
+
+    def test_report_matches_transactions(self):
+        for amount, category in [(-100, "Їжа"), (-40, "Транспорт"), (-10, "Кава"), (-5, "Кава"),
+                                 (2000, "Зарплата"), (-300, "Оренда")]:
+            database_service.add_transaction_with_budget(1, amount, category)
+        database_service.add_transaction(2, -999, "Їжа")
+
+        # Звіт читає лише денні зведення, а не всю історію користувача
+        with patch.object(analytics_engine, "connect", side_effect=AssertionError("history read")):
+            report = analytics_service.get_transaction_report(1)
+
+        self.assertEqual(report["total_income"], 2000)
+        self.assertEqual(report["total_expense"], -455)
+        self.assertEqual(report["balance"], 2455)
+        self.assertEqual(report["transaction_count"], 6)
+        self.assertEqual(report["top_expense_categories"], [("Кава", -15), ("Транспорт", -40), ("Їжа", -100)])
+        self.assertEqual(sorted(analytics_service.get_period_rollups(2)), [("витрата", "Їжа", -999, 1)])
+
+    def test_backfill_respects_report_window(self):
+        self.insert_raw(1, -70, "Їжа", "витрата", "2001-05-01 12:00:00")
+        self.insert_raw(1, 500, "Зарплата", "дохід", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+
+        conn = connection_pool.connect(self.db_path)
+        try:
+            conn.execute("DELETE FROM daily_rollups")
+            migrations.create_daily_rollups(conn.cursor())
+            conn.commit()
+        finally:
+            conn.close()
+
+        report = analytics_service.get_transaction_report(1, days=30)
+        self.assertEqual((report["total_income"], report["total_expense"], report["transaction_count"]), (500, 0, 1))
+
+        report = analytics_service.get_transaction_report(1, days=365 * 100)
+        self.assertEqual((report["total_income"], report["total_expense"], report["transaction_count"]), (500, -70, 2))
+
+
+@test_category(TestCategory.UNIT)
+class TestBudgetPeriods(TempDatabaseMixin, unittest.TestCase):
+    def periods(self, period):
+        conn = connection_pool.connect(self.db_path)
+        try:
+            return conn.execute("""
+                                SELECT user_id, category, limit_amount, spent
+                                FROM budget_periods
+                                WHERE period = ?
+                                ORDER BY user_id, category
+                                """, (period,)).fetchall()
+        finally:
+            conn.close()
+
+    def test_spent_follows_expenses_of_the_month(self):
+        database_service.add_transaction(1, -200, "Їжа")
+        database_service.set_budget(1, "Їжа", 1000)
+
+        # Витрати до встановлення ліміту теж враховуються в поточному місяці
+        self.assertEqual(database_service.get_remaining_budget(1, "Їжа"), 800)
+
+        database_service.add_transaction_with_budget(1, -150, "Їжа")
+        database_service.add_transaction_with_budget(1, 3000, "Їжа", "дохід")
+        database_service.add_transaction_with_budget(1, -70, "Кава")
+        self.assertEqual(database_service.get_budget_periods(1), [("Їжа", 1000, 350, 650)])
+
+        conn = connection_pool.connect(self.db_path)
+        try:
+            ids = dict(conn.execute("SELECT amount, id FROM transactions WHERE user_id = 1").fetchall())
+        finally:
+            conn.close()
+        database_service.delete_transaction_with_budget(ids[-150])
+        database_service.delete_transaction(ids[3000])
+        self.assertEqual(database_service.get_remaining_budget(1, "Їжа"), 800)
+        self.assertIsNone(database_service.get_remaining_budget(1, "Кава"))
+
+        database_service.add_transaction(1, -900, "Їжа")
+        self.assertEqual(database_service.get_budget_periods(1), [("Їжа", 1000, 1100, -100)])
+
+    def test_changing_limit_keeps_spent(self):
+        database_service.set_budget(1, "Скарбничка", 500)
+        database_service.add_transaction(1, 1000, "Зарплата")
+        database_service.add_piggy_bank_goal(1, "Відпустка", 300)
+        goal_id = database_service.get_piggy_bank_goals(1)[0][0]
+        database_service.add_funds_to_goal(1, goal_id, 120)
+
+        database_service.set_budget(1, "Скарбничка", 400)
+
+        self.assertEqual(database_service.get_budget_periods(1), [("Скарбничка", 400, 120, 280)])
+
+    def test_rollover_opens_next_month_for_all_users(self):
+        database_service.set_budget(1, "Їжа", 1000)
+        database_service.set_budget(1, "Кава", 200)
+        database_service.set_budget(2, "Їжа", 3000)
+        database_service.add_transaction(1, -100, "Їжа")
+
+        self.assertEqual(database_service.open_budget_periods("2099-12"), 3)
+        self.assertEqual(database_service.open_budget_periods("2099-12"), 0)
+
+        self.assertEqual(self.periods("2099-12"), [(1, "Їжа", 1000, 0), (1, "Кава", 200, 0), (2, "Їжа", 3000, 0)])
+        self.assertEqual(database_service._period_bounds("2099-12"), ("2099-12-01", "2100-01-01"))
+
+    def test_missing_period_is_opened_by_first_expense(self):
+        database_service.set_budget(1, "Їжа", 1000)
+        database_service.add_transaction(1, -100, "Їжа")
+
+        conn = connection_pool.connect(self.db_path)
+        try:
+            conn.execute("DELETE FROM budget_periods")
+            conn.commit()
+        finally:
+            conn.close()
+
+        database_service.add_transaction(1, -40, "Їжа")
+        self.assertEqual(database_service.get_remaining_budget(1, "Їжа"), 860)
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestAsyncDatabaseFacade(TempDatabaseMixin, unittest.TestCase):
+    def tearDown(self):
+        async_database_service.shutdown()
+        super().tearDown()
+
+    def test_mirrors_public_database_functions(self):
+        for name in ["get_budgets", "get_active_debts", "add_reminder", "add_transaction_with_budget"]:
+            self.assertTrue(asyncio.iscoroutinefunction(getattr(async_database_service, name)))
+
+    def test_calls_run_outside_event_loop_thread(self):
+        async def scenario():
+            loop_thread = threading.current_thread().name
+            db_thread = await async_database_service.run_blocking(lambda: threading.current_thread().name)
+            await async_database_service.set_budget(3, "Їжа", 500)
+            await async_database_service.add_transaction_with_budget(3, -120, "Їжа")
+            return loop_thread, db_thread, await async_database_service.get_budgets(3)
+
+        loop_thread, db_thread, budgets = asyncio.run(scenario())
+
+        self.assertNotEqual(loop_thread, db_thread)
+        self.assertTrue(db_thread.startswith("db"))
+        self.assertEqual(budgets, [("Їжа", 380)])
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestWalStorageMode(TempDatabaseMixin, unittest.TestCase):
+    def setUp(self):
+        connection_pool.configure(pragmas=connection_pool.WAL_PRAGMAS)
+        db_writer.start()
+        super().setUp()
+
+    def tearDown(self):
+        db_writer.stop()
+        super().tearDown()
+        connection_pool.configure(pragmas=connection_pool.DEFAULT_PRAGMAS)
+
+    def test_wal_pragmas_applied(self):
+        conn = connection_pool.connect(self.db_path)
+        try:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+        finally:
+            conn.close()
+
+    def test_writes_go_through_writer(self):
+        self.assertTrue(database_service.add_transaction(7, 250, "Зарплата"))
+        self.assertEqual(len(database_service.get_transaction_history(7)), 1)
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestQueryPlans(TempDatabaseMixin, unittest.TestCase):
+    """Жоден запит по даних користувача не повинен сканувати всю таблицю."""
+
+    def setUp(self):
+        super().setUp()
+        self.analytics_patcher = patch.object(analytics_service, "DATABASE_FILE", self.db_path)
+        self.analytics_patcher.start()
+        database_service.add_transaction(1, -100, "Їжа")
+        database_service.add_transaction(1, 500, "Зарплата")
+        database_service.save_debt(1, "Олег", 200)
+        self.reminder_id = database_service.add_reminder(1, "Оплатити", "2000-01-01 10:00:00")
+        database_service.add_piggy_bank_goal(1, "Відпустка", 1000)
+        database_service.add_goal(1, 300, "Ноутбук")
+
+        connection_pool.close_all()
+        self.statements = []
+        original_open = connection_pool.ConnectionPool._open
+
+        def traced_open(pool):
+            conn = original_open(pool)
+            conn.set_trace_callback(self.statements.append)
+            return conn
+
+        self.open_patcher = patch.object(connection_pool.ConnectionPool, "_open", traced_open)
+        self.open_patcher.start()
+
+    def tearDown(self):
+        self.open_patcher.stop()
+        self.analytics_patcher.stop()
+        super().tearDown()
+
+    def run_hot_queries(self):
+        database_service.get_transaction_history(1)
+        database_service.get_last_transaction(1)
+        database_service.filter_transactions_by_category_or_type(1, "їжа")
+        database_service.update_budget_for_transaction(1, -100, "Їжа")
+        database_service.set_budget(1, "Їжа", 1000)
+        database_service.get_budgets(1)
+        database_service.get_budget_periods(1)
+        database_service.get_remaining_budget(1, "Їжа")
+        database_service.get_goals(1)
+        database_service.get_active_debts(1)
+        database_service.get_debt_history(1)
+        database_service.close_debt(1, "Олег")
+        database_service.get_piggy_bank_goals(1)
+        database_service.get_reminders(1)
+        database_service.get_reminders(1, include_completed=True)
+        database_service.get_reminder(1, self.reminder_id)
+        database_service.get_pending_reminders()
+        database_service.get_pending_reminders([self.reminder_id])
+        analytics_service.get_expense_stats(1)
+        analytics_service.get_transaction_report(1)
+        database_service.mark_reminders_completed([self.reminder_id])
+
+    def test_hot_queries_do_not_scan(self):
+        self.run_hot_queries()
+
+        conn = connection_pool.connect(self.db_path)
+        try:
+            checked = 0
+            for statement in self.statements:
+                sql = statement.strip()
+                if not sql.upper().startswith(("SELECT", "UPDATE", "DELETE")) or "sqlite_master" in sql:
+                    continue
+                plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+                scans = [row[3] for row in plan if row[3].startswith("SCAN")]
+                self.assertEqual(scans, [], f"Full scan in query: {sql}")
+                checked += 1
+            self.assertGreater(checked, 15)
+        finally:
+            conn.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+import unittest
+import asyncio
+import sys
+import os
+import threading
+import time
+from unittest.mock import patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import async_database_service
+from services import export_queue
+from services.export_queue import ExportQueue
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+
+
+@test_category(TestCategory.UNIT)
+class TestExportQueue(unittest.TestCase):
+    def tearDown(self):
+        async_database_service.shutdown()
+
+    def test_duplicate_requests_are_merged(self):
+        release = threading.Event()
+        calls = []
+
+        def export(user_id, export_format, progress=None):
+            calls.append((user_id, export_format))
+            release.wait(5)
+            return f"{user_id}.{export_format}"
+
+        async def scenario():
+            queue = ExportQueue(workers=2)
+            await queue.start(export)
+            results = []
+
+            async def on_done(job, result):
+                results.append(result)
+
+            first, created = queue.submit(1, "xlsx", on_done=on_done)
+            duplicate, duplicate_created = queue.submit(1, "xlsx", on_done=on_done)
+            _, other_created = queue.submit(1, "csv", on_done=on_done)
+            self.assertTrue(created)
+            self.assertFalse(duplicate_created)
+            self.assertIs(duplicate, first)
+            self.assertTrue(other_created)
+
+            release.set()
+            while len(results) < 2:
+                await asyncio.sleep(0.01)
+            metrics = queue.metrics()
+            await queue.stop()
+            return results, metrics
+
+        results, metrics = asyncio.run(scenario())
+
+        self.assertEqual(sorted(results), ["1.csv", "1.xlsx"])
+        self.assertEqual(sorted(calls), [(1, "csv"), (1, "xlsx")])
+        self.assertEqual(metrics["submitted"], 2)
+        self.assertEqual(metrics["merged"], 1)
+        self.assertEqual(metrics["completed"], 2)
+        self.assertEqual(metrics["depth"], 0)
+
+    def test_full_queue_rejects_requests(self):
+        release = threading.Event()
+
+        def export(user_id, export_format, progress=None):
+            release.wait(5)
+
+        async def scenario():
+            queue = ExportQueue(workers=1, max_size=1)
+            await queue.start(export)
+            queue.submit(1, "xlsx")
+            # Воркер забирає першу задачу, друга займає єдине місце в черзі
+            await asyncio.sleep(0.05)
+            queue.submit(2, "xlsx")
+            with self.assertRaises(asyncio.QueueFull):
+                queue.submit(3, "xlsx")
+            metrics = queue.metrics()
+            release.set()
+            await queue.stop()
+            return metrics
+
+        metrics = asyncio.run(scenario())
+
+        self.assertEqual(metrics["depth"], 1)
+        self.assertEqual(metrics["active"], 1)
+        self.assertEqual(metrics["rejected"], 1)
+
+    def test_progress_and_failure_reported(self):
+        def export(user_id, export_format, progress=None):
+            progress(500, 1000)
+            time.sleep(0.2)
+            raise ValueError("disk full")
+
+        async def scenario():
+            queue = ExportQueue(workers=1)
+            await queue.start(export)
+            progress, done = [], asyncio.Event()
+
+            async def on_progress(job):
+                progress.append(job.progress)
+
+            async def on_done(job, result):
+                self.assertIsNone(result)
+                self.assertIsInstance(job.error, ValueError)
+                done.set()
+
+            queue.submit(1, "csv", on_progress=on_progress, on_done=on_done)
+            await asyncio.wait_for(done.wait(), 5)
+            metrics = queue.metrics()
+            await queue.stop()
+            return progress, metrics
+
+        with patch.object(export_queue, "PROGRESS_INTERVAL", 0.05):
+            progress, metrics = asyncio.run(scenario())
+
+        self.assertEqual(progress, [(500, 1000)])
+        self.assertEqual(metrics["failed"], 1)
+        self.assertGreater(metrics["latency_max"], 0.1)
+
+    def test_submit_requires_running_queue(self):
+        with self.assertRaises(RuntimeError):
+            ExportQueue().submit(1, "xlsx")
+
+    def test_exports_do_not_occupy_database_threads(self):
+        started, release = threading.Event(), threading.Event()
+
+        def export(user_id, export_format, progress=None):
+            started.set()
+            release.wait(5)
+            return threading.current_thread().name
+
+        async def scenario():
+            queue = ExportQueue(workers=1)
+            await queue.start(export)
+            results = []
+
+            async def on_done(job, result):
+                results.append(result)
+
+            queue.submit(1, "xlsx", on_done=on_done)
+            await asyncio.to_thread(started.wait, 5)
+            # Єдиний потік бази вільний, поки експорт ще виконується
+            answer = await asyncio.wait_for(async_database_service.run_blocking(lambda: "db"), 1)
+            release.set()
+            while not results:
+                await asyncio.sleep(0.01)
+            await queue.stop()
+            return answer, results[0]
+
+        async_database_service.shutdown()
+        async_database_service.configure(max_workers=1)
+        try:
+            answer, thread_name = asyncio.run(scenario())
+        finally:
+            release.set()
+            async_database_service.configure(max_workers=async_database_service.DEFAULT_MAX_WORKERS)
+
+        self.assertEqual(answer, "db")
+        self.assertTrue(thread_name.startswith("export"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -21,6 +21,7 @@ from handlers.financial_instruments import (
     WAITING_FOR_FROM_CURRENCY,
     WAITING_FOR_TO_CURRENCY
 )
+from services import currency_rates
 
 # Import the test_category decorator
 try:
@@ -292,60 +293,44 @@ class TestFinancialInstrumentsHandlers(unittest.TestCase):
         from telegram.ext import ConversationHandler
         self.assertEqual(result, ConversationHandler.END)
 
-    @patch('handlers.financial_instruments.requests.get')
-    async def test_get_exchange_rate_success(self, mock_get):
+    @patch('handlers.financial_instruments.currency_rates.get_rates')
+    async def test_get_exchange_rate_success(self, mock_get_rates):
         # Configure the mock
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "rates": {
-                "EUR": 0.85,
-                "UAH": 36.5
-            }
-        }
-        mock_response.raise_for_status = MagicMock()
-        mock_get.return_value = mock_response
+        mock_get_rates.return_value = {"USD": 1.0, "EUR": 0.85, "UAH": 36.5}
         
         # Call the function
         rate = await get_exchange_rate("USD", "EUR")
         
-        # Check that requests.get was called with the correct URL
-        mock_get.assert_called_once_with("https://api.exchangerate-api.com/v4/latest/USD", timeout=5)
+        # Check that the rate table was requested for the base currency
+        mock_get_rates.assert_called_once_with("USD")
         
         # Check that the correct rate was returned
         self.assertEqual(rate, 0.85)
 
-    @patch('handlers.financial_instruments.requests.get')
-    async def test_get_exchange_rate_currency_not_found(self, mock_get):
+    @patch('handlers.financial_instruments.currency_rates.get_rates')
+    async def test_get_exchange_rate_currency_not_found(self, mock_get_rates):
         # Configure the mock
-        mock_response = MagicMock()
-        mock_response.json.return_value = {
-            "rates": {
-                "EUR": 0.85,
-                "UAH": 36.5
-            }
-        }
-        mock_response.raise_for_status = MagicMock()
-        mock_get.return_value = mock_response
+        mock_get_rates.return_value = {"USD": 1.0, "EUR": 0.85, "UAH": 36.5}
         
         # Call the function
         rate = await get_exchange_rate("USD", "XYZ")
         
-        # Check that requests.get was called with the correct URL
-        mock_get.assert_called_once_with("https://api.exchangerate-api.com/v4/latest/USD", timeout=5)
+        # Check that the rate table was requested for the base currency
+        mock_get_rates.assert_called_once_with("USD")
         
         # Check that None was returned
         self.assertIsNone(rate)
 
-    @patch('handlers.financial_instruments.requests.get')
-    async def test_get_exchange_rate_request_exception(self, mock_get):
+    @patch('handlers.financial_instruments.currency_rates.get_rates')
+    async def test_get_exchange_rate_request_exception(self, mock_get_rates):
         # Configure the mock
-        mock_get.side_effect = Exception("Test exception")
+        mock_get_rates.side_effect = currency_rates.RateFetchError("Test exception")
         
         # Call the function
         rate = await get_exchange_rate("USD", "EUR")
         
-        # Check that requests.get was called with the correct URL
-        mock_get.assert_called_once_with("https://api.exchangerate-api.com/v4/latest/USD", timeout=5)
+        # Check that the rate table was requested for the base currency
+        mock_get_rates.assert_called_once_with("USD")
         
         # Check that None was returned
         self.assertIsNone(rate)
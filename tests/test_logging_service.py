@@ -0,0 +1,122 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import async_database_service
+from services import connection_pool
+from services import database_service
+from services.logging_service import CommandLogBuffer
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        INTEGRATION = "Integration Tests"
+
+
+def row(n):
+    return (n, "user", "User Name", f"/cmd{n}", "2024-01-01 00:00:00")
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestCommandLogBuffer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "logs.db")
+        self.patcher = patch.object(database_service, "DATABASE_FILE", self.db_path)
+        self.patcher.start()
+        database_service.init_database()
+
+    def tearDown(self):
+        self.patcher.stop()
+        async_database_service.shutdown()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def logged(self):
+        conn = connection_pool.connect(self.db_path)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM command_logs").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_full_batch_is_written_at_once(self):
+        async def scenario():
+            buffer = CommandLogBuffer(batch_size=3, flush_interval=60)
+            await buffer.start()
+            for n in range(2):
+                buffer.add(row(n))
+            await asyncio.sleep(0.05)
+            before = await asyncio.to_thread(self.logged)
+            buffer.add(row(2))
+            while buffer.flushes == 0:
+                await asyncio.sleep(0.01)
+            after = await asyncio.to_thread(self.logged)
+            await buffer.stop()
+            return before, after
+
+        self.assertEqual(asyncio.run(scenario()), (0, 3))
+
+    def test_rows_are_written_after_interval_and_on_stop(self):
+        async def scenario():
+            buffer = CommandLogBuffer(batch_size=100, flush_interval=0.05)
+            await buffer.start()
+            buffer.add(row(1))
+            while buffer.flushes == 0:
+                await asyncio.sleep(0.01)
+            buffer.flush_interval = 60
+            buffer.add(row(2))
+            await buffer.stop()
+            return buffer.stats()
+
+        stats = asyncio.run(scenario())
+
+        self.assertEqual(self.logged(), 2)
+        self.assertEqual(stats, {"buffered": 0, "flushes": 2, "written": 2, "dropped": 0})
+
+    def test_failed_write_keeps_rows_for_next_flush(self):
+        async def scenario():
+            buffer = CommandLogBuffer(batch_size=100, flush_interval=60, max_rows=3)
+            await buffer.start()
+            for n in range(2):
+                buffer.add(row(n))
+            with patch.object(database_service, "insert_command_logs", side_effect=OSError("disk I/O error")):
+                await buffer.flush()
+            for n in range(2, 4):
+                buffer.add(row(n))
+            with patch.object(database_service, "insert_command_logs", side_effect=OSError("disk I/O error")):
+                await buffer.flush()
+            kept = buffer.stats()
+            await buffer.stop()
+            return kept
+
+        kept = asyncio.run(scenario())
+
+        self.assertEqual(kept["buffered"], 3)
+        self.assertEqual(kept["dropped"], 1)
+        self.assertEqual(self.logged(), 3)
+
+    def test_unstarted_buffer_writes_immediately(self):
+        CommandLogBuffer().add(row(1))
+
+        self.assertEqual(self.logged(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
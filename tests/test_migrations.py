@@ -0,0 +1,120 @@
+import unittest
+import sqlite3
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import connection_pool
+from services import database_service
+from services.migrations import run_migrations, get_schema_version, LATEST_VERSION, MIGRATIONS
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestSchemaMigrations(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "migrations.db")
+        self.conn = sqlite3.connect(self.db_path)
+
+    def tearDown(self):
+        self.conn.close()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def test_fresh_database_reaches_latest_version(self):
+        applied = run_migrations(self.conn)
+
+        self.assertEqual(applied, [version for version, _, _ in MIGRATIONS])
+        self.assertEqual(get_schema_version(self.conn.cursor()), LATEST_VERSION)
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for table in ["transactions", "budget", "budget_adjustments", "debts", "reminders", "budget_limits",
+                      "budget_periods", "schema_version"]:
+            self.assertIn(table, tables)
+
+    def test_first_migration_creates_only_baseline_tables(self):
+        run_migrations(self.conn, MIGRATIONS[:1])
+
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertEqual(tables - {"schema_version", "sqlite_sequence"},
+                         {"command_logs", "transactions", "budget", "budget_adjustments", "goals", "piggy_bank",
+                          "debts", "reminders"})
+
+    def test_current_schema_skips_all_steps(self):
+        run_migrations(self.conn)
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+
+        self.assertEqual(run_migrations(self.conn), [])
+        self.assertFalse(any(s.lstrip().upper().startswith(("BEGIN", "CREATE", "ALTER", "INSERT"))
+                             for s in statements))
+
+    def test_failed_step_rolls_back_whole_run(self):
+        def broken(cursor):
+            raise sqlite3.OperationalError("broken step")
+
+        migrations = MIGRATIONS + ((LATEST_VERSION + 1, "broken", broken),)
+
+        with self.assertRaises(sqlite3.OperationalError):
+            run_migrations(self.conn, migrations)
+
+        self.assertEqual(get_schema_version(self.conn.cursor()), 0)
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        self.assertNotIn("transactions", tables)
+
+    def test_legacy_database_is_upgraded(self):
+        self.conn.execute("CREATE TABLE debts (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, "
+                          "debtor TEXT, amount REAL, status TEXT DEFAULT 'open', due_date TEXT)")
+        self.conn.execute("CREATE TABLE reminders (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, "
+                          "title TEXT, reminder_datetime TEXT)")
+        self.conn.execute("CREATE TABLE budget (user_id INTEGER, category TEXT, amount REAL, "
+                          "PRIMARY KEY (user_id, category))")
+        self.conn.execute("CREATE TABLE transactions (id INTEGER PRIMARY KEY AUTOINCREMENT, user_id INTEGER, "
+                          "amount REAL, category TEXT, type TEXT, timestamp TEXT)")
+        self.conn.execute("INSERT INTO debts (user_id, debtor, amount) VALUES (1, 'Олег', 100)")
+        self.conn.execute("INSERT INTO transactions (user_id, amount, category) VALUES (1, -30, 'Їжа')")
+        self.conn.execute("INSERT INTO budget VALUES (1, 'Їжа', 500)")
+        self.conn.commit()
+
+        run_migrations(self.conn)
+
+        creation_time = self.conn.execute("SELECT creation_time FROM debts").fetchone()[0]
+        self.assertIsNotNone(creation_time)
+        reminder_columns = [row[1] for row in self.conn.execute("PRAGMA table_info(reminders)")]
+        self.assertIn("is_completed", reminder_columns)
+        self.assertIn("created_at", reminder_columns)
+        adjustment = self.conn.execute(
+            "SELECT amount FROM budget_adjustments WHERE user_id = 1 AND category = 'Їжа'").fetchone()[0]
+        self.assertEqual(adjustment, 530)
+
+    def test_init_database_is_idempotent(self):
+        with patch.object(database_service, "DATABASE_FILE", self.db_path):
+            database_service.init_database()
+            database_service.init_database()
+
+        versions = [row[0] for row in self.conn.execute("SELECT version FROM schema_version ORDER BY version")]
+        self.assertEqual(versions, [version for version, _, _ in MIGRATIONS])
+
+
+if __name__ == '__main__':
+    unittest.main()
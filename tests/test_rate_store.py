@@ -0,0 +1,120 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import async_database_service
+from services import connection_pool
+from services import database_service
+from services.rate_store import RateStore, cross_rate
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+USD_RATES = {"USD": 1.0, "EUR": 0.9, "UAH": 41.0, "PLN": 4.0}
+NOW = datetime(2024, 5, 1, 12, 0)
+
+
+@test_category(TestCategory.UNIT)
+class TestRateStore(unittest.TestCase):
+    def test_any_pair_is_triangulated_through_base(self):
+        store = RateStore()
+        store.update("USD", USD_RATES, NOW)
+
+        self.assertEqual(store.get_rate("USD", "UAH", now=NOW), 41.0)
+        self.assertAlmostEqual(store.get_rate("UAH", "USD", now=NOW), 1 / 41.0)
+        self.assertAlmostEqual(store.get_rate("eur", "pln", now=NOW), 4.0 / 0.9)
+        self.assertEqual(store.get_rate("PLN", "PLN", now=NOW), 1.0)
+        self.assertIsNone(store.get_rate("USD", "XYZ", now=NOW))
+        self.assertIsNone(cross_rate("USD", {"EUR": 0}, "EUR", "USD"))
+
+    def test_stale_rates_are_bounded(self):
+        store = RateStore(max_stale=timedelta(hours=48))
+        store.update("USD", USD_RATES, NOW - timedelta(hours=30))
+
+        self.assertEqual(store.get_quote("USD", "EUR", now=NOW), (0.9, NOW - timedelta(hours=30)))
+        self.assertIsNone(store.get_rate("USD", "EUR", now=NOW + timedelta(hours=20)))
+
+    def test_freshest_table_wins(self):
+        store = RateStore()
+        store.update("USD", USD_RATES, NOW - timedelta(hours=5))
+        store.update("EUR", {"EUR": 1.0, "USD": 1.2, "UAH": 50.0}, NOW)
+
+        self.assertEqual(store.get_rate("EUR", "UAH", now=NOW), 50.0)
+        self.assertAlmostEqual(store.get_rate("USD", "UAH", now=NOW), 50.0 / 1.2)
+        # PLN є лише в старішій таблиці USD
+        self.assertEqual(store.get_rate("USD", "PLN", now=NOW), 4.0)
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestRateStoreRefresh(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "rates.db")
+        self.db_patcher = patch.object(database_service, "DATABASE_FILE", self.db_path)
+        self.db_patcher.start()
+        database_service.init_database()
+
+    def tearDown(self):
+        self.db_patcher.stop()
+        async_database_service.shutdown()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def test_refresh_saves_snapshot_that_survives_restart(self):
+        fetched = []
+
+        async def fetch(base):
+            fetched.append(base)
+            return USD_RATES
+
+        async def scenario():
+            store = RateStore()
+            await store.start(fetch)
+            for _ in range(100):
+                if store.refreshes:
+                    break
+                await asyncio.sleep(0.01)
+            await store.stop()
+
+            async def unreachable(base):
+                raise ConnectionError("provider is down")
+
+            # Після перезапуску курси беруться зі збереженого знімка без звернення до провайдера
+            restarted = RateStore()
+            await restarted.start(unreachable)
+            self.assertFalse(await restarted.refresh())
+            await restarted.stop()
+            return restarted
+
+        restarted = asyncio.run(scenario())
+
+        self.assertEqual(fetched, ["USD"])
+        self.assertEqual(restarted.get_rate("USD", "UAH"), 41.0)
+        self.assertEqual(restarted.failures, 1)
+        self.assertEqual(database_service.get_rate_snapshots()["USD"][1], USD_RATES)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,158 @@
+import unittest
+import asyncio
+import sys
+import os
+import time
+from datetime import timedelta
+from unittest.mock import AsyncMock, patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from telegram.error import RetryAfter
+
+from services import reminder_delivery
+from services.reminder_delivery import ReminderDelivery, TokenBucket
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+def make_reminders(count, user_id=None):
+    return [(i, user_id if user_id is not None else i, f"Нагадування {i}", "2000-01-01 10:00:00")
+            for i in range(1, count + 1)]
+
+
+@test_category(TestCategory.UNIT)
+class TestTokenBucket(unittest.TestCase):
+    def test_limits_rate(self):
+        async def scenario():
+            bucket = TokenBucket(rate=20, capacity=1)
+            started = time.monotonic()
+            for _ in range(5):
+                await bucket.acquire()
+            return time.monotonic() - started
+
+        self.assertGreaterEqual(asyncio.run(scenario()), 0.19)
+
+    def test_pause_delays_next_token(self):
+        async def scenario():
+            bucket = TokenBucket(rate=100)
+            bucket.pause(0.2)
+            started = time.monotonic()
+            await bucket.acquire()
+            return time.monotonic() - started
+
+        self.assertGreaterEqual(asyncio.run(scenario()), 0.19)
+
+
+@test_category(TestCategory.UNIT)
+class TestReminderDelivery(unittest.TestCase):
+    def setUp(self):
+        self.mark_patcher = patch.object(reminder_delivery, "mark_reminders_completed", new_callable=AsyncMock)
+        self.mock_mark = self.mark_patcher.start()
+
+    def tearDown(self):
+        self.mark_patcher.stop()
+
+    def deliver(self, delivery, reminders, send):
+        return asyncio.run(delivery.deliver(reminders, send))
+
+    def test_completions_marked_in_batches(self):
+        send = AsyncMock()
+        delivery = ReminderDelivery(global_rate=1000, batch_size=2)
+
+        report = self.deliver(delivery, make_reminders(5), send)
+
+        self.assertEqual(report["sent"], 5)
+        self.assertEqual(send.await_count, 5)
+        self.assertEqual(self.mock_mark.await_count, 3)
+        marked = sorted(i for call in self.mock_mark.await_args_list for i in call.args[0])
+        self.assertEqual(marked, [1, 2, 3, 4, 5])
+        self.assertGreater(report["latency_max"], 0)
+
+    def test_concurrency_is_bounded(self):
+        running = {"now": 0, "max": 0}
+
+        async def send(*reminder):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            await asyncio.sleep(0.01)
+            running["now"] -= 1
+
+        self.deliver(ReminderDelivery(global_rate=1000, max_concurrent=3), make_reminders(10), send)
+
+        self.assertEqual(running["max"], 3)
+
+    def test_same_chat_respects_per_chat_rate(self):
+        sent_at = []
+
+        async def send(*reminder):
+            sent_at.append(time.monotonic())
+
+        self.deliver(ReminderDelivery(global_rate=1000, chat_rate=10), make_reminders(3, user_id=42), send)
+
+        self.assertGreaterEqual(sent_at[-1] - sent_at[0], 0.19)
+
+    def test_retry_after_pauses_and_resends(self):
+        send = AsyncMock(side_effect=[RetryAfter(timedelta(milliseconds=200)), None])
+
+        started = time.monotonic()
+        report = self.deliver(ReminderDelivery(global_rate=1000), make_reminders(1), send)
+
+        self.assertGreaterEqual(time.monotonic() - started, 0.19)
+        self.assertEqual(report["retries"], 1)
+        self.assertEqual(report["sent"], 1)
+        self.mock_mark.assert_awaited_once_with([1])
+
+    def test_retry_waits_for_chat_token(self):
+        sent_at = []
+
+        async def send(*reminder):
+            sent_at.append(time.monotonic())
+            if len(sent_at) == 1:
+                raise RetryAfter(0)
+
+        report = self.deliver(ReminderDelivery(global_rate=1000, chat_rate=5), make_reminders(1, user_id=42), send)
+
+        self.assertEqual(report["sent"], 1)
+        self.assertGreaterEqual(sent_at[1] - sent_at[0], 0.19)
+
+    def test_exhausted_retry_after_is_reported(self):
+        send = AsyncMock(side_effect=RetryAfter(timedelta(seconds=30)))
+        reminders = make_reminders(1)
+        delivery = ReminderDelivery(global_rate=1000, max_retries=0)
+
+        report = self.deliver(delivery, reminders, send)
+
+        self.assertEqual(report["failed"], reminders)
+        self.assertEqual(report["retry_after"], {1: 30.0})
+        # Чат лишається на паузі, тож наступна доставка теж на неї зважатиме
+        self.assertFalse(delivery._chat_bucket(reminders[0][1]).is_idle())
+
+    def test_failed_reminders_reported_and_not_marked(self):
+        send = AsyncMock(side_effect=[None, Exception("blocked by user")])
+        reminders = make_reminders(2, user_id=7)
+
+        report = self.deliver(ReminderDelivery(global_rate=1000, chat_rate=1000), reminders, send)
+
+        self.assertEqual(report["failed"], [reminders[1]])
+        self.mock_mark.assert_awaited_once_with([1])
+
+
+if __name__ == '__main__':
+    unittest.main()
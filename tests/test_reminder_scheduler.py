@@ -0,0 +1,216 @@
+import unittest
+import asyncio
+import sys
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock, patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import async_database_service
+from services import connection_pool
+from services import database_service
+from services import reminder_scheduler
+from services.reminder_scheduler import ReminderScheduler
+from handlers.reminders import send_due_reminders
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+PAST = "2000-01-01 10:00:00"
+FUTURE = "2999-01-01 10:00:00"
+
+
+@test_category(TestCategory.UNIT)
+class TestReminderScheduler(unittest.TestCase):
+    def run_scheduler(self, scenario):
+        scheduler = ReminderScheduler()
+        delivered = []
+
+        async def deliver(reminders):
+            delivered.extend(reminders)
+
+        async def main():
+            await scheduler.start(deliver)
+            try:
+                await scenario(scheduler)
+            finally:
+                await scheduler.stop()
+
+        asyncio.run(main())
+        return delivered
+
+    def test_due_reminders_delivered_in_time_order(self):
+        async def scenario(scheduler):
+            scheduler.schedule(2, 1, "Друге", "2000-01-02 10:00:00")
+            scheduler.schedule(1, 1, "Перше", PAST)
+            scheduler.schedule(3, 1, "Пізніше", FUTURE)
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(scheduler), 1)
+
+        delivered = self.run_scheduler(scenario)
+
+        self.assertEqual([reminder[0] for reminder in delivered], [1, 2])
+
+    def test_fires_at_due_time(self):
+        fired_at = {}
+
+        async def scenario(scheduler):
+            due = datetime.now().replace(microsecond=0) + timedelta(seconds=1)
+            scheduler.schedule(1, 1, "Скоро", due.strftime("%Y-%m-%d %H:%M:%S"))
+            for _ in range(40):
+                if len(scheduler) == 0:
+                    fired_at["time"] = datetime.now()
+                    fired_at["due"] = due
+                    break
+                await asyncio.sleep(0.05)
+
+        delivered = self.run_scheduler(scenario)
+
+        self.assertEqual(len(delivered), 1)
+        self.assertGreaterEqual(fired_at["time"], fired_at["due"])
+        self.assertLess((fired_at["time"] - fired_at["due"]).total_seconds(), 0.5)
+
+    def test_schedule_from_other_thread_wakes_sleeper(self):
+        async def scenario(scheduler):
+            scheduler.schedule(1, 1, "Далеко", FUTURE)
+            await asyncio.sleep(0.05)
+            thread = threading.Thread(target=scheduler.schedule, args=(2, 1, "Зараз", PAST))
+            thread.start()
+            thread.join()
+            await asyncio.sleep(0.05)
+
+        delivered = self.run_scheduler(scenario)
+
+        self.assertEqual([reminder[0] for reminder in delivered], [2])
+
+    def test_cancel_and_reschedule(self):
+        async def scenario(scheduler):
+            scheduler.schedule(1, 1, "Скасоване", FUTURE)
+            scheduler.schedule(2, 1, "Перенесене", FUTURE)
+            scheduler.cancel(1)
+            scheduler.schedule(2, 1, "Перенесене", "2998-01-01 10:00:00")
+
+            due, delay = scheduler.pop_due(now=datetime(2998, 6, 1))
+            self.assertEqual(due, [(2, 1, "Перенесене", "2998-01-01 10:00:00")])
+            self.assertIsNone(delay)
+
+        self.assertEqual(self.run_scheduler(scenario), [])
+
+    def test_failed_delivery_is_rescheduled(self):
+        scheduler = ReminderScheduler()
+
+        async def deliver(reminders):
+            raise ConnectionError("network is down")
+
+        async def main():
+            await scheduler.start(deliver)
+            try:
+                scheduler.schedule(1, 1, "Оплатити", PAST)
+                await asyncio.sleep(0.05)
+                return len(scheduler), scheduler.pop_due(now=datetime.now() + timedelta(seconds=61))[0]
+            finally:
+                await scheduler.stop()
+
+        scheduled, due = asyncio.run(main())
+
+        self.assertEqual(scheduled, 1)
+        self.assertEqual(due, [(1, 1, "Оплатити", PAST)])
+
+    def test_ignored_when_not_running(self):
+        scheduler = ReminderScheduler()
+        scheduler.schedule(1, 1, "Нагадування", PAST)
+        self.assertEqual(len(scheduler), 0)
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestReminderSchedulerWithDatabase(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "reminders.db")
+        self.db_patcher = patch.object(database_service, "DATABASE_FILE", self.db_path)
+        self.db_patcher.start()
+        database_service.init_database()
+
+    def tearDown(self):
+        self.db_patcher.stop()
+        async_database_service.shutdown()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def test_database_writes_update_scheduler(self):
+        delivered = []
+
+        async def deliver(reminders):
+            delivered.extend(reminders)
+
+        async def scenario():
+            await reminder_scheduler.start(deliver)
+            try:
+                first = await async_database_service.add_reminder(1, "Оплатити", FUTURE)
+                second = await async_database_service.add_reminder(1, "Подзвонити", FUTURE)
+                self.assertEqual(len(reminder_scheduler._scheduler), 2)
+
+                await async_database_service.delete_reminder(1, second)
+                self.assertEqual(len(reminder_scheduler._scheduler), 1)
+
+                await async_database_service.update_reminder(1, first, reminder_datetime=PAST)
+                await asyncio.sleep(0.05)
+                return first
+            finally:
+                await reminder_scheduler.stop()
+
+        first = asyncio.run(scenario())
+
+        self.assertEqual(delivered, [(first, 1, "Оплатити", PAST)])
+
+    def test_send_due_reminders_skips_completed(self):
+        first = database_service.add_reminder(1, "Оплатити", PAST)
+        second = database_service.add_reminder(1, "Подзвонити", PAST)
+        database_service.mark_reminder_completed(1, second)
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+
+        asyncio.run(send_due_reminders(bot, [(first, 1, "Оплатити", PAST), (second, 1, "Подзвонити", PAST)]))
+
+        bot.send_message.assert_called_once()
+        self.assertEqual(database_service.get_pending_reminders(), [])
+
+
+    def test_send_due_reminders_retries_when_check_fails(self):
+        reminder = (database_service.add_reminder(1, "Оплатити", PAST), 1, "Оплатити", PAST)
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+
+        conn = connection_pool.connect(self.db_path)
+        conn.execute("DROP TABLE reminders")
+        conn.commit()
+        conn.close()
+
+        with patch.object(reminder_scheduler, "retry_later") as retry_later:
+            asyncio.run(send_due_reminders(bot, [reminder]))
+
+        bot.send_message.assert_not_called()
+        retry_later.assert_called_once_with(*reminder)
+
+
+if __name__ == '__main__':
+    unittest.main()
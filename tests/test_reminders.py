@@ -27,8 +27,7 @@ from handlers.reminders import (
     handle_edit_reminder,
     handle_complete_reminder,
     handle_delete_reminder,
-    handle_delete_reminder_confirm,
-    check_and_send_reminders
+    handle_delete_reminder_confirm
 )
 
 # Import the test_category decorator
@@ -0,0 +1,161 @@
+import unittest
+import sys
+import os
+import tempfile
+from datetime import timedelta
+from unittest.mock import patch, MagicMock
+
+import gspread
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import connection_pool
+from services import database_service
+from services import sheets_client
+from services import sync_service
+from services.sheets_client import GoogleSheetsBackend, SheetsBackend
+from tests.fake_sheets import FakeSpreadsheet
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+class FakeCredentials:
+    def __init__(self):
+        self.token = None
+        self.expiry = None
+
+
+class FakeClient:
+    def __init__(self):
+        self.opened = []
+
+    def open_by_key(self, spreadsheet_id):
+        self.opened.append(spreadsheet_id)
+        return FakeSpreadsheet()
+
+
+class LocalSheetsBackend(SheetsBackend):
+    def __init__(self, spreadsheet):
+        self.spreadsheet = spreadsheet
+        self.invalidated = 0
+
+    def open(self, spreadsheet_id):
+        return self.spreadsheet
+
+    def invalidate(self):
+        self.invalidated += 1
+
+
+@test_category(TestCategory.UNIT)
+class TestGoogleSheetsBackend(unittest.TestCase):
+    def setUp(self):
+        self.loaded = []
+        self.clients = []
+
+        def load(credentials_file):
+            self.loaded.append(credentials_file)
+            return FakeCredentials()
+
+        def refresh(credentials):
+            credentials.token = "token"
+            credentials.expiry = sheets_client._utcnow() + timedelta(hours=1)
+
+        def authorize(credentials):
+            self.clients.append(FakeClient())
+            return self.clients[-1]
+
+        self.backend = GoogleSheetsBackend("creds.json", load_credentials=load, refresh=refresh,
+                                           authorize=authorize)
+
+    def test_client_and_spreadsheet_are_shared(self):
+        first = self.backend.open("sheet-1")
+        for _ in range(10):
+            self.assertIs(self.backend.open("sheet-1"), first)
+        self.backend.open("sheet-2")
+
+        self.assertEqual(self.loaded, ["creds.json"])
+        self.assertEqual(len(self.clients), 1)
+        self.assertEqual(self.clients[0].opened, ["sheet-1", "sheet-2"])
+        self.assertEqual(self.backend.stats(), {"authorizations": 1, "refreshes": 1, "spreadsheets": 2})
+
+    def test_token_is_refreshed_before_expiry(self):
+        self.backend.open("sheet-1")
+        self.backend._credentials.expiry = sheets_client._utcnow() + timedelta(minutes=2)
+
+        self.backend.open("sheet-1")
+
+        self.assertEqual(self.backend.refreshes, 2)
+        self.assertEqual(self.backend.authorizations, 1)
+
+    def test_invalidate_reloads_credentials(self):
+        self.backend.open("sheet-1")
+        self.backend.invalidate()
+        self.backend.open("sheet-1")
+
+        self.assertEqual(len(self.loaded), 2)
+        self.assertEqual(len(self.clients), 2)
+
+    def test_backend_without_open_cannot_be_created(self):
+        class IncompleteBackend(SheetsBackend):
+            def invalidate(self):
+                pass
+
+        with self.assertRaises(TypeError):
+            IncompleteBackend()
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestSyncUsesSharedClient(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "sheets.db")
+        self.backend = LocalSheetsBackend(FakeSpreadsheet())
+        self.patchers = [patch.object(database_service, "DATABASE_FILE", self.db_path),
+                         patch.object(sync_service, "DATABASE_FILE", self.db_path),
+                         patch.object(sheets_client, "_backend", self.backend)]
+        for patcher in self.patchers:
+            patcher.start()
+        database_service.init_database()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def test_sync_opens_spreadsheet_from_backend(self):
+        database_service.add_transaction(1, -100, "Їжа")
+
+        self.assertTrue(sync_service.sync_with_google_sheets(1)[0])
+        self.assertIn(sync_service.worksheet_title(1), self.backend.spreadsheet.worksheets)
+
+    def test_unauthorized_error_resets_client(self):
+        database_service.add_transaction(1, -100, "Їжа")
+        response = MagicMock()
+        response.json.return_value = {"error": {"code": 401, "message": "Invalid Credentials"}}
+
+        with patch.object(self.backend, "open", side_effect=gspread.exceptions.APIError(response)):
+            success, _ = sync_service.sync_with_google_sheets(1)
+
+        self.assertFalse(success)
+        self.assertEqual(self.backend.invalidated, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
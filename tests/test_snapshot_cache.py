@@ -0,0 +1,151 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import analytics_engine
+from services import analytics_service
+from services import connection_pool
+from services import data_version
+from services import database_service
+from services import snapshot_cache
+from services.snapshot_cache import SnapshotCache
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+class FakeSnapshot:
+    def __init__(self, name, nbytes):
+        self.name = name
+        self.nbytes = nbytes
+
+
+@test_category(TestCategory.UNIT)
+class TestSnapshotCache(unittest.TestCase):
+    def test_reloads_only_after_version_change(self):
+        cache = SnapshotCache()
+        loads = []
+
+        def load(user_id):
+            loads.append(user_id)
+            return FakeSnapshot(f"v{len(loads)}", 10)
+
+        first = cache.get(-101, load)
+        self.assertIs(cache.get(-101, load), first)
+
+        data_version.bump(-101)
+        second = cache.get(-101, load)
+
+        self.assertIsNot(second, first)
+        self.assertEqual(loads, [-101, -101])
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+        self.assertEqual(cache.nbytes, 10)
+
+    def test_lru_eviction_under_memory_budget(self):
+        cache = SnapshotCache(max_bytes=100)
+        snapshots = {1: FakeSnapshot("a", 40), 2: FakeSnapshot("b", 40), 3: FakeSnapshot("c", 40)}
+        load = snapshots.__getitem__
+
+        cache.get(1, load)
+        cache.get(2, load)
+        cache.get(1, load)
+        cache.get(3, load)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.nbytes, 80)
+        self.assertEqual(cache.evictions, 1)
+        self.assertEqual(cache.stats()["hits"], 1)
+        # Користувач 2 використовувався найдавніше, тож витиснений саме він
+        cache.get(2, lambda user_id: FakeSnapshot("b2", 40))
+        self.assertEqual(cache.misses, 4)
+
+    def test_snapshot_larger_than_budget_is_not_cached(self):
+        cache = SnapshotCache(max_bytes=100)
+        cache.get(1, lambda user_id: FakeSnapshot("small", 30))
+        cache.get(2, lambda user_id: FakeSnapshot("huge", 500))
+
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.nbytes, 30)
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestSharedAnalyticsSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "snapshots.db")
+        self.patchers = [patch.object(database_service, "DATABASE_FILE", self.db_path),
+                         patch.object(analytics_service, "DATABASE_FILE", self.db_path),
+                         patch.object(analytics_engine, "DATABASE_FILE", self.db_path)]
+        for patcher in self.patchers:
+            patcher.start()
+        snapshot_cache.clear()
+        database_service.init_database()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        snapshot_cache.clear()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def view_all(self, user_id):
+        return (analytics_service.get_expense_stats(user_id),
+                analytics_service.get_transaction_report(user_id),
+                analytics_engine.get_spending_trends(user_id),
+                analytics_engine.get_spending_insights(user_id))
+
+    def test_repeat_views_do_not_touch_database(self):
+        database_service.add_transaction(1, -120, "Їжа")
+        database_service.add_transaction(1, 3000, "Зарплата")
+        first = self.view_all(1)
+
+        with patch.object(analytics_engine, "connect", side_effect=AssertionError("database read")):
+            self.assertEqual(self.view_all(1), first)
+
+        self.assertEqual(first[0], [("Їжа", -120)])
+        self.assertEqual(first[1]["total_income"], 3000)
+
+    def test_writes_invalidate_snapshot(self):
+        database_service.set_budget(1, "Їжа", 1000)
+        database_service.add_transaction(1, -120, "Їжа")
+        self.assertEqual(analytics_service.get_expense_stats(1), [("Їжа", -120)])
+
+        database_service.add_transaction(1, -30, "Кава")
+        self.assertEqual(analytics_service.get_expense_stats(1), [("Кава", -30), ("Їжа", -120)])
+
+        database_service.add_piggy_bank_goal(1, "Відпустка", 500)
+        goal_id = database_service.get_piggy_bank_goals(1)[0][0]
+        database_service.add_funds_to_goal(1, goal_id, 50)
+        self.assertIn(("Скарбничка", -50), analytics_service.get_expense_stats(1))
+
+        conn = connection_pool.connect(self.db_path)
+        try:
+            # Час у транзакцій однаковий до секунди, тому остання визначається за id
+            last_id = conn.execute("SELECT MAX(id) FROM transactions").fetchone()[0]
+        finally:
+            conn.close()
+        database_service.delete_transaction(last_id)
+        self.assertNotIn(("Скарбничка", -50), analytics_service.get_expense_stats(1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,7 +2,7 @@ import unittest
 import asyncio
 import sys
 import os
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 
 # Add the parent directory to the Python path if not already there
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -86,7 +86,7 @@ class TestSyncHandlers(unittest.TestCase):
         )
 
     @patch('handlers.sync.log_command_usage')
-    @patch('handlers.sync.sync_with_google_sheets')
+    @patch('handlers.sync.sync_queue.submit')
     @patch('handlers.sync.sync_menu_keyboard')
     async def test_sync_callback(self, mock_keyboard, mock_sync, mock_log):
         # Create mock update and context
@@ -108,8 +108,14 @@ class TestSyncHandlers(unittest.TestCase):
         mock_log.return_value = asyncio.Future()
         mock_log.return_value.set_result(None)
         
-        # Configure the sync_with_google_sheets mock
-        mock_sync.return_value = (True, "Sync successful")
+        # Capture the completion callback instead of running the sync
+        callbacks = []
+
+        def submit(user_id, on_done):
+            callbacks.append(on_done)
+            return MagicMock(), True
+
+        mock_sync.side_effect = submit
         
         # Configure the keyboard mock
         mock_keyboard.return_value = "keyboard"
@@ -120,8 +126,9 @@ class TestSyncHandlers(unittest.TestCase):
         # Check that log_command_usage was called
         mock_log.assert_called_once_with(update, context)
         
-        # Check that sync_with_google_sheets was called with the correct user_id
-        mock_sync.assert_called_once_with(123)
+        # Check that the sync was queued for the correct user_id
+        mock_sync.assert_called_once()
+        self.assertEqual(mock_sync.call_args[0][0], 123)
         
         # Check that callback_query.answer and callback_query.edit_message_text were called
         update.callback_query.answer.assert_called_once()
@@ -130,7 +137,9 @@ class TestSyncHandlers(unittest.TestCase):
             reply_markup=None
         )
         
-        # Check that context.bot.send_message was called with the correct parameters
+        # The result is sent only once the queued sync finishes
+        context.bot.send_message.assert_not_called()
+        await callbacks[0](MagicMock(), (True, "Sync successful"))
         context.bot.send_message.assert_called_once_with(
             chat_id=123,
             text="Sync successful",
@@ -138,11 +147,9 @@ class TestSyncHandlers(unittest.TestCase):
         )
 
     @patch('handlers.sync.log_command_usage')
-    @patch('handlers.sync.export_transactions_to_excel')
+    @patch('handlers.sync.queue_export')
     @patch('handlers.sync.sync_menu_keyboard')
-    @patch('handlers.sync.open')
-    @patch('handlers.sync.os.remove')
-    async def test_export_callback_success(self, mock_remove, mock_open, mock_keyboard, mock_export, mock_log):
+    async def test_export_callback_success(self, mock_keyboard, mock_queue_export, mock_log):
         # Create mock update and context
         update = MagicMock()
         context = MagicMock()
@@ -152,55 +159,39 @@ class TestSyncHandlers(unittest.TestCase):
         update.callback_query.from_user.id = 123
         update.callback_query.answer = MagicMock(return_value=asyncio.Future())
         update.callback_query.answer.return_value.set_result(None)
-        update.callback_query.edit_message_text = MagicMock(return_value=asyncio.Future())
-        update.callback_query.edit_message_text.return_value.set_result(None)
-        
-        context.bot.send_document = MagicMock(return_value=asyncio.Future())
-        context.bot.send_document.return_value.set_result(None)
-        context.bot.send_message = MagicMock(return_value=asyncio.Future())
-        context.bot.send_message.return_value.set_result(None)
+        message = MagicMock()
+        update.callback_query.edit_message_text = AsyncMock(return_value=message)
         
         # Configure the log_command_usage mock to return an awaitable
         mock_log.return_value = asyncio.Future()
         mock_log.return_value.set_result(None)
         
-        # Configure the export_transactions_to_excel mock
-        mock_export.return_value = "export.xlsx"
-        
         # Configure the keyboard mock
         mock_keyboard.return_value = "keyboard"
         
-        # Configure the open mock
-        mock_file = MagicMock()
-        mock_open.return_value.__enter__.return_value = mock_file
-        
         # Call the handler
         await handle_export_callback(update, context)
         
         # Check that log_command_usage was called
         mock_log.assert_called_once_with(update, context)
         
-        # Check that export_transactions_to_excel was called with the correct user_id
-        mock_export.assert_called_once_with(123)
-        
         # Check that callback_query.answer was called
         update.callback_query.answer.assert_called_once()
         
-        # Check that context.bot.send_document and context.bot.send_message were called
-        context.bot.send_document.assert_called_once()
-        context.bot.send_message.assert_called_once_with(
-            chat_id=123,
-            text="📁 Експорт даних в Excel завершено.",
-            reply_markup="keyboard"
+        # Check that the menu message became the progress message of a queued Excel export
+        mock_queue_export.assert_called_once_with(
+            context.bot,
+            123,
+            "xlsx",
+            message=message,
+            reply_markup="keyboard",
+            done_text="📁 Експорт даних в Excel завершено."
         )
-        
-        # Check that os.remove was called with the correct file path
-        mock_remove.assert_called_once_with("export.xlsx")
 
     @patch('handlers.sync.log_command_usage')
-    @patch('handlers.sync.export_transactions_to_excel')
+    @patch('handlers.analytics.export_queue')
     @patch('handlers.sync.sync_menu_keyboard')
-    async def test_export_callback_no_data(self, mock_keyboard, mock_export, mock_log):
+    async def test_export_callback_no_data(self, mock_keyboard, mock_queue, mock_log):
         # Create mock update and context
         update = MagicMock()
         context = MagicMock()
@@ -210,31 +201,30 @@ class TestSyncHandlers(unittest.TestCase):
         update.callback_query.from_user.id = 123
         update.callback_query.answer = MagicMock(return_value=asyncio.Future())
         update.callback_query.answer.return_value.set_result(None)
-        update.callback_query.edit_message_text = MagicMock(return_value=asyncio.Future())
-        update.callback_query.edit_message_text.return_value.set_result(None)
+        message = MagicMock()
+        message.edit_text = AsyncMock()
+        update.callback_query.edit_message_text = AsyncMock(return_value=message)
         
         # Configure the log_command_usage mock to return an awaitable
         mock_log.return_value = asyncio.Future()
         mock_log.return_value.set_result(None)
         
-        # Configure the export_transactions_to_excel mock
-        mock_export.return_value = None
+        # Configure the export queue mock
+        job = MagicMock(export_format="xlsx", error=None)
+        mock_queue.submit.return_value = (job, True)
         
         # Configure the keyboard mock
         mock_keyboard.return_value = "keyboard"
         
-        # Call the handler
+        # Call the handler and finish the queued job without data
         await handle_export_callback(update, context)
+        self.assertEqual(mock_queue.submit.call_args.args[:2], (123, "xlsx"))
+        on_done = mock_queue.submit.call_args.args[3]
+        await on_done(job, None)
         
-        # Check that log_command_usage was called
-        mock_log.assert_called_once_with(update, context)
-        
-        # Check that export_transactions_to_excel was called with the correct user_id
-        mock_export.assert_called_once_with(123)
-        
-        # Check that callback_query.answer and callback_query.edit_message_text were called
+        # Check that the progress message now says there is nothing to export
         update.callback_query.answer.assert_called_once()
-        update.callback_query.edit_message_text.assert_called_once_with(
+        message.edit_text.assert_called_once_with(
             text="❌ У вас немає даних для експорту.",
             reply_markup="keyboard"
         )
@@ -0,0 +1,221 @@
+import unittest
+import asyncio
+import sys
+import os
+import threading
+from unittest.mock import MagicMock
+
+import gspread
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import async_database_service
+from services.sync_queue import SyncQueue
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+
+
+def api_error(code):
+    response = MagicMock()
+    response.json.return_value = {"error": {"code": code, "message": "error"}}
+    return gspread.exceptions.APIError(response)
+
+
+@test_category(TestCategory.UNIT)
+class TestSyncQueue(unittest.TestCase):
+    def tearDown(self):
+        async_database_service.shutdown()
+
+    def test_requests_for_running_user_are_merged(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def sync(user_id, only_if_synced=False):
+            calls.append(user_id)
+            started.set()
+            release.wait(5)
+            return True, f"synced {user_id}"
+
+        async def scenario():
+            queue = SyncQueue(workers=2)
+            await queue.start(sync)
+            results = []
+
+            async def on_done(job, result):
+                results.append(result)
+
+            queue.submit(1, on_done)
+            await asyncio.to_thread(started.wait, 5)
+            # Поки синхронізація йде, нові запити зливаються в одну наступну
+            _, created = queue.submit(1, on_done)
+            _, merged_created = queue.submit(1, on_done)
+            self.assertTrue(created)
+            self.assertFalse(merged_created)
+            self.assertEqual(queue.metrics()["depth"], 0)
+
+            release.set()
+            while len(results) < 2:
+                await asyncio.sleep(0.01)
+            metrics = queue.metrics()
+            await queue.stop()
+            return results, metrics
+
+        results, metrics = asyncio.run(scenario())
+
+        self.assertEqual(calls, [1, 1])
+        self.assertEqual(results, [(True, "synced 1")] * 2)
+        self.assertEqual(metrics["merged"], 1)
+        self.assertEqual(metrics["completed"], 2)
+
+    def test_transient_error_is_retried_and_covers_waiting_request(self):
+        calls = []
+
+        def sync(user_id, only_if_synced=False):
+            calls.append(user_id)
+            if len(calls) == 1:
+                raise api_error(429)
+            return True, "ok"
+
+        async def scenario():
+            queue = SyncQueue(workers=1, base_delay=0.1)
+            await queue.start(sync)
+            results = []
+
+            async def on_done(job, result):
+                results.append((job.attempts, result))
+
+            queue.submit(1, on_done)
+            while queue.metrics()["retries"] == 0:
+                await asyncio.sleep(0.01)
+            # Запит під час паузи перед повтором виконає сам повтор
+            queue.submit(1, on_done)
+            while len(results) < 2:
+                await asyncio.sleep(0.01)
+            metrics = queue.metrics()
+            await queue.stop()
+            return results, metrics
+
+        results, metrics = asyncio.run(scenario())
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(results[0], (2, (True, "ok")))
+        self.assertEqual(results[1][1], (True, "ok"))
+        self.assertEqual(metrics["coalesced"], 1)
+        self.assertEqual(metrics["retries"], 1)
+
+    def test_permanent_error_and_exhausted_retries_are_reported(self):
+        def sync(user_id, only_if_synced=False):
+            if user_id == 1:
+                raise api_error(403)
+            raise ConnectionError("network is down")
+
+        async def scenario():
+            queue = SyncQueue(workers=2, max_attempts=3, base_delay=0.01)
+            await queue.start(sync)
+            results = {}
+
+            async def on_done(job, result):
+                results[job.user_id] = (job.attempts, result[0])
+
+            queue.submit(1, on_done)
+            queue.submit(2, on_done)
+            while len(results) < 2:
+                await asyncio.sleep(0.01)
+            metrics = queue.metrics()
+            await queue.stop()
+            return results, metrics
+
+        results, metrics = asyncio.run(scenario())
+
+        self.assertEqual(results, {1: (1, False), 2: (3, False)})
+        self.assertEqual(metrics["failed"], 2)
+        self.assertEqual(metrics["retries"], 2)
+
+    def test_auto_sync_is_debounced(self):
+        calls = []
+
+        def sync(user_id, only_if_synced=False):
+            calls.append((user_id, only_if_synced))
+            return True, "ok"
+
+        async def scenario():
+            queue = SyncQueue(workers=1, auto_sync_delay=0.05)
+            await queue.start(sync)
+            for _ in range(5):
+                queue.schedule_auto_sync(1)
+                await asyncio.sleep(0.01)
+            while queue.metrics()["completed"] == 0:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.1)
+            await queue.stop()
+
+        asyncio.run(scenario())
+
+        self.assertEqual(calls, [(1, True)])
+
+    def test_sync_does_not_occupy_database_threads(self):
+        started, release = threading.Event(), threading.Event()
+
+        def sync(user_id, only_if_synced=False):
+            started.set()
+            release.wait(5)
+            return True, threading.current_thread().name
+
+        async def scenario():
+            queue = SyncQueue(workers=1)
+            await queue.start(sync)
+            results = []
+
+            async def on_done(job, result):
+                results.append(result)
+
+            queue.submit(1, on_done)
+            await asyncio.to_thread(started.wait, 5)
+            # Єдиний потік бази вільний, поки синхронізація чекає на Google
+            answer = await asyncio.wait_for(async_database_service.run_blocking(lambda: "db"), 1)
+            release.set()
+            while not results:
+                await asyncio.sleep(0.01)
+            await queue.stop()
+            return answer, results[0][1]
+
+        async_database_service.shutdown()
+        async_database_service.configure(max_workers=1)
+        try:
+            answer, thread_name = asyncio.run(scenario())
+        finally:
+            release.set()
+            async_database_service.configure(max_workers=async_database_service.DEFAULT_MAX_WORKERS)
+
+        self.assertEqual(answer, "db")
+        self.assertTrue(thread_name.startswith("sheets-sync"))
+
+    def test_auto_sync_disabled_by_default(self):
+        async def scenario():
+            queue = SyncQueue(workers=1)
+            await queue.start(lambda user_id, only_if_synced=False: (True, "ok"))
+            queue.schedule_auto_sync(1)
+            metrics = queue.metrics()
+            await queue.stop()
+            return metrics
+
+        self.assertEqual(asyncio.run(scenario())["submitted"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
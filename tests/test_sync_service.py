@@ -0,0 +1,140 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services import connection_pool
+from services import database_service
+from services import sync_service
+from tests.fake_sheets import FakeSpreadsheet
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        INTEGRATION = "Integration Tests"
+
+
+@test_category(TestCategory.INTEGRATION)
+class TestIncrementalSheetSync(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "sync.db")
+        self.patchers = [patch.object(database_service, "DATABASE_FILE", self.db_path),
+                         patch.object(sync_service, "DATABASE_FILE", self.db_path)]
+        for patcher in self.patchers:
+            patcher.start()
+        database_service.init_database()
+        self.spreadsheet = FakeSpreadsheet()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        connection_pool.close_all()
+        self.temp_dir.cleanup()
+
+    def add(self, amount, category):
+        database_service.add_transaction(1, amount, category)
+        conn = connection_pool.connect(self.db_path)
+        try:
+            return conn.execute("SELECT MAX(id) FROM transactions").fetchone()[0]
+        finally:
+            conn.close()
+
+    def sync(self):
+        return sync_service.sync_with_google_sheets(1, self.spreadsheet)
+
+    def sheet(self):
+        return self.spreadsheet.worksheet(sync_service.worksheet_title(1))
+
+    def amounts(self):
+        return [row[1] for row in self.sheet().get_all_values()[1:]]
+
+    def test_only_new_rows_are_sent(self):
+        self.add(-100, "Їжа")
+        self.add(500, "Зарплата")
+
+        self.assertTrue(self.sync()[0])
+        self.assertEqual(self.sheet().get_all_values()[0], sync_service.SHEET_HEADER)
+        self.assertEqual(self.amounts(), [-100, 500])
+
+        calls = len(self.sheet().calls)
+        success, message = self.sync()
+        self.assertTrue(success)
+        self.assertIn("актуальна", message)
+        self.assertEqual(len(self.sheet().calls), calls)
+
+        self.add(-30, "Кава")
+        self.sync()
+        self.assertEqual(self.sheet().calls[calls:], ["update"])
+        self.assertEqual(self.amounts(), [-100, 500, -30])
+
+    def test_undo_clears_row_and_frees_it(self):
+        self.add(-100, "Їжа")
+        last = self.add(-999, "Помилка")
+        self.sync()
+
+        database_service.delete_transaction_with_budget(last)
+        self.sync()
+        self.assertEqual(self.amounts(), [-100])
+
+        self.add(-40, "Кава")
+        self.sync()
+        self.assertEqual(self.amounts(), [-100, -40])
+
+    def test_deleted_middle_row_is_cleared_in_place(self):
+        self.add(-100, "Їжа")
+        middle = self.add(-20, "Кава")
+        self.add(-60, "Таксі")
+        self.sync()
+
+        database_service.delete_transaction(middle)
+        self.add(-5, "Вода")
+        calls = len(self.sheet().calls)
+        self.sync()
+
+        self.assertEqual(self.sheet().calls[calls:], ["batch_clear", "update"])
+        self.assertEqual(self.amounts(), [-100, "", -60, -5])
+
+    def test_large_history_is_sent_in_batches(self):
+        self.spreadsheet.add_worksheet(sync_service.worksheet_title(1), rows=3, cols=4)
+        for amount in range(1, 6):
+            self.add(-amount, "Їжа")
+
+        with patch.object(sync_service, "SYNC_BATCH_ROWS", 2):
+            self.sync()
+
+        self.assertEqual(self.sheet().calls.count("update"), 1 + 3)
+        self.assertEqual(self.sheet().calls.count("add_rows"), 1)
+        self.assertEqual(self.amounts(), [-1, -2, -3, -4, -5])
+
+    def test_removed_worksheet_triggers_full_sync(self):
+        self.add(-100, "Їжа")
+        self.sync()
+        self.spreadsheet.del_worksheet(self.sheet())
+        self.add(-50, "Кава")
+
+        self.assertTrue(self.sync()[0])
+        self.assertEqual(self.amounts(), [-100, -50])
+
+    def test_nothing_to_sync(self):
+        self.assertEqual(self.sync(), (False, "⚠️ У вас немає транзакцій для синхронізації."))
+        self.assertEqual(self.spreadsheet.worksheets, {})
+
+
+if __name__ == '__main__':
+    unittest.main()
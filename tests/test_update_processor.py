@@ -0,0 +1,129 @@
+import unittest
+import asyncio
+import sys
+import os
+from types import SimpleNamespace
+
+# Add the parent directory to the Python path if not already there
+current_dir = os.path.dirname(os.path.abspath(__file__))
+parent_dir = os.path.dirname(current_dir)
+if parent_dir not in sys.path:
+    sys.path.insert(0, parent_dir)
+
+from services.update_processor import PerUserUpdateProcessor
+
+# Import the test_category decorator
+try:
+    from run_tests import test_category, TestCategory
+except ImportError:
+    # Define dummy decorator for when running tests directly
+    def test_category(category):
+        def decorator(cls):
+            return cls
+        return decorator
+
+    class TestCategory:
+        UNIT = "Unit Tests"
+        INTEGRATION = "Integration Tests"
+
+
+def make_update(user_id=None, chat_id=None):
+    user = SimpleNamespace(id=user_id) if user_id is not None else None
+    chat = SimpleNamespace(id=chat_id) if chat_id is not None else None
+    return SimpleNamespace(effective_user=user, effective_chat=chat)
+
+
+@test_category(TestCategory.UNIT)
+class TestPerUserUpdateProcessor(unittest.TestCase):
+    def run_updates(self, processor, updates):
+        events = []
+        running = {"now": 0, "max": 0}
+
+        async def handle(name):
+            running["now"] += 1
+            running["max"] = max(running["max"], running["now"])
+            events.append(("start", name))
+            await asyncio.sleep(0.01)
+            events.append(("end", name))
+            running["now"] -= 1
+
+        async def scenario():
+            await asyncio.gather(*(processor.process_update(update, handle(name))
+                                   for name, update in updates))
+
+        asyncio.run(scenario())
+        return events, running["max"]
+
+    def test_same_user_updates_run_in_order(self):
+        processor = PerUserUpdateProcessor(8)
+        updates = [(f"u1-{i}", make_update(user_id=1)) for i in range(3)]
+
+        events, max_running = self.run_updates(processor, updates)
+
+        self.assertEqual(max_running, 1)
+        self.assertEqual(events, [("start", "u1-0"), ("end", "u1-0"),
+                                  ("start", "u1-1"), ("end", "u1-1"),
+                                  ("start", "u1-2"), ("end", "u1-2")])
+
+    def test_different_users_run_concurrently(self):
+        processor = PerUserUpdateProcessor(8)
+        updates = [(f"u{i}", make_update(user_id=i)) for i in range(5)]
+
+        _, max_running = self.run_updates(processor, updates)
+
+        self.assertEqual(max_running, 5)
+
+    def test_concurrency_limit_is_respected(self):
+        processor = PerUserUpdateProcessor(2)
+        updates = [(f"u{i}", make_update(user_id=i)) for i in range(5)]
+
+        _, max_running = self.run_updates(processor, updates)
+
+        self.assertEqual(max_running, 2)
+
+    def test_flooding_user_does_not_block_others(self):
+        processor = PerUserUpdateProcessor(2)
+        order = []
+
+        async def scenario():
+            gate = asyncio.Event()
+
+            async def slow(name):
+                order.append(name)
+                await gate.wait()
+
+            async def fast(name):
+                order.append(name)
+
+            flood = [asyncio.create_task(processor.process_update(make_update(user_id=1), slow(f"u1-{i}")))
+                     for i in range(10)]
+            await asyncio.sleep(0.01)
+            # Перше оновлення першого користувача займає один слот, решта його оновлень слотів не тримає
+            await asyncio.wait_for(processor.process_update(make_update(user_id=2), fast("u2")), 1)
+            busy = processor.current_concurrent_updates
+            gate.set()
+            await asyncio.gather(*flood)
+            return busy
+
+        busy = asyncio.run(scenario())
+
+        self.assertEqual(order[:2], ["u1-0", "u2"])
+        self.assertEqual(order[2:], [f"u1-{i}" for i in range(1, 10)])
+        self.assertEqual(busy, 1)
+
+    def test_locks_released_after_processing(self):
+        processor = PerUserUpdateProcessor(4)
+        updates = [("a", make_update(user_id=1)), ("b", make_update(chat_id=-100)), ("c", make_update())]
+
+        self.run_updates(processor, updates)
+
+        self.assertEqual(processor.active_keys, 0)
+
+    def test_key_falls_back_to_chat(self):
+        self.assertEqual(PerUserUpdateProcessor.get_key(make_update(user_id=5, chat_id=7)), ("user", 5))
+        self.assertEqual(PerUserUpdateProcessor.get_key(make_update(chat_id=7)), ("chat", 7))
+        self.assertIsNone(PerUserUpdateProcessor.get_key(make_update()))
+
+
+if __name__ == '__main__':
+    unittest.main()